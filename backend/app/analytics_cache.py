@@ -0,0 +1,62 @@
+from threading import Lock
+
+from cachetools import TTLCache
+
+from app.settings import settings
+
+
+class AnalyticsCache:
+    """
+    Bounded TTL cache of computed course analytics, keyed by (user_id, course_id, tee_id).
+    Only completed rounds feed the analytics, so entries stay valid until a round on the course
+    is completed or deleted.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, course_id: int, tee_id: int) -> dict | None:
+        with self._lock:
+            value = self._cache.get((user_id, course_id, tee_id))
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, user_id: int, course_id: int, tee_id: int, value: dict) -> None:
+        with self._lock:
+            self._cache[(user_id, course_id, tee_id)] = value
+
+    def invalidate_course(self, user_id: int, course_id: int | None) -> None:
+        """Drop the user's entries for every tee of the course"""
+        with self._lock:
+            stale = [key for key in self._cache.keys() if key[0] == user_id and key[1] == course_id]
+            for key in stale:
+                self._cache.pop(key, None)
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl_seconds": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+analytics_cache = AnalyticsCache(
+    maxsize=settings.ANALYTICS_CACHE_MAXSIZE,
+    ttl=settings.ANALYTICS_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, status
+
+from app.analytics_cache import analytics_cache
+from app.db_setup import async_engine, engine
+from app.handicap_jobs import handicap_job_counts, worker_stats
+from app.password_pool import password_pool
+from app.pool_metrics import pool_status
+from app.security import Principal, get_current_admin
+from app.token_cache import token_cache
+from app.token_reaper import reaper_stats
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/token-cache", status_code=status.HTTP_200_OK)
+def get_token_cache_stats(current_admin: Principal = Depends(get_current_admin)):
+    """
+    Hit/miss counters for the bearer token cache, in total and per route.
+    db_round_trips_saved is the number of queries get_current_user did not have to run.
+    """
+    return token_cache.stats()
+
+
+@router.get("/db-pool", status_code=status.HTTP_200_OK)
+def get_db_pool_stats(current_admin: Principal = Depends(get_current_admin)):
+    """
+    Checked-out, idle and overflow connections for the sync and async engines,
+    plus a histogram of how long checkouts waited for a connection.
+    """
+    return {
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.pool),
+    }
+
+
+@router.get("/password-pool", status_code=status.HTTP_200_OK)
+def get_password_pool_stats(current_admin: Principal = Depends(get_current_admin)):
+    """Queue depth, running and rejected counts for the password hashing worker pool."""
+    return password_pool.stats()
+
+
+@router.get("/token-reaper", status_code=status.HTTP_200_OK)
+def get_token_reaper_stats(current_admin: Principal = Depends(get_current_admin)):
+    """How many expired tokens the background reaper removed, per run and in total."""
+    return reaper_stats
+
+
+@router.get("/analytics-cache", status_code=status.HTTP_200_OK)
+def get_analytics_cache_stats(current_admin: Principal = Depends(get_current_admin)):
+    """Hit/miss and invalidation counters for the course analytics cache."""
+    return analytics_cache.stats()
+
+
+@router.get("/handicap-jobs", status_code=status.HTTP_200_OK)
+def get_handicap_job_stats(current_admin: Principal = Depends(get_current_admin)):
+    """Queued handicap recalculations by status, and what the background worker did so far."""
+    return {"jobs": handicap_job_counts(), "worker": worker_stats}
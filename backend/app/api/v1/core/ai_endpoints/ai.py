@@ -14,7 +14,7 @@ from app.settings import settings
 from pydantic import BaseModel, Field
 
 from app.security import get_current_user
-from app.api.v1.core.react_agent.react_graph import app as agent_app
+from app.api.v1.core.react_agent.react_graph import get_agent_app
 
 from app.api.v1.core.schemas import (
     AgentQueryRequest,
@@ -35,9 +35,6 @@ from app.api.v1.core.rag.vector_store import (
 
 from app.db_setup import get_db
 
-# Add the import for Gemini LLM after the existing imports
-from langchain_google_genai import ChatGoogleGenerativeAI
-
 # Add the LLM filtering function after the existing imports and before the router definition
 def format_shot_for_analysis(shot_data, index: int) -> str:
     """Format a single shot for LLM analysis"""
@@ -78,7 +75,9 @@ def llm_filter_shots(request: AgentQueryRequest, retrieved_shots: list, target_c
     if len(retrieved_shots) <= target_count:
         return retrieved_shots
     
-    # Create Gemini LLM instance
+    # Create Gemini LLM instance, imported here to keep it out of the API's startup cost
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     llm = ChatGoogleGenerativeAI(
         model="gemini-2.0-flash",
         google_api_key=settings.GEMINI_API_KEY,
@@ -394,7 +393,7 @@ def query_agent(
         
         try:
             # Call the agent graph with the formatted query
-            result = agent_app.invoke(
+            result = get_agent_app().invoke(
                 {
                     "input": formatted_query, 
                     "agent_outcome": None, 
@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics_cache import analytics_cache
+from app.db_setup import get_async_db
+from app.security import Principal, get_current_principal
+from app.api.v1.core.models import Rounds, HoleScores, CourseTees
+from app.api.v1.core.schemas import CourseAnalyticsSchema, ScoreDistributionSchema
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# Score relative to par buckets, (name, lower bound, upper bound), bounds inclusive
+DISTRIBUTION_BUCKETS = (
+    ("eagle_or_better", None, -2),
+    ("birdie", -1, -1),
+    ("par", 0, 0),
+    ("bogey", 1, 1),
+    ("double_bogey_or_worse", 2, None),
+)
+RANKED_HOLES = 3
+
+
+def bucket_count(lower: int | None, upper: int | None):
+    to_par = HoleScores.score_relative_to_par
+    if lower is None:
+        condition = to_par <= upper
+    elif upper is None:
+        condition = to_par >= lower
+    else:
+        condition = to_par.between(lower, upper)
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+async def compute_course_analytics(db: AsyncSession, user_id: int, course_id: int, tee_id: int) -> dict:
+    """Per hole averages and score distribution over the user's completed rounds on a tee"""
+    played = (
+        Rounds.user_id == user_id,
+        Rounds.course_id == course_id,
+        Rounds.tee_id == tee_id,
+        Rounds.is_completed == True,
+    )
+    
+    rounds_played = await db.scalar(select(func.count(Rounds.id)).where(*played))
+    
+    # One grouped query over the hole scores, only holes that were played count
+    rows = (await db.execute(
+        select(
+            HoleScores.hole_number,
+            func.max(HoleScores.par).label("hole_par"),
+            func.count(HoleScores.id).label("times_played"),
+            func.avg(HoleScores.shots).label("average_shots"),
+            func.avg(HoleScores.score_relative_to_par).label("average_to_par"),
+            *(bucket_count(lower, upper).label(name) for name, lower, upper in DISTRIBUTION_BUCKETS),
+        )
+        .join(Rounds, Rounds.id == HoleScores.round_id)
+        .where(*played, HoleScores.shots > 0)
+        .group_by(HoleScores.hole_number)
+        .order_by(HoleScores.hole_number)
+    )).all()
+    
+    holes = []
+    totals = dict.fromkeys((name for name, _, _ in DISTRIBUTION_BUCKETS), 0)
+    for row in rows:
+        distribution = {name: getattr(row, name) for name, _, _ in DISTRIBUTION_BUCKETS}
+        for name, count in distribution.items():
+            totals[name] += count
+        holes.append({
+            "hole_number": row.hole_number,
+            "par": row.hole_par,
+            "times_played": row.times_played,
+            "average_shots": round(float(row.average_shots), 2),
+            "average_to_par": round(float(row.average_to_par), 2),
+            "distribution": distribution,
+        })
+    
+    ranked = sorted(holes, key=lambda hole: (hole["average_to_par"], hole["hole_number"]))
+    return {
+        "course_id": course_id,
+        "tee_id": tee_id,
+        "rounds_played": rounds_played,
+        "holes": holes,
+        "distribution": totals,
+        "hardest_holes": [hole["hole_number"] for hole in reversed(ranked[-RANKED_HOLES:])],
+        "easiest_holes": [hole["hole_number"] for hole in ranked[:RANKED_HOLES]],
+    }
+
+
+async def get_course_analytics(db: AsyncSession, user_id: int, course_id: int, tee_id: int) -> dict:
+    analytics = analytics_cache.get(user_id, course_id, tee_id)
+    if analytics is None:
+        tee_exists = await db.scalar(
+            select(CourseTees.id).where(CourseTees.id == tee_id, CourseTees.course_id == course_id)
+        )
+        if not tee_exists:
+            raise HTTPException(status_code=404, detail="Tee not found")
+        analytics = await compute_course_analytics(db, user_id, course_id, tee_id)
+        analytics_cache.set(user_id, course_id, tee_id, analytics)
+    return analytics
+
+
+@router.get("/courses/{course_id}", response_model=CourseAnalyticsSchema)
+async def get_course_scoring(
+    course_id: int,
+    tee_id: int = Query(...),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Per hole scoring averages, score distribution and the hardest and easiest holes for the
+    user's completed rounds on a course and tee. Cached until a round on the course is
+    completed or deleted.
+    """
+    return await get_course_analytics(db, current_user.id, course_id, tee_id)
+
+
+@router.get("/courses/{course_id}/distribution", response_model=ScoreDistributionSchema)
+async def get_course_distribution(
+    course_id: int,
+    tee_id: int = Query(...),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Birdie/par/bogey distribution over every played hole on a course and tee"""
+    analytics = await get_course_analytics(db, current_user.id, course_id, tee_id)
+    return analytics["distribution"]
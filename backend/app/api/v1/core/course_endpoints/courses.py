@@ -1,11 +1,14 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.api.v1.core.models import GolfCourses, CourseTees, CourseHoles
 from app.api.v1.core.schemas import CourseDetailsSchema
-from app.db_setup import get_db
+from app.catalog_version import catalog_version_query
+from app.db_setup import get_async_db
+from app.etags import compute_etag, etag_matches, not_modified, set_etag
 
 YARDS_TO_METERS = 0.9144  # 1 yard = 0.9144 meters
 
@@ -58,9 +61,11 @@ router = APIRouter(prefix="/courses", tags=["courses"])
 @router.get("", response_model=List[CourseDetailsSchema])
 async def list_courses(
     search: str,
+    request: Request,
+    response: Response,
     tee_type: Optional[str] = None,
     use_meters: bool = False,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all golf courses with optional search and tee type filtering.
@@ -69,13 +74,22 @@ async def list_courses(
     - search: Search term for course name
     - tee_type: Optional specific tee type to filter by
     - use_meters: If True, converts all distances from yards to meters
+    
+    Supports If-None-Match. The ETag covers the parameters and the catalog version stamp, so an
+    unchanged result is answered with 304 after reading one row.
     """
-    # Build base query with all necessary joins
+    catalog_version = await db.scalar(catalog_version_query())
+    etag = compute_etag("courses", search, tee_type, use_meters, catalog_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    # Build base query, eager loading tees and holes so nothing is lazy loaded later
     query = (
         select(GolfCourses)
         .options(
-            joinedload(GolfCourses.tees)
-            .joinedload(CourseTees.holes)
+            selectinload(GolfCourses.tees)
+            .selectinload(CourseTees.holes)
         )
     )
     
@@ -84,8 +98,8 @@ async def list_courses(
         query = query.where(GolfCourses.course_name.ilike(f"%{search}%"))
     
     # Execute query
-    result = db.execute(query)
-    courses = result.unique().scalars().all()
+    result = await db.execute(query)
+    courses = result.scalars().all()
     
     # Filter and prepare courses
     filtered_courses = []
@@ -1,9 +1,18 @@
+import json
 from datetime import datetime, timezone
 from typing import List
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import select
 
-from app.api.v1.core.models import Users, Rounds, CourseTees
+from app.api.v1.core.models import Users, Rounds, CourseTees, HandicapWindows
+from .handicap_window import (
+    HandicapWindow,
+    RollingLow,
+    end_timestamp,
+    load_handicap_window,
+    record_handicap_change,
+    refill_handicap_window
+)
 
 def calculate_score_differential(adjusted_score: int, course_rating: float, slope_rating: float, total_holes: int, total_par: int) -> float:
     """
@@ -39,14 +48,6 @@ def calculate_score_differential(adjusted_score: int, course_rating: float, slop
     # Round to one decimal place
     return round(differential, 1)
 
-def get_last_20_rounds(db: Session, user_id: int) -> List[Rounds]:
-    """Get the user's last 20 completed rounds"""
-    return db.query(Rounds).filter(
-        Rounds.user_id == user_id,
-        Rounds.is_completed == True,
-        Rounds.score_differential != None
-    ).order_by(desc(Rounds.end_time)).limit(20).all()
-
 def calculate_handicap_index(score_differentials: List[float]) -> float:
     """
     Calculate handicap index based on the best 8 of last 20 rounds
@@ -91,7 +92,7 @@ def calculate_handicap_index(score_differentials: List[float]) -> float:
 
 def update_round_handicap_data(db: Session, round_obj: Rounds) -> None:
     """
-    Update a round's score differential and included_in_handicap status
+    Update a round's score differential. Does not commit
     """
     if not round_obj.is_completed or not round_obj.tee:
         return
@@ -110,15 +111,10 @@ def update_round_handicap_data(db: Session, round_obj: Rounds) -> None:
         total_holes=round_obj.total_holes,
         total_par=total_par
     )
-    
-    db.commit()
 
-def update_user_handicap(db: Session, user_id: int) -> None:
+def rounds_to_use(num_rounds: int, is_new_golfer: bool) -> int | None:
     """
-    Update a user's handicap index based on their recent rounds
-    Implements USGA soft cap and hard cap rules:
-    - Soft Cap: Increases beyond 3.0 strokes are reduced by 50%
-    - Hard Cap: Maximum increase of 5.0 strokes in a 12-month period
+    Number of best differentials that count, None while there are too few rounds.
     
     For users with initial handicap of 54 (new golfers):
     - Start calculating after 3 rounds
@@ -129,95 +125,166 @@ def update_user_handicap(db: Session, user_id: int) -> None:
     - Then use progressive system starting with 4 differentials
     - Progress up to 8 differentials at 20 rounds
     """
-    # Get last 20 rounds
-    recent_rounds = get_last_20_rounds(db, user_id)
-    
-    # Get all score differentials
-    differentials = [round.score_differential for round in recent_rounds if round.score_differential is not None]
-    
-    # Get user and their current handicap
-    user = db.query(Users).filter(Users.id == user_id).first()
-    current_handicap = float(user.handicap_index) if user.handicap_index is not None else None
-    
-    # If no current handicap, can't proceed
-    if current_handicap is None:
-        return
-        
-    # Different logic based on whether user is a new golfer (handicap == 54) or experienced
-    is_new_golfer = current_handicap == 54.0
-    num_rounds = len(differentials)
-    
     # For new golfers, need minimum 3 rounds
     if is_new_golfer and num_rounds < 3:
-        return
+        return None
         
     # For experienced golfers, wait until 12 rounds
     if not is_new_golfer and num_rounds < 12:
-        return
+        return None
         
-    # Calculate number of differentials to use
     if is_new_golfer:
         # Progressive system for new golfers starting at 3 rounds
         if num_rounds <= 6:
-            num_to_use = 1  # Use lowest differential
+            return 1  # Use lowest differential
         elif num_rounds <= 8:
-            num_to_use = 2  # Use lowest 2 differentials
+            return 2  # Use lowest 2 differentials
         elif num_rounds <= 11:
-            num_to_use = 3  # Use lowest 3 differentials
-        elif num_rounds <= 14:
-            num_to_use = 4  # Use lowest 4 differentials
-        elif num_rounds <= 16:
-            num_to_use = 5  # Use lowest 5 differentials
-        elif num_rounds <= 18:
-            num_to_use = 6  # Use lowest 6 differentials
-        elif num_rounds == 19:
-            num_to_use = 7  # Use lowest 7 differentials
-        else:
-            num_to_use = 8  # Use lowest 8 differentials
+            return 3  # Use lowest 3 differentials
+    # Progressive system for experienced golfers starting at 12 rounds
+    if num_rounds <= 14:
+        return 4  # Use lowest 4 differentials
+    elif num_rounds <= 16:
+        return 5  # Use lowest 5 differentials
+    elif num_rounds <= 18:
+        return 6  # Use lowest 6 differentials
+    elif num_rounds == 19:
+        return 7  # Use lowest 7 differentials
     else:
-        # Progressive system for experienced golfers starting at 12 rounds
-        if num_rounds <= 14:
-            num_to_use = 4  # Start with 4 differentials
-        elif num_rounds <= 16:
-            num_to_use = 5  # Use lowest 5 differentials
-        elif num_rounds <= 18:
-            num_to_use = 6  # Use lowest 6 differentials
-        elif num_rounds == 19:
-            num_to_use = 7  # Use lowest 7 differentials
-        else:
-            num_to_use = 8  # Use lowest 8 differentials
-    
-    # Sort differentials and take best ones
-    sorted_differentials = sorted(differentials)
-    best_differentials = sorted_differentials[:num_to_use]
+        return 8  # Use lowest 8 differentials
+
+def calculate_new_handicap(
+    sorted_differentials: List[float],
+    current_handicap: float,
+    low_handicap: float | None = None
+) -> tuple[float, int] | None:
+    """
+    New handicap index from the differentials of the last 20 rounds, lowest first, and the number
+    of differentials used. None while the handicap stays as it is.
+    Implements USGA soft cap and hard cap rules, measured from low_handicap, the lowest index of
+    the last 12 months, or from the current index when there is no history:
+    - Soft Cap: Increases beyond 3.0 strokes are reduced by 50%
+    - Hard Cap: Maximum increase of 5.0 strokes in a 12-month period
+    """
+    # Different logic based on whether user is a new golfer (handicap == 54) or experienced
+    num_to_use = rounds_to_use(len(sorted_differentials), is_new_golfer=current_handicap == 54.0)
+    if num_to_use is None:
+        return None
     
-    # Calculate average and apply 96% multiplier
+    # Calculate average of the best differentials and apply 96% multiplier
+    best_differentials = sorted_differentials[:num_to_use]
     average = sum(best_differentials) / len(best_differentials)
     new_handicap = round(average * 0.96, 1)
     
     # Apply caps only when handicap is increasing
-    increase = new_handicap - current_handicap
+    reference = current_handicap if low_handicap is None else low_handicap
+    increase = new_handicap - reference
     
     if increase > 3.0:
         # Apply soft cap - reduce any increase beyond 3.0 by 50%
         excess_increase = increase - 3.0
         reduced_excess = excess_increase * 0.5
-        new_handicap = current_handicap + 3.0 + reduced_excess
+        new_handicap = reference + 3.0 + reduced_excess
     
     if increase > 5.0:
         # Apply hard cap - limit total increase to 5.0
-        new_handicap = current_handicap + 5.0
+        new_handicap = reference + 5.0
+    
+    return new_handicap, num_to_use
+
+def simulate_handicap(
+    window: HandicapWindow,
+    lows: RollingLow,
+    current_handicap: float | None,
+    differentials: List[float],
+    now: float
+) -> list[tuple[float | None, int | None]]:
+    """
+    Projected handicap and number of differentials used after each hypothetical round, played in
+    order after the rounds of the window. Follows apply_handicap_window but only changes the
+    window and lows passed in, nothing is written.
+    """
+    projections = []
+    for number, differential in enumerate(differentials, start=1):
+        # Negative ids never collide with real rounds, the offset keeps them newest
+        window.add(-number, now + number, differential)
+        result = None
+        if current_handicap is not None:
+            result = calculate_new_handicap(window.differentials(), current_handicap, lows.low(now + number))
+        num_to_use = None
+        if result is not None:
+            new_handicap, num_to_use = result
+            # The stored index has one decimal
+            new_handicap = round(new_handicap, 1)
+            if new_handicap != current_handicap:
+                lows.record(now + number, new_handicap)
+            current_handicap = new_handicap
+        projections.append((current_handicap, num_to_use))
+    return projections
+
+def apply_handicap_window(db: Session, user_id: int, window_row: HandicapWindows, window: HandicapWindow) -> None:
+    """
+    Recalculate the user's handicap from their window and flag the rounds that count.
+    Only rounds whose flag changes are written. Does not commit.
+    """
+    window_row.entries = window.to_json()
+    
+    user = db.get(Users, user_id)
+    current_handicap = float(user.handicap_index) if user.handicap_index is not None else None
+    
+    # If no current handicap, can't proceed
+    if current_handicap is None:
+        return
+    
+    now = datetime.now(timezone.utc)
+    lows = RollingLow.from_json(window_row.lows)
+    result = calculate_new_handicap(window.differentials(), current_handicap, lows.low(now.timestamp()))
+    if result is None:
+        return
+    new_handicap, num_to_use = result
     
     # Update user's handicap
     user.handicap_index = new_handicap
-    user.last_handicap_update = datetime.now(timezone.utc)
-    
-    # Update which rounds are included in handicap
-    sorted_differentials = sorted(differentials)[:num_to_use]  # Best differentials
-    for round in recent_rounds:
-        round.included_in_handicap = (
-            round.score_differential is not None and 
-            round.score_differential in sorted_differentials
-        )
+    user.last_handicap_update = now
+    if round(new_handicap, 1) != current_handicap:
+        record_handicap_change(db, user_id, new_handicap, now, lows)
+    window_row.lows = lows.to_json()
     
-    db.commit() 
\ No newline at end of file
+    # Update which rounds are included in handicap, picked by round id
+    included = window.best_round_ids(num_to_use)
+    changed = set(included).symmetric_difference(json.loads(window_row.included))
+    if changed:
+        for round_obj in db.scalars(select(Rounds).where(Rounds.id.in_(changed))):
+            round_obj.included_in_handicap = round_obj.id in included
+    window_row.included = json.dumps(included)
+
+def add_round_to_handicap_window(db: Session, round_obj: Rounds) -> tuple[HandicapWindows, HandicapWindow]:
+    """Add a just completed round to its user's window without recalculating the handicap"""
+    window_row, window = load_handicap_window(db, round_obj.user_id)
+    if round_obj.score_differential is not None:
+        window.add(round_obj.id, end_timestamp(round_obj.end_time), round_obj.score_differential)
+        window_row.entries = window.to_json()
+    return window_row, window
+
+def update_user_handicap(db: Session, user_id: int, completed_round: Rounds | None = None) -> None:
+    """
+    Update a user's handicap index based on their recent rounds. Does not commit.
+    completed_round, when given, is added to the user's rolling window instead of rebuilding it.
+    """
+    if completed_round is not None:
+        window_row, window = add_round_to_handicap_window(db, completed_round)
+    else:
+        window_row, window = load_handicap_window(db, user_id)
+    apply_handicap_window(db, user_id, window_row, window)
+
+def remove_round_from_handicap(db: Session, user_id: int, round_id: int) -> None:
+    """
+    Take an already deleted round out of the user's window and recalculate the handicap when it
+    was part of it. Does not commit.
+    """
+    window_row, window = load_handicap_window(db, user_id)
+    # A window built just now never held the round, but the handicap may still count it
+    if not window.remove(round_id) and not window.rebuilt:
+        return
+    refill_handicap_window(db, user_id, window)
+    apply_handicap_window(db, user_id, window_row, window)
@@ -0,0 +1,132 @@
+"""
+NumPy versions of the handicap arithmetic in handicap.py, for many rounds or users at once.
+
+They give the same floats as calculate_score_differential and calculate_new_handicap: the
+operations run in the same order on float64, and round1 matches Python's round(x, 1) also
+where np.round alone would pick the other side of a tie.
+"""
+import numpy as np
+
+from .handicap_window import WINDOW_SIZE
+
+# Best differentials used by number of rounds (index), for new golfers (handicap 54) and for
+# experienced golfers, 0 while the handicap is not recalculated. Mirrors rounds_to_use
+NEW_GOLFER_ROUNDS_TO_USE = np.array([0, 0, 0, 1, 1, 1, 1, 2, 2, 3, 3, 3, 4, 4, 4, 5, 5, 6, 6, 7, 8])
+EXPERIENCED_ROUNDS_TO_USE = np.array([0] * 12 + [4, 4, 4, 5, 5, 6, 6, 7, 8])
+
+
+def round1(values: np.ndarray) -> np.ndarray:
+    """round(value, 1) for every value, with Python's correctly rounded result"""
+    values = np.asarray(values, dtype=np.float64)
+    # At least 1-d, np.round of a 0-d array returns a scalar the fix-up could not write into
+    flat = np.array(values, ndmin=1)
+    rounded = np.round(flat, 1)
+    # Scaling by 10 can move a value across a .x5 tie, those few are rounded by Python
+    tenths = flat * 10
+    near_tie = np.abs(tenths - np.floor(tenths) - 0.5) < 1e-6
+    for index in np.flatnonzero(near_tie):
+        rounded.flat[index] = round(float(flat.flat[index]), 1)
+    return rounded[0] if values.ndim == 0 else rounded
+
+
+def score_differentials(
+    adjusted_scores: np.ndarray,
+    course_ratings: np.ndarray,
+    slope_ratings: np.ndarray,
+    total_holes: np.ndarray,
+    total_pars: np.ndarray,
+) -> np.ndarray:
+    """calculate_score_differential over arrays, arguments broadcast against each other"""
+    adjusted_scores, course_ratings, slope_ratings, total_holes, total_pars = np.broadcast_arrays(
+        *(np.asarray(values, dtype=np.float64) for values in
+          (adjusted_scores, course_ratings, slope_ratings, total_holes, total_pars))
+    )
+    nine_holes = total_holes == 9
+    # 9-hole tees sometimes store the 18-hole rating, which is halved first
+    course_ratings = np.where(nine_holes & (course_ratings > total_pars * 1.5), course_ratings / 2, course_ratings)
+    adjusted_scores = np.where(nine_holes, adjusted_scores * 2, adjusted_scores)
+    course_ratings = np.where(nine_holes, course_ratings * 2, course_ratings)
+    return round1((113 / slope_ratings) * (adjusted_scores - course_ratings))
+
+
+def windows_from_ragged(
+    differentials: np.ndarray, round_ids: np.ndarray, offsets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pad the last WINDOW_SIZE rounds of each user into rows, sorted best first by (differential,
+    round id). offsets holds the start of each user's rounds in the flat arrays, which are
+    ordered oldest first per user, plus the total length.
+    Returns (differentials padded with inf, round ids padded with -1, rounds per user).
+    """
+    users = len(offsets) - 1
+    ends = offsets[1:]
+    starts = np.maximum(offsets[:-1], ends - WINDOW_SIZE)
+    counts = ends - starts
+    columns = np.arange(WINDOW_SIZE)
+    present = columns < counts[:, None]
+    source = np.where(present, starts[:, None] + columns, 0)
+
+    padded_differentials = np.where(present, differentials[source] if len(differentials) else np.inf, np.inf)
+    padded_ids = np.where(present, round_ids[source] if len(round_ids) else -1, -1)
+    order = np.lexsort((padded_ids, padded_differentials), axis=1)
+    rows = np.arange(users)[:, None]
+    return padded_differentials[rows, order], padded_ids[rows, order], counts
+
+
+def handicap_indexes(
+    sorted_differentials: np.ndarray,
+    counts: np.ndarray,
+    current_handicaps: np.ndarray,
+    low_handicaps: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    calculate_new_handicap for every row of windows_from_ragged, low_handicaps being nan where
+    a user has no 12 month low.
+    Returns the new handicaps (nan where the handicap stays as it is) and the number of
+    differentials used per row.
+    """
+    is_new_golfer = current_handicaps == 54.0
+    to_use = np.where(is_new_golfer, NEW_GOLFER_ROUNDS_TO_USE[counts], EXPERIENCED_ROUNDS_TO_USE[counts])
+    to_use = np.where(np.isnan(current_handicaps), 0, to_use)
+    computed = to_use > 0
+
+    # A running sum adds the best differentials in the same order as sum() does
+    cumulative = np.cumsum(np.where(np.isfinite(sorted_differentials), sorted_differentials, 0.0), axis=1)
+    totals = cumulative[np.arange(len(counts)), np.maximum(to_use - 1, 0)]
+    averages = totals / np.maximum(to_use, 1)
+    new_handicaps = round1(averages * 0.96)
+
+    # Soft cap halves the increase beyond 3.0, hard cap limits it to 5.0
+    reference = current_handicaps
+    if low_handicaps is not None:
+        reference = np.where(np.isnan(low_handicaps), current_handicaps, low_handicaps)
+    increase = new_handicaps - reference
+    new_handicaps = np.where(increase > 3.0, reference + 3.0 + (increase - 3.0) * 0.5, new_handicaps)
+    new_handicaps = np.where(increase > 5.0, reference + 5.0, new_handicaps)
+    return np.where(computed, new_handicaps, np.nan), to_use
+
+
+def next_round_handicaps(
+    window_differentials: list[float],
+    new_differentials: np.ndarray,
+    current_handicap: float | None,
+    low_handicap: float | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    calculate_new_handicap after one more round, for every value of new_differentials at once.
+    window_differentials is the window the round is added to, without the round it evicts.
+    Returns the new handicaps (nan where the handicap stays as it is) and the differentials used.
+    """
+    new_differentials = np.asarray(new_differentials, dtype=np.float64)
+    scores = len(new_differentials)
+    base = np.broadcast_to(np.asarray(window_differentials, dtype=np.float64), (scores, len(window_differentials)))
+    rows = np.sort(np.column_stack([base, new_differentials]), axis=1)
+
+    padded = np.full((scores, WINDOW_SIZE), np.inf)
+    padded[:, :rows.shape[1]] = rows
+    return handicap_indexes(
+        padded,
+        np.full(scores, rows.shape[1]),
+        np.full(scores, np.nan if current_handicap is None else current_handicap),
+        np.full(scores, np.nan if low_handicap is None else low_handicap),
+    )
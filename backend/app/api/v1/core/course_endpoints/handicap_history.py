@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db_setup import get_async_db
+from app.security import get_current_user
+from app.token_cache import as_utc
+from app.api.v1.core.models import Users, HandicapHistory
+from app.api.v1.core.schemas import HandicapTrendSchema
+from .handicap_window import LOW_HANDICAP_DAYS
+
+router = APIRouter(prefix="/handicap", tags=["handicap"])
+
+
+def downsample(points: list[dict], threshold: int) -> list[dict]:
+    """
+    Largest-Triangle-Three-Buckets: keep the first and last point and from every bucket in
+    between the point spanning the largest triangle with its neighbours, so peaks and drops of
+    the handicap survive the reduction.
+    """
+    if threshold >= len(points) or threshold < 3:
+        return points
+    x = [as_utc(point["recorded_at"]).timestamp() for point in points]
+    y = [point["handicap_index"] for point in points]
+
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        # Average of the next bucket is the third corner of the triangle
+        next_end = min(int((bucket + 2) * bucket_size) + 1, len(points))
+        next_x = sum(x[end:next_end]) / (next_end - end)
+        next_y = sum(y[end:next_end]) / (next_end - end)
+
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            area = abs((x[previous] - next_x) * (y[i] - y[previous]) - (x[previous] - x[i]) * (next_y - y[previous]))
+            if area > best_area:
+                best, best_area = i, area
+        sampled.append(points[best])
+        previous = best
+    sampled.append(points[-1])
+    return sampled
+
+
+@router.get("/history", response_model=HandicapTrendSchema)
+async def get_handicap_history(
+    days: int = Query(365, ge=1, le=3650),
+    points: int = Query(100, ge=3, le=1000, description="Maximum number of points returned"),
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Handicap index trend for charting. Every change of the last days is read with one range
+    scan of ix_handicap_history_user_time and reduced to at most points points.
+    """
+    now = datetime.now(timezone.utc)
+    rows = (await db.execute(
+        select(HandicapHistory.recorded_at, HandicapHistory.handicap_index, HandicapHistory.low_handicap_index)
+        .where(HandicapHistory.user_id == current_user.id, HandicapHistory.recorded_at >= now - timedelta(days=days))
+        .order_by(HandicapHistory.recorded_at)
+    )).all()
+    series = [
+        {"recorded_at": recorded_at, "handicap_index": float(handicap), "low_handicap_index": float(low)}
+        for recorded_at, handicap, low in rows
+    ]
+
+    low_since = now - timedelta(days=LOW_HANDICAP_DAYS)
+    if days >= LOW_HANDICAP_DAYS:
+        low = min((point["handicap_index"] for point in series if as_utc(point["recorded_at"]) >= low_since), default=None)
+    else:
+        low = await db.scalar(
+            select(func.min(HandicapHistory.handicap_index))
+            .where(HandicapHistory.user_id == current_user.id, HandicapHistory.recorded_at >= low_since)
+        )
+
+    handicap = current_user.handicap_index
+    return {
+        "handicap_index": float(handicap) if handicap is not None else None,
+        "low_handicap_index": float(low) if low is not None else None,
+        "changes": len(series),
+        "points": downsample(series, points),
+    }
@@ -0,0 +1,376 @@
+"""
+Recompute every user's score differentials and handicap index, for example after course ratings
+were corrected or the handicap rules in handicap.py changed.
+
+Completed rounds are streamed ordered by user and end time in one query. Users are cut into
+chunks that a process pool evaluates with the NumPy arithmetic of handicap_arrays, and the
+results are written back with executemany UPDATEs, one transaction per chunk, together with a
+handicap_history row per changed handicap. The outcome per user is the same as calling
+update_user_handicap once with the corrected differentials.
+
+    python -m app.api.v1.core.course_endpoints.handicap_recompute --workers 4
+    python -m app.api.v1.core.course_endpoints.handicap_recompute --dry-run --diff-limit 50
+
+--dry-run writes nothing and prints every changed handicap and the number of changed rounds.
+
+Users who complete, change or delete a round, or get a new handicap from the API, between the
+stream read and the write of their chunk are skipped and reported with a "skipped" event, their
+rows are left as the API wrote them. Run the job again to recompute them.
+
+The job runs outside the API server and cannot reach its in-process token cache. Users served
+from a cached snapshot keep seeing their previous handicap_index for up to
+TOKEN_CACHE_TTL_SECONDS after the job has finished.
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import numpy as np
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.db_setup import engine
+from app.api.v1.core.models import Users, Rounds, CourseTees, HandicapHistory, HandicapWindows
+from .handicap_arrays import handicap_indexes, score_differentials, windows_from_ragged
+from .handicap_window import LOW_HANDICAP_DAYS
+
+DEFAULT_CHUNK_USERS = 500
+STREAM_BATCH_SIZE = 10000
+
+
+@dataclass
+class UserChunk:
+    """Completed rounds of consecutive users as flat arrays, ordered by user and end time"""
+    user_ids: list[int] = field(default_factory=list)
+    handicaps: list[float] = field(default_factory=list)  # nan for users without a handicap
+    handicap_updated_at: list[datetime | None] = field(default_factory=list)  # as read, to detect writes since
+    low_handicaps: list[float] = field(default_factory=list)  # 12 month low, nan without history
+    offsets: list[int] = field(default_factory=lambda: [0])
+    round_ids: list[int] = field(default_factory=list)
+    round_versions: list[int] = field(default_factory=list)
+    shots: list[float] = field(default_factory=list)
+    ratings: list[float] = field(default_factory=list)  # nan where the round has no rated tee
+    slopes: list[float] = field(default_factory=list)
+    holes: list[int] = field(default_factory=list)
+    pars: list[float] = field(default_factory=list)
+    stored_differentials: list[float] = field(default_factory=list)  # nan when not set
+    stored_included: list[bool] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+
+@dataclass
+class ChunkResult:
+    user_ids: np.ndarray
+    handicap_updated_at: list[datetime | None]
+    old_handicaps: np.ndarray
+    low_handicaps: np.ndarray
+    new_handicaps: np.ndarray  # nan where the handicap stays as it is
+    offsets: np.ndarray  # per user into the round arrays, with the end as last entry
+    round_ids: np.ndarray
+    round_versions: np.ndarray
+    differentials: np.ndarray
+    included: np.ndarray
+    changed_differential: np.ndarray  # per round
+    changed_included: np.ndarray  # per round
+    rounds: int
+
+
+def as_float(value) -> float:
+    return float(value) if value is not None else np.nan
+
+
+def stream_chunks(session: Session, chunk_users: int) -> Iterator[UserChunk]:
+    """Read all completed rounds in one streamed query and cut them into chunks of users"""
+    since = datetime.now(timezone.utc) - timedelta(days=LOW_HANDICAP_DAYS)
+    lows = (
+        select(HandicapHistory.user_id, func.min(HandicapHistory.handicap_index).label("low_handicap"))
+        .where(HandicapHistory.recorded_at >= since)
+        .group_by(HandicapHistory.user_id)
+        .subquery()
+    )
+    query = (
+        select(
+            Rounds.user_id, Users.handicap_index, Users.last_handicap_update, lows.c.low_handicap,
+            Rounds.id, Rounds.version, Rounds.total_shots,
+            Rounds.total_holes, CourseTees.mens_rating, CourseTees.mens_slope, CourseTees.total_par,
+            Rounds.score_differential, Rounds.included_in_handicap,
+        )
+        .join(Users, Users.id == Rounds.user_id)
+        .outerjoin(lows, lows.c.user_id == Rounds.user_id)
+        .outerjoin(CourseTees, CourseTees.id == Rounds.tee_id)
+        .where(Rounds.is_completed == True)
+        .order_by(Rounds.user_id, Rounds.end_time, Rounds.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    chunk = UserChunk()
+    for row in session.execute(query):
+        if not chunk.user_ids or chunk.user_ids[-1] != row.user_id:
+            if len(chunk) >= chunk_users:
+                yield chunk
+                chunk = UserChunk()
+            if chunk.user_ids:
+                chunk.offsets.append(len(chunk.round_ids))
+            chunk.user_ids.append(row.user_id)
+            chunk.handicaps.append(as_float(row.handicap_index))
+            chunk.handicap_updated_at.append(row.last_handicap_update)
+            chunk.low_handicaps.append(as_float(row.low_handicap))
+        chunk.round_ids.append(row.id)
+        chunk.round_versions.append(row.version)
+        chunk.shots.append(as_float(row.total_shots))
+        chunk.ratings.append(as_float(row.mens_rating))
+        chunk.slopes.append(as_float(row.mens_slope))
+        chunk.holes.append(row.total_holes)
+        chunk.pars.append(as_float(row.total_par))
+        chunk.stored_differentials.append(as_float(row.score_differential))
+        chunk.stored_included.append(bool(row.included_in_handicap))
+    if chunk.user_ids:
+        yield chunk
+
+
+def evaluate_chunk(chunk: UserChunk) -> ChunkResult:
+    """Differentials, handicaps and included flags of one chunk, run in a worker process"""
+    offsets = np.array(chunk.offsets + [len(chunk.round_ids)])
+    round_ids = np.array(chunk.round_ids, dtype=np.int64)
+    stored = np.array(chunk.stored_differentials)
+
+    # Rounds without a rated tee keep the differential they have, like update_round_handicap_data
+    with np.errstate(divide="ignore", invalid="ignore"):
+        computed = score_differentials(chunk.shots, chunk.ratings, chunk.slopes, chunk.holes, chunk.pars)
+    rated = ~np.isnan(computed)
+    differentials = np.where(rated, computed, stored)
+
+    # Windows hold the rounds that have a differential, per user oldest first
+    owners = np.repeat(np.arange(len(chunk)), np.diff(offsets))
+    counted = ~np.isnan(differentials)
+    counted_offsets = np.concatenate(([0], np.cumsum(np.bincount(owners[counted], minlength=len(chunk)))))
+    sorted_differentials, sorted_ids, counts = windows_from_ragged(
+        differentials[counted], round_ids[counted], counted_offsets
+    )
+    old_handicaps = np.array(chunk.handicaps)
+    low_handicaps = np.array(chunk.low_handicaps)
+    new_handicaps, to_use = handicap_indexes(sorted_differentials, counts, old_handicaps, low_handicaps)
+
+    # Users whose handicap is recalculated get exactly their best rounds flagged, the flags of
+    # the others are left alone as update_user_handicap does
+    best = np.where(np.arange(sorted_ids.shape[1]) < to_use[:, None], sorted_ids, -1)
+    stored_included = np.array(chunk.stored_included, dtype=bool)
+    recalculated = ~np.isnan(new_handicaps)[owners]
+    included = np.where(recalculated, np.isin(round_ids, best[best >= 0]), stored_included)
+
+    return ChunkResult(
+        user_ids=np.array(chunk.user_ids),
+        handicap_updated_at=chunk.handicap_updated_at,
+        old_handicaps=old_handicaps,
+        low_handicaps=low_handicaps,
+        new_handicaps=new_handicaps,
+        offsets=offsets,
+        round_ids=round_ids,
+        round_versions=np.array(chunk.round_versions, dtype=np.int64),
+        differentials=differentials,
+        included=included,
+        changed_differential=rated & ~np.isclose(differentials, stored, rtol=0, atol=1e-9, equal_nan=True),
+        changed_included=included != stored_included,
+        rounds=len(round_ids),
+    )
+
+
+def evaluate_chunks(pool: ProcessPoolExecutor, chunks: Iterator[UserChunk], in_flight: int) -> Iterator[ChunkResult]:
+    """Evaluate chunks in the pool in order, reading ahead at most in_flight chunks"""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(evaluate_chunk, chunk))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def changed_handicaps(result: ChunkResult) -> np.ndarray:
+    """Positions of the users whose handicap index changes"""
+    old = np.round(result.old_handicaps, 1)
+    new = np.round(result.new_handicaps, 1)
+    return np.flatnonzero(~np.isnan(new) & (new != old))
+
+
+def lock_stale_users(session: Session, result: ChunkResult) -> np.ndarray:
+    """
+    Lock the chunk's users like the live handicap update does, window row first, then the user,
+    and flag the users whose handicap or completed rounds changed since they were streamed
+    """
+    user_ids = result.user_ids.tolist()
+    session.execute(
+        select(HandicapWindows.id).where(HandicapWindows.user_id.in_(user_ids)).with_for_update()
+    )
+    updated_at = dict(session.execute(
+        select(Users.id, Users.last_handicap_update).where(Users.id.in_(user_ids)).with_for_update()
+    ).all())
+    rounds = {}
+    for user_id, round_id, version in session.execute(
+        select(Rounds.user_id, Rounds.id, Rounds.version)
+        .where(Rounds.user_id.in_(user_ids), Rounds.is_completed == True)
+    ):
+        rounds.setdefault(user_id, set()).add((round_id, version))
+
+    stale = np.zeros(len(user_ids), dtype=bool)
+    for i, user_id in enumerate(user_ids):
+        start, end = result.offsets[i], result.offsets[i + 1]
+        streamed = set(zip(result.round_ids[start:end].tolist(), result.round_versions[start:end].tolist()))
+        stale[i] = (
+            user_id not in updated_at
+            or updated_at[user_id] != result.handicap_updated_at[i]
+            or rounds.get(user_id, set()) != streamed
+        )
+    return stale
+
+
+def write_chunk(session: Session, result: ChunkResult) -> np.ndarray:
+    """
+    Write the changed rounds and handicaps of one chunk in one transaction. Users changed since
+    the stream read are left alone, returns their mask
+    """
+    stale = lock_stale_users(session, result)
+    owners = np.repeat(np.arange(len(result.user_ids)), np.diff(result.offsets))
+
+    rounds_table = Rounds.__table__
+    changed_rounds = np.flatnonzero((result.changed_differential | result.changed_included) & ~stale[owners])
+    if len(changed_rounds):
+        # The version guards the rounds in case the lock is not honoured, as on SQLite
+        session.execute(
+            update(rounds_table)
+            .where(rounds_table.c.id == bindparam("round_id"), rounds_table.c.version == bindparam("seen_version"))
+            .values(
+                score_differential=bindparam("differential"),
+                included_in_handicap=bindparam("included"),
+                version=rounds_table.c.version + 1,
+            ),
+            [
+                {
+                    "round_id": int(result.round_ids[i]),
+                    "seen_version": int(result.round_versions[i]),
+                    "differential": None if np.isnan(result.differentials[i]) else float(result.differentials[i]),
+                    "included": bool(result.included[i]),
+                }
+                for i in changed_rounds
+            ]
+        )
+
+    recalculated = np.flatnonzero(~np.isnan(result.new_handicaps) & ~stale)
+    if len(recalculated):
+        users_table = Users.__table__
+        now = datetime.now(timezone.utc)
+        session.execute(
+            update(users_table)
+            .where(
+                users_table.c.id == bindparam("user_id"),
+                users_table.c.last_handicap_update.is_not_distinct_from(bindparam("seen_updated_at")),
+            )
+            .values(handicap_index=bindparam("handicap_index"), last_handicap_update=bindparam("updated_at")),
+            [
+                {
+                    "user_id": int(result.user_ids[i]),
+                    "seen_updated_at": result.handicap_updated_at[i],
+                    "handicap_index": float(result.new_handicaps[i]),
+                    "updated_at": now,
+                }
+                for i in recalculated
+            ]
+        )
+
+    changed = changed_handicaps(result)
+    changed = changed[~stale[changed]]
+    if len(changed):
+        # Same rows record_handicap_change writes, the new index can only lower the 12 month low
+        now = datetime.now(timezone.utc)
+        new_handicaps = np.round(result.new_handicaps[changed], 1)
+        low_handicaps = np.fmin(result.low_handicaps[changed], new_handicaps)
+        session.execute(insert(HandicapHistory), [
+            {
+                "user_id": int(user_id),
+                "handicap_index": float(handicap),
+                "low_handicap_index": float(low),
+                "recorded_at": now,
+            }
+            for user_id, handicap, low in zip(result.user_ids[changed], new_handicaps, low_handicaps)
+        ])
+
+    # Windows are rebuilt from the corrected differentials on the next handicap update
+    written = result.user_ids[~stale].tolist()
+    if written:
+        session.execute(delete(HandicapWindows).where(HandicapWindows.user_id.in_(written)))
+    session.commit()
+    return stale
+
+
+def recompute_handicaps(workers: int | None, chunk_users: int = DEFAULT_CHUNK_USERS, dry_run: bool = False) -> Iterator[dict]:
+    """
+    Recompute all users and yield one event per changed handicap
+    {"event": "user", ...} (only with dry_run), one per user changed while the job ran
+    {"event": "skipped", ...}, and {"event": "done", ...} with the totals.
+    """
+    counts = {"users": 0, "rounds": 0, "changed_handicaps": 0, "changed_rounds": 0, "skipped_users": 0}
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with Session(engine) as read_session, Session(engine) as write_session, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        # Chunks are evaluated in the pool while the stream keeps reading
+        chunks = stream_chunks(read_session, chunk_users)
+        for result in evaluate_chunks(pool, chunks, in_flight=2 * workers):
+            if dry_run:
+                stale = np.zeros(len(result.user_ids), dtype=bool)
+            else:
+                stale = write_chunk(write_session, result)
+                for user_id in result.user_ids[stale]:
+                    yield {"event": "skipped", "user_id": int(user_id)}
+            owners = np.repeat(np.arange(len(result.user_ids)), np.diff(result.offsets))
+            changed = changed_handicaps(result)
+            counts["users"] += len(result.user_ids)
+            counts["rounds"] += result.rounds
+            counts["skipped_users"] += int(np.count_nonzero(stale))
+            counts["changed_handicaps"] += int(np.count_nonzero(~stale[changed]))
+            counts["changed_rounds"] += int(np.count_nonzero(
+                (result.changed_differential | result.changed_included) & ~stale[owners]
+            ))
+            if dry_run:
+                for i in changed:
+                    old = result.old_handicaps[i]
+                    yield {
+                        "event": "user",
+                        "user_id": int(result.user_ids[i]),
+                        "old_handicap": None if np.isnan(old) else round(float(old), 1),
+                        "new_handicap": round(float(result.new_handicaps[i]), 1),
+                    }
+
+    elapsed = time.perf_counter() - start
+    yield {
+        "event": "done",
+        "dry_run": dry_run,
+        **counts,
+        "seconds": round(elapsed, 2),
+        "rounds_per_second": round(counts["rounds"] / elapsed, 1) if elapsed else None,
+        "users_per_second": round(counts["users"] / elapsed, 1) if elapsed else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the CPU count")
+    parser.add_argument("--chunk-users", type=int, default=DEFAULT_CHUNK_USERS)
+    parser.add_argument("--dry-run", action="store_true", help="Print the changes without writing them")
+    parser.add_argument("--diff-limit", type=int, default=None, help="Print at most this many changed users")
+    args = parser.parse_args()
+
+    printed = 0
+    for event in recompute_handicaps(args.workers, args.chunk_users, args.dry_run):
+        if event["event"] == "user":
+            printed += 1
+            if args.diff_limit is not None and printed > args.diff_limit:
+                continue
+        print(json.dumps(event))
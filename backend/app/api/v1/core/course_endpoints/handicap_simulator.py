@@ -0,0 +1,134 @@
+"""
+What-if handicap projections. Hypothetical rounds go through calculate_score_differential and the
+selection and cap rules of handicap.py against a copy of the user's window, nothing is written.
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.db_setup import get_async_db
+from app.security import get_current_user
+from app.api.v1.core.models import Users, CourseTees
+from app.api.v1.core.schemas import HandicapCurveSchema, HandicapProjectionSchema, HandicapSimulationSchema
+from .handicap import calculate_score_differential, simulate_handicap
+from .handicap_arrays import next_round_handicaps, score_differentials
+from .handicap_window import WINDOW_SIZE, read_handicap_window
+
+router = APIRouter(prefix="/handicap", tags=["handicap"])
+
+MAX_CURVE_SCORES = 200
+
+
+async def get_rated_tees(db: AsyncSession, course_tees: set[tuple[int, int]]) -> dict[int, CourseTees]:
+    """Tees by id with their course, 404 when a tee is not part of the course"""
+    tees = {
+        tee.id: tee
+        for tee in (await db.scalars(
+            select(CourseTees)
+            .options(joinedload(CourseTees.course))
+            .where(CourseTees.id.in_({tee_id for _, tee_id in course_tees}))
+        )).all()
+    }
+    for course_id, tee_id in course_tees:
+        tee = tees.get(tee_id)
+        if tee is None or tee.course_id != course_id:
+            raise HTTPException(status_code=404, detail="Tee not found")
+        # Same ratings update_round_handicap_data uses
+        if tee.mens_rating is None or not tee.mens_slope or tee.total_par is None:
+            raise HTTPException(status_code=400, detail="Tee has no course rating")
+    return tees
+
+
+@router.post("/simulate", response_model=HandicapProjectionSchema)
+async def simulate_rounds(
+    simulation: HandicapSimulationSchema,
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Projected handicap after the given rounds, played in order from the user's current handicap"""
+    tees = await get_rated_tees(db, {(played.course_id, played.tee_id) for played in simulation.rounds})
+    differentials = []
+    for played in simulation.rounds:
+        tee = tees[played.tee_id]
+        differentials.append(calculate_score_differential(
+            adjusted_score=played.score,
+            course_rating=float(tee.mens_rating),
+            slope_rating=float(tee.mens_slope),
+            total_holes=tee.course.total_holes,
+            total_par=tee.total_par
+        ))
+
+    window, lows = await db.run_sync(read_handicap_window, current_user.id)
+    now = datetime.now(timezone.utc).timestamp()
+    low = lows.low(now)
+    handicap = float(current_user.handicap_index) if current_user.handicap_index is not None else None
+    projections = simulate_handicap(window, lows, handicap, differentials, now)
+
+    return {
+        "handicap_index": handicap,
+        "low_handicap_index": low,
+        "projected_handicap_index": projections[-1][0],
+        "rounds": [
+            {
+                **played.model_dump(),
+                "score_differential": differential,
+                "handicap_index": projected,
+                "rounds_used": rounds_used,
+            }
+            for played, differential, (projected, rounds_used) in zip(simulation.rounds, differentials, projections)
+        ],
+    }
+
+
+@router.get("/simulate/curve", response_model=HandicapCurveSchema)
+async def get_handicap_curve(
+    course_id: int = Query(...),
+    tee_id: int = Query(...),
+    min_score: int | None = Query(None, ge=1, description="Defaults to 10 under par"),
+    max_score: int | None = Query(None, ge=1, description="Defaults to 3 over par per hole"),
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Projected handicap for every score of a next round on the tee, computed in one vectorized
+    pass so a client can render a slider from a single response.
+    """
+    tee = (await get_rated_tees(db, {(course_id, tee_id)}))[tee_id]
+    total_holes = tee.course.total_holes
+    min_score = max(tee.total_par - 10, 1) if min_score is None else min_score
+    max_score = tee.total_par + 3 * total_holes if max_score is None else max_score
+    if min_score > max_score or max_score - min_score >= MAX_CURVE_SCORES:
+        raise HTTPException(status_code=400, detail=f"Score range must hold 1 to {MAX_CURVE_SCORES} scores")
+
+    window, lows = await db.run_sync(read_handicap_window, current_user.id)
+    # The next round evicts the oldest one of a full window whatever its score
+    if len(window) >= WINDOW_SIZE:
+        window.remove(window.by_time[0][1])
+    low = lows.low(datetime.now(timezone.utc).timestamp())
+    handicap = float(current_user.handicap_index) if current_user.handicap_index is not None else None
+
+    scores = list(range(min_score, max_score + 1))
+    differentials = score_differentials(
+        scores, float(tee.mens_rating), float(tee.mens_slope), total_holes, tee.total_par
+    )
+    projected, _ = next_round_handicaps(window.differentials(), differentials, handicap, low)
+
+    return {
+        "course_id": course_id,
+        "tee_id": tee_id,
+        "handicap_index": handicap,
+        "low_handicap_index": low,
+        "points": [
+            {
+                "score": score,
+                "score_differential": float(differential),
+                # The stored index has one decimal
+                "handicap_index": handicap if np.isnan(new) else round(float(new), 1),
+            }
+            for score, differential, new in zip(scores, differentials, projected)
+        ],
+    }
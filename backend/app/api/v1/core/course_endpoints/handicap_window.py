@@ -0,0 +1,215 @@
+"""
+Rolling window of a user's last 20 score differentials.
+
+The window keeps its rounds sorted twice, with bisect: by recency (end_time, round id) to know
+which round drops out when a newer one arrives, and by (differential, round id) so the best k
+differentials are a prefix. Equal differentials are ordered by round id, so the rounds that
+count towards the handicap are picked by id and a tie never selects more than k rounds.
+
+The window is persisted per user in handicap_windows and updated in place by complete_round and
+delete_round. It is built from the rounds table when missing, which is also how an import or a
+bulk change resets it: by deleting the row.
+
+The same row holds RollingLow, the user's lowest handicap index of the last 12 months that the
+soft and hard caps are measured from. It is rebuilt from handicap_history.
+"""
+import bisect
+import json
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import desc, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.token_cache import as_utc
+from app.api.v1.core.models import HandicapHistory, HandicapWindows, Rounds
+
+WINDOW_SIZE = 20
+LOW_HANDICAP_DAYS = 365
+
+
+def end_timestamp(end_time: datetime | None) -> float:
+    return as_utc(end_time).timestamp() if end_time is not None else 0.0
+
+
+class HandicapWindow:
+    def __init__(self, entries=()):
+        self.by_time: list[tuple[float, int]] = []  # (end timestamp, round id), oldest first
+        self.by_differential: list[tuple[float, int]] = []  # (differential, round id), best first
+        self.entries: dict[int, tuple[float, float]] = {}  # round id -> (end timestamp, differential)
+        self.rebuilt = False  # Built from the rounds table instead of decoded from handicap_windows
+        for round_id, ended_at, differential in entries:
+            self.add(round_id, ended_at, differential)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, round_id: int) -> bool:
+        return round_id in self.entries
+
+    def add(self, round_id: int, ended_at: float, differential: float) -> bool:
+        """
+        Add a round, evicting the oldest one when the window is full.
+        Returns False when the round is already held or is older than every round of a full window.
+        """
+        if round_id in self.entries:
+            return False
+        key = (ended_at, round_id)
+        if len(self.entries) >= WINDOW_SIZE and key < self.by_time[0]:
+            return False
+        differential = float(differential)
+        bisect.insort(self.by_time, key)
+        bisect.insort(self.by_differential, (differential, round_id))
+        self.entries[round_id] = (ended_at, differential)
+        if len(self.entries) > WINDOW_SIZE:
+            self.remove(self.by_time[0][1])
+        return True
+
+    def remove(self, round_id: int) -> bool:
+        entry = self.entries.pop(round_id, None)
+        if entry is None:
+            return False
+        ended_at, differential = entry
+        del self.by_time[bisect.bisect_left(self.by_time, (ended_at, round_id))]
+        del self.by_differential[bisect.bisect_left(self.by_differential, (differential, round_id))]
+        return True
+
+    def differentials(self) -> list[float]:
+        """All differentials, lowest first"""
+        return [differential for differential, _ in self.by_differential]
+
+    def best_round_ids(self, count: int) -> list[int]:
+        return [round_id for _, round_id in self.by_differential[:count]]
+
+    def to_json(self) -> str:
+        return json.dumps([[round_id, ended_at, differential] for round_id, (ended_at, differential) in self.entries.items()])
+
+    @classmethod
+    def from_json(cls, data: str) -> "HandicapWindow":
+        return cls(json.loads(data))
+
+
+class RollingLow:
+    """
+    Lowest handicap index of the last LOW_HANDICAP_DAYS days, as a monotonic queue. Values grow
+    from front to back, a new value drops every queued value that is not lower, and expired
+    values leave from the front, so the low is the front value. Amortized O(1) per operation.
+    """
+    def __init__(self, entries=()):
+        self.entries: deque[tuple[float, float]] = deque()  # (timestamp, handicap index)
+        for recorded_at, handicap in entries:
+            self.record(recorded_at, handicap)
+
+    def record(self, recorded_at: float, handicap: float) -> None:
+        handicap = float(handicap)
+        while self.entries and self.entries[-1][1] >= handicap:
+            self.entries.pop()
+        self.entries.append((recorded_at, handicap))
+
+    def low(self, now: float) -> float | None:
+        cutoff = now - LOW_HANDICAP_DAYS * 86400
+        while self.entries and self.entries[0][0] < cutoff:
+            self.entries.popleft()
+        return self.entries[0][1] if self.entries else None
+
+    def to_json(self) -> str:
+        return json.dumps([list(entry) for entry in self.entries])
+
+    @classmethod
+    def from_json(cls, data: str) -> "RollingLow":
+        return cls(json.loads(data))
+
+
+def recent_differentials(db: Session, user_id: int, exclude: set[int] = frozenset(), limit: int = WINDOW_SIZE):
+    """(round id, end timestamp, differential) of the user's latest completed rounds with a differential"""
+    query = (
+        select(Rounds.id, Rounds.end_time, Rounds.score_differential)
+        .where(
+            Rounds.user_id == user_id,
+            Rounds.is_completed == True,
+            Rounds.score_differential != None
+        )
+        .order_by(desc(Rounds.end_time), desc(Rounds.id))
+        .limit(limit)
+    )
+    if exclude:
+        query = query.where(Rounds.id.not_in(exclude))
+    return [
+        (round_id, end_timestamp(end_time), float(differential))
+        for round_id, end_time, differential in db.execute(query)
+    ]
+
+
+def recent_lows(db: Session, user_id: int) -> RollingLow:
+    """The user's rolling low rebuilt from the handicap history of the last 12 months"""
+    since = datetime.now(timezone.utc) - timedelta(days=LOW_HANDICAP_DAYS)
+    return RollingLow(
+        (end_timestamp(recorded_at), float(handicap))
+        for recorded_at, handicap in db.execute(
+            select(HandicapHistory.recorded_at, HandicapHistory.handicap_index)
+            .where(HandicapHistory.user_id == user_id, HandicapHistory.recorded_at >= since)
+            .order_by(HandicapHistory.recorded_at)
+        )
+    )
+
+
+def lock_handicap_window(db: Session, user_id: int) -> HandicapWindows | None:
+    return db.scalar(select(HandicapWindows).where(HandicapWindows.user_id == user_id).with_for_update())
+
+
+def load_handicap_window(db: Session, user_id: int) -> tuple[HandicapWindows, HandicapWindow]:
+    """
+    Lock and decode the user's window, building it from the latest rounds when missing.
+    The window's rebuilt flag tells whether it was built by this call.
+    """
+    row = lock_handicap_window(db, user_id)
+    if row is not None:
+        return row, HandicapWindow.from_json(row.entries)
+
+    window = HandicapWindow(recent_differentials(db, user_id))
+    # Rounds flagged by the previous implementation are reconciled on the next selection
+    included = db.scalars(
+        select(Rounds.id).where(Rounds.user_id == user_id, Rounds.included_in_handicap == True)
+    ).all()
+    lows = recent_lows(db, user_id)
+    row = HandicapWindows(
+        user_id=user_id, entries=window.to_json(), included=json.dumps(included), lows=lows.to_json()
+    )
+    try:
+        # A concurrent first load inserts the same user_id, then only the savepoint is lost
+        with db.begin_nested():
+            db.add(row)
+    except IntegrityError:
+        row = lock_handicap_window(db, user_id)
+        return row, HandicapWindow.from_json(row.entries)
+    window.rebuilt = True
+    return row, window
+
+
+def read_handicap_window(db: Session, user_id: int) -> tuple[HandicapWindow, RollingLow]:
+    """The user's window and rolling low without locking or storing anything, for simulations"""
+    row = db.scalar(select(HandicapWindows).where(HandicapWindows.user_id == user_id))
+    if row is not None:
+        return HandicapWindow.from_json(row.entries), RollingLow.from_json(row.lows)
+    return HandicapWindow(recent_differentials(db, user_id)), recent_lows(db, user_id)
+
+
+def refill_handicap_window(db: Session, user_id: int, window: HandicapWindow) -> None:
+    """Top up a window that lost rounds with the next older ones"""
+    missing = WINDOW_SIZE - len(window)
+    if missing > 0:
+        for entry in recent_differentials(db, user_id, exclude=set(window.entries), limit=missing):
+            window.add(*entry)
+
+
+def record_handicap_change(db: Session, user_id: int, handicap: float, recorded_at: datetime, lows: RollingLow) -> None:
+    """Append a new handicap index to the user's history and rolling low. Does not commit"""
+    handicap = round(handicap, 1)
+    lows.record(recorded_at.timestamp(), handicap)
+    db.add(HandicapHistory(
+        user_id=user_id,
+        handicap_index=handicap,
+        low_handicap_index=lows.low(recorded_at.timestamp()),
+        recorded_at=recorded_at,
+    ))
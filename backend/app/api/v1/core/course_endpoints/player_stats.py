@@ -0,0 +1,212 @@
+from datetime import datetime, timezone
+from typing import Iterable, Tuple
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.core.models import HoleScores, PlayerStats, Rounds
+
+HOLE_PARS = (3, 4, 5)
+ROUND_LENGTHS = (9, 18)
+
+# (par, shots, score_relative_to_par) of one hole
+HoleRow = Tuple[int, int, int]
+
+
+def is_scored(total_shots: int | None, total_par: int | None) -> bool:
+    return bool(total_shots) and bool(total_par)
+
+
+def round_contribution(
+    total_holes: int,
+    total_shots: int | None,
+    total_par: int | None,
+    holes: Iterable[HoleRow],
+) -> dict:
+    """Counter values one completed round adds to its player's PlayerStats row"""
+    contribution = {"rounds_played": 1}
+    if is_scored(total_shots, total_par):
+        contribution.update(scored_rounds=1, total_shots=total_shots, total_par=total_par)
+        if total_holes in ROUND_LENGTHS:
+            contribution[f"rounds_{total_holes}"] = 1
+            contribution[f"shots_{total_holes}"] = total_shots
+    for par, shots, score_relative_to_par in holes:
+        if shots > 0 and par in HOLE_PARS:
+            contribution[f"par{par}_holes"] = contribution.get(f"par{par}_holes", 0) + 1
+            contribution[f"par{par}_to_par"] = contribution.get(f"par{par}_to_par", 0) + score_relative_to_par
+    return contribution
+
+
+def apply_contribution(stats: PlayerStats, contribution: dict, sign: int) -> None:
+    for key, value in contribution.items():
+        setattr(stats, key, (getattr(stats, key) or 0) + sign * value)
+    stats.updated_at = datetime.now(timezone.utc)
+
+
+def min_or_none(current: int | None, value: int) -> int:
+    return value if current is None else min(current, value)
+
+
+async def refresh_best_scores(db: AsyncSession, stats: PlayerStats) -> None:
+    """Recompute the best scores with one aggregate query, needed when a best round is deleted"""
+    scored = and_(
+        Rounds.user_id == stats.user_id,
+        Rounds.is_completed == True,
+        Rounds.total_shots > 0,
+        Rounds.total_par > 0,
+    )
+    best = (await db.execute(
+        select(
+            func.min(Rounds.score_relative_to_par),
+            func.min(case((Rounds.total_holes == 9, Rounds.total_shots))),
+            func.min(case((Rounds.total_holes == 18, Rounds.total_shots))),
+        ).where(scored)
+    )).one()
+    stats.best_score_to_par, stats.best_shots_9, stats.best_shots_18 = best
+
+
+async def build_player_stats(db: AsyncSession, user_id: int) -> PlayerStats:
+    """Compute a user's aggregates from scratch, used the first time they are needed"""
+    scored = and_(Rounds.total_shots > 0, Rounds.total_par > 0)
+
+    def count_if(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    def sum_if(condition, column):
+        return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+    totals = (await db.execute(
+        select(
+            func.count(Rounds.id),
+            count_if(scored),
+            sum_if(scored, Rounds.total_shots),
+            sum_if(scored, Rounds.total_par),
+            count_if(and_(scored, Rounds.total_holes == 9)),
+            sum_if(and_(scored, Rounds.total_holes == 9), Rounds.total_shots),
+            count_if(and_(scored, Rounds.total_holes == 18)),
+            sum_if(and_(scored, Rounds.total_holes == 18), Rounds.total_shots),
+        ).where(Rounds.user_id == user_id, Rounds.is_completed == True)
+    )).one()
+
+    stats = PlayerStats(
+        user_id=user_id,
+        rounds_played=totals[0],
+        scored_rounds=totals[1],
+        total_shots=totals[2],
+        total_par=totals[3],
+        rounds_9=totals[4],
+        shots_9=totals[5],
+        rounds_18=totals[6],
+        shots_18=totals[7],
+        updated_at=datetime.now(timezone.utc),
+    )
+    for par in HOLE_PARS:
+        setattr(stats, f"par{par}_holes", 0)
+        setattr(stats, f"par{par}_to_par", 0)
+
+    by_par = await db.execute(
+        select(HoleScores.par, func.count(HoleScores.id), func.sum(HoleScores.score_relative_to_par))
+        .join(Rounds, Rounds.id == HoleScores.round_id)
+        .where(
+            Rounds.user_id == user_id,
+            Rounds.is_completed == True,
+            HoleScores.shots > 0,
+            HoleScores.par.in_(HOLE_PARS),
+        )
+        .group_by(HoleScores.par)
+    )
+    for par, holes, to_par in by_par:
+        setattr(stats, f"par{par}_holes", holes)
+        setattr(stats, f"par{par}_to_par", to_par)
+
+    await refresh_best_scores(db, stats)
+    db.add(stats)
+    await db.flush()
+    return stats
+
+
+async def lock_player_stats(db: AsyncSession, user_id: int) -> PlayerStats | None:
+    return await db.scalar(
+        select(PlayerStats).where(PlayerStats.user_id == user_id).with_for_update()
+    )
+
+
+async def record_completed_round(db: AsyncSession, round_obj: Rounds) -> None:
+    """Add a just completed round to its player's aggregates, in the caller's transaction"""
+    stats = await lock_player_stats(db, round_obj.user_id)
+    if stats is None:
+        # The first build already sees this round as completed
+        await db.flush()
+        try:
+            async with db.begin_nested():
+                await build_player_stats(db, round_obj.user_id)
+            return
+        except IntegrityError:
+            # Built by a concurrent request, which could not see this round yet. Only the
+            # savepoint is rolled back, the completion itself stands
+            stats = await lock_player_stats(db, round_obj.user_id)
+
+    apply_contribution(stats, round_contribution(
+        round_obj.total_holes,
+        round_obj.total_shots,
+        round_obj.total_par,
+        ((hole.par, hole.shots, hole.score_relative_to_par) for hole in round_obj.hole_scores),
+    ), sign=1)
+    if is_scored(round_obj.total_shots, round_obj.total_par):
+        stats.best_score_to_par = min_or_none(stats.best_score_to_par, round_obj.score_relative_to_par)
+        if round_obj.total_holes == 9:
+            stats.best_shots_9 = min_or_none(stats.best_shots_9, round_obj.total_shots)
+        elif round_obj.total_holes == 18:
+            stats.best_shots_18 = min_or_none(stats.best_shots_18, round_obj.total_shots)
+
+
+async def record_deleted_round(
+    db: AsyncSession,
+    user_id: int,
+    total_holes: int,
+    total_shots: int | None,
+    total_par: int | None,
+    score_relative_to_par: int | None,
+    holes: Iterable[HoleRow],
+) -> None:
+    """Remove an already deleted completed round from its player's aggregates"""
+    stats = await lock_player_stats(db, user_id)
+    if stats is None:
+        # Built from the remaining rounds when first read
+        return
+
+    apply_contribution(stats, round_contribution(total_holes, total_shots, total_par, holes), sign=-1)
+    if is_scored(total_shots, total_par) and (
+        score_relative_to_par == stats.best_score_to_par
+        or (total_holes == 9 and total_shots == stats.best_shots_9)
+        or (total_holes == 18 and total_shots == stats.best_shots_18)
+    ):
+        await refresh_best_scores(db, stats)
+
+
+def average(total: int, count: int, digits: int = 1) -> float | None:
+    return round(total / count, digits) if count else None
+
+
+def summarize_player_stats(stats: PlayerStats) -> dict:
+    """Response values of GET /rounds/stats, derived without touching the database"""
+    return {
+        "rounds_played": stats.rounds_played,
+        "scored_rounds": stats.scored_rounds,
+        "total_shots": stats.total_shots,
+        "total_par": stats.total_par,
+        "average_efficiency": round(stats.total_shots / stats.total_par * 100) if stats.total_par else None,
+        "best_score_to_par": stats.best_score_to_par,
+        "rounds_9": stats.rounds_9,
+        "average_shots_9": average(stats.shots_9, stats.rounds_9),
+        "best_shots_9": stats.best_shots_9,
+        "rounds_18": stats.rounds_18,
+        "average_shots_18": average(stats.shots_18, stats.rounds_18),
+        "best_shots_18": stats.best_shots_18,
+        "average_to_par_by_hole_par": {
+            par: average(getattr(stats, f"par{par}_to_par"), getattr(stats, f"par{par}_holes"), 2)
+            for par in HOLE_PARS
+        },
+        "updated_at": stats.updated_at,
+    }
@@ -0,0 +1,301 @@
+"""
+Bulk import of historical rounds from CSV or NDJSON.
+
+CSV files need a header with course_name, tee_name, played_at and scores, and may add notes.
+scores holds the shots per hole separated by semicolons, for example 5;4;3;6;...
+NDJSON files hold one object per line with the same keys, scores being a list of integers.
+
+Rounds are validated row by row, inserted in batches and committed per batch. A bad row is
+reported and skipped without aborting the import. The handicap is recomputed once at the end.
+
+The endpoint POST /v1/rounds/import and the command line share this code:
+
+    python -m app.api.v1.core.course_endpoints.round_import --email player@example.com rounds.csv
+
+An import from the command line does not reach the API server's in-process caches. Until their
+entries expire, after TOKEN_CACHE_TTL_SECONDS and ANALYTICS_CACHE_TTL_SECONDS, the server may
+still show the user's previous handicap_index and course analytics.
+"""
+import argparse
+import codecs
+import csv
+import json
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Literal
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.analytics_cache import analytics_cache
+from app.db_setup import engine
+from app.security import Principal, get_current_principal
+from app.token_cache import token_cache
+from app.api.v1.core.models import (
+    Users,
+    Rounds,
+    HoleScores,
+    GolfCourses,
+    CourseTees,
+    PlayerStats,
+    HandicapWindows
+)
+from .handicap import calculate_score_differential, update_user_handicap
+
+router = APIRouter(prefix="/rounds", tags=["rounds"])
+
+DEFAULT_BATCH_SIZE = 200
+REQUIRED_FIELDS = ("course_name", "tee_name", "played_at", "scores")
+
+ImportFormat = Literal["csv", "ndjson"]
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def parse_rows(lines: Iterable[str], import_format: ImportFormat) -> Iterator[tuple[int, dict | ImportRowError]]:
+    """Yield (row number, raw row) pairs, or the parse error of a row that could not be read"""
+    if import_format == "csv":
+        reader = csv.DictReader(lines)
+        for row_number, row in enumerate(reader, start=2):  # Row 1 is the header
+            try:
+                row["scores"] = [int(shots) for shots in (row.get("scores") or "").split(";") if shots.strip()]
+                yield row_number, row
+            except ValueError:
+                yield row_number, ImportRowError("scores must be integers separated by semicolons")
+    else:
+        for row_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError
+                yield row_number, row
+            except ValueError:
+                yield row_number, ImportRowError("Line is not a JSON object")
+
+
+class CourseResolver:
+    """Resolves course and tee names to tees with their holes, one query per distinct pair"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._tees = {}
+
+    def resolve(self, course_name: str, tee_name: str) -> CourseTees:
+        key = (course_name.strip().lower(), tee_name.strip().lower())
+        if key not in self._tees:
+            self._tees[key] = self.db.scalar(
+                select(CourseTees)
+                .join(GolfCourses, GolfCourses.id == CourseTees.course_id)
+                .options(selectinload(CourseTees.course), selectinload(CourseTees.holes))
+                .where(func.lower(GolfCourses.course_name) == key[0], func.lower(CourseTees.tee_name) == key[1])
+                .limit(1)
+            )
+        tee = self._tees[key]
+        if tee is None:
+            raise ImportRowError(f"Unknown course or tee: {course_name} / {tee_name}")
+        return tee
+
+
+def build_round(row: dict, user_id: int, resolver: CourseResolver) -> tuple[dict, list[dict]]:
+    """Validate a raw row and return the round values and its hole score values"""
+    missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+    if missing:
+        raise ImportRowError(f"Missing {', '.join(missing)}")
+
+    tee = resolver.resolve(str(row["course_name"]), str(row["tee_name"]))
+    holes = sorted(tee.holes, key=lambda hole: hole.hole_number)
+
+    scores = row["scores"]
+    if not isinstance(scores, list) or not all(isinstance(shots, int) and shots > 0 for shots in scores):
+        raise ImportRowError("scores must be a list of positive integers")
+    if len(scores) != len(holes):
+        raise ImportRowError(f"Expected {len(holes)} scores for {tee.course.course_name} {tee.tee_name}, got {len(scores)}")
+
+    try:
+        played_at = datetime.fromisoformat(str(row["played_at"]))
+    except ValueError:
+        raise ImportRowError("played_at must be an ISO 8601 date or datetime")
+    if played_at.tzinfo is None:
+        played_at = played_at.replace(tzinfo=timezone.utc)
+
+    total_shots = sum(scores)
+    total_par = sum(hole.par for hole in holes)
+    score_differential = None
+    if tee.mens_rating and tee.mens_slope:
+        score_differential = calculate_score_differential(
+            adjusted_score=total_shots,
+            course_rating=float(tee.mens_rating),
+            slope_rating=float(tee.mens_slope),
+            total_holes=tee.course.total_holes,
+            total_par=tee.total_par or total_par
+        )
+
+    round_values = {
+        "user_id": user_id,
+        "course_name": tee.course.course_name,
+        "course_id": tee.course_id,
+        "tee_id": tee.id,
+        "total_holes": tee.course.total_holes,
+        "start_time": played_at,
+        "end_time": played_at,
+        "total_shots": total_shots,
+        "total_par": total_par,
+        "score_relative_to_par": total_shots - total_par,
+        "score_differential": score_differential,
+        "included_in_handicap": False,
+        "is_completed": True,
+        "notes": row.get("notes") or None,
+    }
+    hole_values = [
+        {
+            "hole_number": hole.hole_number,
+            "par": hole.par,
+            "shots": shots,
+            "score_relative_to_par": shots - hole.par,
+            "completed_at": played_at,
+        }
+        for hole, shots in zip(holes, scores)
+    ]
+    return round_values, hole_values
+
+
+def insert_batch(db: Session, batch: list[tuple[dict, list[dict]]]) -> None:
+    """Insert a batch of rounds with one multi-row INSERT for the rounds and one for their holes"""
+    round_ids = db.scalars(
+        insert(Rounds).returning(Rounds.id, sort_by_parameter_order=True),
+        [round_values for round_values, _ in batch]
+    ).all()
+    hole_rows = [
+        {"round_id": round_id, **hole}
+        for round_id, (_, holes) in zip(round_ids, batch)
+        for hole in holes
+    ]
+    if hole_rows:
+        db.execute(insert(HoleScores), hole_rows)
+
+
+def import_rounds(
+    db: Session,
+    user_id: int,
+    lines: Iterable[str],
+    import_format: ImportFormat,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    invalidate_caches: bool = True,
+) -> Iterator[dict]:
+    """
+    Import rounds for a user and yield progress events:
+    {"event": "error", "row": ..., "error": ...} for every rejected row,
+    {"event": "progress", ...} after every committed batch and {"event": "done", ...} at the end.
+    invalidate_caches drops the user's cached snapshots and course analytics, which only reaches
+    the caches of the process running the import.
+    """
+    resolver = CourseResolver(db)
+    counts = {"rows": 0, "imported": 0, "failed": 0}
+    course_ids = set()
+    batch, batch_rows = [], []
+
+    def flush_batch():
+        try:
+            insert_batch(db, batch)
+            db.commit()
+        except Exception as error:
+            db.rollback()
+            counts["failed"] += len(batch)
+            return [{"event": "error", "row": row_number, "error": f"Batch insert failed: {error}"} for row_number in batch_rows]
+        counts["imported"] += len(batch)
+        course_ids.update(round_values["course_id"] for round_values, _ in batch)
+        return []
+
+    for row_number, row in parse_rows(lines, import_format):
+        counts["rows"] += 1
+        try:
+            if isinstance(row, ImportRowError):
+                raise row
+            batch.append(build_round(row, user_id, resolver))
+            batch_rows.append(row_number)
+        except ImportRowError as error:
+            counts["failed"] += 1
+            yield {"event": "error", "row": row_number, "error": str(error)}
+
+        if len(batch) >= batch_size:
+            yield from flush_batch()
+            batch, batch_rows = [], []
+            yield {"event": "progress", **counts}
+
+    if batch:
+        yield from flush_batch()
+        yield {"event": "progress", **counts}
+
+    handicap_index = None
+    if counts["imported"]:
+        # Player stats are rebuilt from all rounds on the next read, the handicap window right away
+        db.execute(delete(PlayerStats).where(PlayerStats.user_id == user_id))
+        db.execute(delete(HandicapWindows).where(HandicapWindows.user_id == user_id))
+        # Once for the whole import instead of once per round
+        update_user_handicap(db, user_id)
+        db.commit()
+        if invalidate_caches:
+            token_cache.invalidate_user(user_id)
+            for course_id in course_ids:
+                analytics_cache.invalidate_course(user_id, course_id)
+    user = db.get(Users, user_id)
+    if user is not None and user.handicap_index is not None:
+        handicap_index = float(user.handicap_index)
+
+    yield {"event": "done", **counts, "handicap_index": handicap_index}
+
+
+def stream_import(user_id: int, lines: Iterable[str], import_format: ImportFormat, batch_size: int) -> Iterator[str]:
+    """Run an import in its own session and encode its events as NDJSON"""
+    with Session(engine, expire_on_commit=False) as db:
+        for event in import_rounds(db, user_id, lines, import_format, batch_size):
+            yield json.dumps(event) + "\n"
+
+
+@router.post("/import")
+def import_round_history(
+    file: UploadFile = File(...),
+    import_format: ImportFormat | None = Query(None, alias="format", description="Taken from the file extension when omitted"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=1000),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Import completed rounds from a CSV or NDJSON file.
+    The response streams NDJSON events: rejected rows, progress after every batch and a final summary.
+    """
+    if import_format is None:
+        extension = (file.filename or "").rsplit(".", 1)[-1].lower()
+        if extension not in ("csv", "ndjson", "jsonl"):
+            raise HTTPException(status_code=400, detail="Unknown file type, pass format=csv or format=ndjson")
+        import_format = "csv" if extension == "csv" else "ndjson"
+
+    # Read the upload line by line, it stays open until the response has been sent
+    lines = codecs.getreader("utf-8-sig")(file.file)
+    return StreamingResponse(
+        stream_import(current_user.id, lines, import_format, batch_size),
+        media_type="application/x-ndjson"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV or NDJSON file")
+    parser.add_argument("--email", required=True, help="Email of the user the rounds belong to")
+    parser.add_argument("--format", dest="import_format", choices=("csv", "ndjson"))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    import_format = args.import_format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    with Session(engine, expire_on_commit=False) as db:
+        user_id = db.scalar(select(Users.id).where(Users.email == args.email.lower()))
+        if user_id is None:
+            raise SystemExit(f"No user with email {args.email}")
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            # The caches live in the API server, which is not reached from here
+            for event in import_rounds(db, user_id, f, import_format, args.batch_size, invalidate_caches=False):
+                print(json.dumps(event))
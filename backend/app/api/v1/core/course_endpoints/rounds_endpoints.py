@@ -1,21 +1,54 @@
+import base64
+import json
 from datetime import datetime, timezone
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import delete, desc, func, insert, select, tuple_, update
 
-from app.db_setup import get_db
-from app.security import get_current_user
-from app.api.v1.core.models import Users, Rounds, HoleScores, GolfCourses, CourseTees
+from app.db_setup import get_async_db
+from app.etags import (
+    compute_etag,
+    etag_matches,
+    if_match_versions,
+    not_modified,
+    set_etag,
+    version_conflict,
+    version_etag
+)
+from app.handicap_jobs import enqueue_handicap_job, wake_worker
+from app.security import Principal, get_current_principal
+from app.settings import settings
+from app.analytics_cache import analytics_cache
+from app.token_cache import as_utc, token_cache
+from app.api.v1.core.models import Rounds, HoleScores, GolfCourses, CourseTees, PlayerStats
 from app.api.v1.core.schemas import (
     StartRoundSchema, 
     UpdateHoleScoreSchema, 
     CompleteRoundSchema,
     RoundOutSchema, 
     RoundSummarySchema,
-    HoleScoreOutSchema
+    RoundHistoryPageSchema,
+    PlayerStatsSchema,
+    HoleScoreOutSchema,
+    SyncHoleScoresSchema
+)
+from .handicap import (
+    add_round_to_handicap_window,
+    remove_round_from_handicap,
+    update_round_handicap_data,
+    update_user_handicap
+)
+from .player_stats import (
+    build_player_stats,
+    record_completed_round,
+    record_deleted_round,
+    summarize_player_stats
 )
-from .handicap import update_round_handicap_data, update_user_handicap
 
 router = APIRouter(prefix="/rounds", tags=["rounds"])
 
@@ -23,34 +56,28 @@ router = APIRouter(prefix="/rounds", tags=["rounds"])
 @router.post("/start", response_model=RoundOutSchema)
 async def start_round(
     round_data: StartRoundSchema,
-    current_user: Users = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Start a new round"""
-    
-    # Check if user has an active round
-    active_round = db.query(Rounds).filter(
-        Rounds.user_id == current_user.id,
-        Rounds.is_completed == False
-    ).first()
-    
-    if active_round:
-        raise HTTPException(
-            status_code=400, 
-            detail="You already have an active round. Please complete it first."
+    """
+    Start a new round.
+    Only one active round per user is allowed. The rule is enforced by the unique partial index
+    uq_rounds_one_active_per_user, so a retried or concurrent start fails on the insert.
+    """
+    
+    # Get the tee together with its course and holes in one query
+    tee = (await db.execute(
+        select(CourseTees)
+        .options(joinedload(CourseTees.course), joinedload(CourseTees.holes))
+        .where(
+            CourseTees.id == round_data.tee_id,
+            CourseTees.course_id == round_data.course_id
         )
-    
-    # Get course and tee data
-    course = db.query(GolfCourses).filter(GolfCourses.id == round_data.course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-        
-    tee = db.query(CourseTees).filter(
-        CourseTees.id == round_data.tee_id,
-        CourseTees.course_id == round_data.course_id
-    ).first()
+    )).unique().scalar_one_or_none()
     if not tee:
-        raise HTTPException(status_code=404, detail="Tee not found")
+        course_exists = await db.scalar(select(GolfCourses.id).where(GolfCourses.id == round_data.course_id))
+        raise HTTPException(status_code=404, detail="Tee not found" if course_exists else "Course not found")
+    course = tee.course
     
     # Create round
     new_round = Rounds(
@@ -66,187 +93,589 @@ async def start_round(
     )
     
     db.add(new_round)
-    db.flush()  # Get the round ID
-    
-    # Create hole scores from tee data
-    hole_scores = []
-    for hole in tee.holes:
-        hole_score = HoleScores(
-            round_id=new_round.id,
-            hole_number=hole.hole_number,
-            par=hole.par,
-            shots=0,
-            score_relative_to_par=-hole.par  # 0 shots - par
+    try:
+        await db.flush()  # Get the round ID
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400, 
+            detail="You already have an active round. Please complete it first."
         )
-        db.add(hole_score)
-        hole_scores.append(hole_score)
     
-    db.commit()
-    db.refresh(new_round)
+    # Create all hole scores from tee data with one multi-row INSERT ... RETURNING
+    hole_scores = []
+    if tee.holes:
+        hole_scores = (await db.scalars(
+            insert(HoleScores).returning(HoleScores),
+            [
+                {
+                    "round_id": new_round.id,
+                    "hole_number": hole.hole_number,
+                    "par": hole.par,
+                    "shots": 0,
+                    "score_relative_to_par": -hole.par  # 0 shots - par
+                }
+                for hole in tee.holes
+            ]
+        )).all()
+    
+    await db.commit()
+    # The inserted rows are returned, so the response needs no reload
+    set_committed_value(new_round, "hole_scores", sorted(hole_scores, key=lambda hole: hole.hole_number))
     
     return new_round
 
 
 @router.get("/active", response_model=RoundOutSchema | None)
 async def get_active_round(
-    current_user: Users = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get the current active round for the user"""
+    """
+    Get the current active round for the user.
+    Supports If-None-Match, the ETag is derived from the round's updated_at, so an unchanged
+    round costs one indexed lookup and no serialization.
+    """
+    
+    stamp = (await db.execute(
+        select(Rounds.id, Rounds.updated_at).where(
+            Rounds.user_id == current_user.id,
+            Rounds.is_completed == False
+        )
+    )).first()
     
-    active_round = db.query(Rounds).filter(
-        Rounds.user_id == current_user.id,
-        Rounds.is_completed == False
-    ).first()
+    etag = compute_etag("active-round", current_user.id, *(stamp or ()))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    if not stamp:
+        return None
+    
+    active_round = await db.scalar(
+        select(Rounds)
+        .options(selectinload(Rounds.hole_scores))
+        .where(Rounds.id == stamp.id)
+    )
     
     return active_round
 
 
+# Attempts of a request without If-Match before a lost compare-and-swap is reported as a conflict
+OPTIMISTIC_ATTEMPTS = 3
+
+
+async def apply_round_delta(
+    db: AsyncSession,
+    round_id: int,
+    shots_delta: int,
+    par_delta: int,
+    expected_version: int | None = None
+):
+    """
+    Move the totals of an active round by a hole score delta and bump its version.
+    The right hand side reads the values before the update, so concurrent deltas all apply.
+    Returns the new totals and version, or None when the round was completed meanwhile or its
+    version is no longer expected_version.
+    """
+    total_shots = func.coalesce(Rounds.total_shots, 0)
+    total_par = func.coalesce(Rounds.total_par, 0)
+    statement = (
+        update(Rounds)
+        .where(Rounds.id == round_id, Rounds.is_completed == False)
+        .values(
+            total_shots=total_shots + shots_delta,
+            total_par=total_par + par_delta,
+            score_relative_to_par=(total_shots + shots_delta) - (total_par + par_delta),
+            version=Rounds.version + 1,
+        )
+        .returning(Rounds.total_shots, Rounds.total_par, Rounds.score_relative_to_par, Rounds.version)
+        .execution_options(synchronize_session=False)
+    )
+    if expected_version is not None:
+        statement = statement.where(Rounds.version == expected_version)
+    return (await db.execute(statement)).first()
+
+
+async def round_conflict(db: AsyncSession, round_id: int) -> HTTPException:
+    """409 with the round as it is now committed"""
+    round_obj = await db.scalar(
+        select(Rounds)
+        .options(selectinload(Rounds.hole_scores))
+        .where(Rounds.id == round_id)
+        .execution_options(populate_existing=True)
+    )
+    current = RoundOutSchema.model_validate(round_obj).model_dump(mode="json")
+    return version_conflict(current, round_obj.version)
+
+
 @router.put("/{round_id}/hole/{hole_number}", response_model=HoleScoreOutSchema)
 async def update_hole_score(
     round_id: int,
     hole_number: int,
     score_data: UpdateHoleScoreSchema,
-    current_user: Users = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Update the score for a specific hole"""
-    
-    # Get the round and verify ownership
-    round_obj = db.query(Rounds).filter(
-        Rounds.id == round_id,
-        Rounds.user_id == current_user.id
-    ).first()
-    
-    if not round_obj:
-        raise HTTPException(status_code=404, detail="Round not found")
-    
-    if round_obj.is_completed:
-        raise HTTPException(status_code=400, detail="Cannot update completed round")
-    
-    # Get the hole score
-    hole_score = db.query(HoleScores).filter(
-        HoleScores.round_id == round_id,
-        HoleScores.hole_number == hole_number
-    ).first()
-    
-    if not hole_score:
-        raise HTTPException(status_code=404, detail="Hole not found")
-    
-    # Update hole score
-    hole_score.shots = score_data.shots
-    hole_score.par = score_data.par
-    hole_score.score_relative_to_par = score_data.shots - score_data.par
-    hole_score.notes = score_data.notes
-    hole_score.completed_at = datetime.now(timezone.utc)
-    
-    # Recalculate round totals
-    all_hole_scores = db.query(HoleScores).filter(
-        HoleScores.round_id == round_id
-    ).all()
-    
-    round_obj.total_shots = sum(hs.shots for hs in all_hole_scores)
-    round_obj.total_par = sum(hs.par for hs in all_hole_scores)
-    round_obj.score_relative_to_par = round_obj.total_shots - round_obj.total_par
-    
-    db.commit()
-    db.refresh(hole_score)
+    """
+    Update the score for a specific hole.
+    The round totals are moved by the difference between the old and new hole score instead of
+    being re-summed over every hole. Nothing is locked while reading: the hole is written with a
+    compare-and-swap on its version, so an edit based on a stale read is detected. With If-Match
+    the hole version must match or the request fails with 409 and the current hole, without it
+    the update is retried on the fresh hole.
+    """
+    
+    expected_versions = if_match_versions(request)
+    
+    for attempt in range(OPTIMISTIC_ATTEMPTS):
+        # Get the hole together with its round, verifying ownership
+        row = (await db.execute(
+            select(HoleScores, Rounds.is_completed)
+            .join(Rounds, Rounds.id == HoleScores.round_id)
+            .where(
+                Rounds.id == round_id,
+                Rounds.user_id == current_user.id,
+                HoleScores.hole_number == hole_number
+            )
+            .execution_options(populate_existing=True)
+        )).first()
+        
+        if not row:
+            # Tell a missing round apart from a missing hole
+            round_exists = await db.scalar(
+                select(Rounds.id).where(Rounds.id == round_id, Rounds.user_id == current_user.id)
+            )
+            raise HTTPException(status_code=404, detail="Hole not found" if round_exists else "Round not found")
+        
+        hole_score, is_completed = row
+        if is_completed:
+            raise HTTPException(status_code=400, detail="Cannot update completed round")
+        
+        if expected_versions is not None and hole_score.version not in expected_versions:
+            raise version_conflict(
+                HoleScoreOutSchema.model_validate(hole_score).model_dump(mode="json"), hole_score.version
+            )
+        
+        shots_delta = score_data.shots - hole_score.shots
+        par_delta = score_data.par - hole_score.par
+        
+        # Update hole score
+        hole_score.shots = score_data.shots
+        hole_score.par = score_data.par
+        hole_score.score_relative_to_par = score_data.shots - score_data.par
+        hole_score.notes = score_data.notes
+        hole_score.completed_at = datetime.now(timezone.utc)
+        
+        try:
+            # UPDATE ... WHERE version = <read version>, then the round totals
+            await db.flush()
+        except StaleDataError:
+            await db.rollback()
+            if expected_versions is None and attempt + 1 < OPTIMISTIC_ATTEMPTS:
+                continue
+            hole_score = await db.scalar(
+                select(HoleScores)
+                .where(HoleScores.id == hole_score.id)
+                .execution_options(populate_existing=True)
+            )
+            raise version_conflict(
+                HoleScoreOutSchema.model_validate(hole_score).model_dump(mode="json"), hole_score.version
+            )
+        
+        if await apply_round_delta(db, round_id, shots_delta, par_delta) is None:
+            # Completed after the hole was read
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="Cannot update completed round")
+        
+        await db.commit()
+        response.headers["ETag"] = version_etag(hole_score.version)
+        
+        return hole_score
+
+
+@router.put("/{round_id}/holes", response_model=RoundOutSchema)
+async def sync_hole_scores(
+    round_id: int,
+    sync_data: SyncHoleScoresSchema,
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Apply any number of hole updates to a round in one transaction.
+    Used by clients that collect scores offline. Conflicts are resolved per hole by last write
+    wins on completed_at, an update older than the stored score is ignored. completed_at is
+    capped at the server time, like the single hole update stamps it, so a client clock running
+    ahead cannot shadow later edits.
+    Nothing is locked while reading. The holes are written with a compare-and-swap on their
+    versions and the round with one on its version, which every hole update bumps, so a sync
+    based on a stale read is detected even where the driver cannot count executemany rows. With
+    If-Match the round version must match or the request fails with 409 and the current round,
+    without it the sync is retried on the fresh round.
+    """
+    
+    expected_versions = if_match_versions(request)
+    
+    for attempt in range(OPTIMISTIC_ATTEMPTS):
+        round_obj = await db.scalar(
+            select(Rounds)
+            .where(Rounds.id == round_id, Rounds.user_id == current_user.id)
+            .execution_options(populate_existing=True)
+        )
+        
+        if not round_obj:
+            raise HTTPException(status_code=404, detail="Round not found")
+        
+        if round_obj.is_completed:
+            raise HTTPException(status_code=400, detail="Cannot update completed round")
+        
+        if expected_versions is not None and round_obj.version not in expected_versions:
+            raise await round_conflict(db, round_id)
+        
+        holes = (await db.scalars(
+            select(HoleScores)
+            .where(HoleScores.round_id == round_id)
+            .order_by(HoleScores.hole_number)
+            .execution_options(populate_existing=True)
+        )).all()
+        holes_by_number = {hole.hole_number: hole for hole in holes}
+        
+        # Latest update per hole from the batch
+        now = datetime.now(timezone.utc)
+        latest = {}
+        for update_data in sync_data.holes:
+            if update_data.hole_number not in holes_by_number:
+                raise HTTPException(status_code=404, detail=f"Hole {update_data.hole_number} not found")
+            completed_at = min(as_utc(update_data.completed_at), now)
+            current = latest.get(update_data.hole_number)
+            if current is None or completed_at >= current[0]:
+                latest[update_data.hole_number] = (completed_at, update_data)
+        
+        rows = []
+        shots_delta = par_delta = 0
+        for hole_number, (completed_at, update_data) in latest.items():
+            hole = holes_by_number[hole_number]
+            # Future times stored before the cap was introduced count as now
+            if hole.completed_at is not None and min(as_utc(hole.completed_at), now) > completed_at:
+                continue
+            shots_delta += update_data.shots - hole.shots
+            par_delta += update_data.par - hole.par
+            values = {
+                "shots": update_data.shots,
+                "par": update_data.par,
+                "score_relative_to_par": update_data.shots - update_data.par,
+                "notes": update_data.notes,
+                "completed_at": completed_at,
+            }
+            # The version is the expected one, the bulk UPDATE compares it and writes version + 1
+            rows.append({"id": hole.id, "version": hole.version, **values})
+        
+        if not rows:
+            break
+        
+        try:
+            # Bulk UPDATE by primary key, executed as one executemany. Rows are sorted by id so
+            # concurrent syncs lock the holes in the same order
+            await db.execute(update(HoleScores), sorted(rows, key=lambda row: row["id"]))
+            totals = await apply_round_delta(
+                db, round_id, shots_delta, par_delta, expected_version=round_obj.version
+            )
+        except StaleDataError:
+            totals = None
+        
+        if totals is None:
+            await db.rollback()
+            if expected_versions is None and attempt + 1 < OPTIMISTIC_ATTEMPTS:
+                continue
+            raise await round_conflict(db, round_id)
+        
+        await db.commit()
+        # Keep the loaded round and holes in step with the rows for the response
+        for key, value in totals._mapping.items():
+            set_committed_value(round_obj, key, value)
+        holes_by_id = {hole.id: hole for hole in holes}
+        for row in rows:
+            hole = holes_by_id[row["id"]]
+            for key, value in row.items():
+                set_committed_value(hole, key, value + 1 if key == "version" else value)
+        break
+    
+    set_committed_value(round_obj, "hole_scores", list(holes))
+    response.headers["ETag"] = version_etag(round_obj.version)
     
-    return hole_score
+    return round_obj
 
 
 @router.post("/{round_id}/complete", response_model=RoundOutSchema)
 async def complete_round(
     round_id: int,
     completion_data: CompleteRoundSchema,
-    current_user: Users = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Complete a round"""
-    
-    # Get the round and verify ownership
-    round_obj = db.query(Rounds).filter(
-        Rounds.id == round_id,
-        Rounds.user_id == current_user.id
-    ).first()
-    
-    if not round_obj:
-        raise HTTPException(status_code=404, detail="Round not found")
-    
-    if round_obj.is_completed:
-        raise HTTPException(status_code=400, detail="Round is already completed")
-    
-    # Mark round as completed
-    round_obj.is_completed = True
-    round_obj.end_time = datetime.now(timezone.utc)
-    round_obj.notes = completion_data.notes
+    """
+    Complete a round.
+    The round is written with a compare-and-swap on its version, so a hole update that lands
+    between reading and completing the round is never dropped from the totals. With If-Match
+    the round version must match, otherwise the request fails with 409 and the current round.
+    The round, its differential, the player's aggregates and the handicap (or, with
+    HANDICAP_RECALC_MODE "background", the job that recalculates it) are committed together.
+    """
+    
+    expected_versions = if_match_versions(request)
+    
+    for attempt in range(OPTIMISTIC_ATTEMPTS):
+        # Get the round and verify ownership
+        round_obj = await db.scalar(
+            select(Rounds)
+            .options(selectinload(Rounds.tee), selectinload(Rounds.hole_scores))
+            .where(
+                Rounds.id == round_id,
+                Rounds.user_id == current_user.id
+            )
+            .execution_options(populate_existing=True)
+        )
+        
+        if not round_obj:
+            raise HTTPException(status_code=404, detail="Round not found")
+        
+        if round_obj.is_completed:
+            raise HTTPException(status_code=400, detail="Round is already completed")
+        
+        if expected_versions is not None and round_obj.version not in expected_versions:
+            raise await round_conflict(db, round_id)
+        
+        # Mark round as completed
+        round_obj.is_completed = True
+        round_obj.end_time = datetime.now(timezone.utc)
+        round_obj.notes = completion_data.notes
+        
+        try:
+            # UPDATE ... WHERE version = <read version>, on success the row stays locked until commit
+            await db.flush()
+        except StaleDataError:
+            await db.rollback()
+            if expected_versions is None and attempt + 1 < OPTIMISTIC_ATTEMPTS:
+                continue
+            raise await round_conflict(db, round_id)
+        break
+    
+    # Add the round to the player's aggregates, committed together with the handicap data
+    await record_completed_round(db, round_obj)
     
     # Calculate score differential and update handicap
-    update_round_handicap_data(db, round_obj)
-    update_user_handicap(db, current_user.id)
-    
-    db.refresh(round_obj)
+    # The handicap helpers are synchronous, run_sync hands them the underlying Session
+    await db.run_sync(update_round_handicap_data, round_obj)
+    background = settings.HANDICAP_RECALC_MODE == "background"
+    if background:
+        await db.run_sync(add_round_to_handicap_window, round_obj)
+        await enqueue_handicap_job(db, current_user.id)
+    else:
+        await db.run_sync(update_user_handicap, current_user.id, round_obj)
+    await db.commit()
+    
+    if background:
+        wake_worker.set()
+    else:
+        # Cached user snapshots still hold the old handicap_index
+        token_cache.invalidate_user(current_user.id)
+    analytics_cache.invalidate_course(current_user.id, round_obj.course_id)
+    response.headers["ETag"] = version_etag(round_obj.version)
     
     return round_obj
 
 
+# Columns of RoundSummarySchema, all held by ix_rounds_user_history
+HISTORY_COLUMNS = (
+    Rounds.id, Rounds.course_name, Rounds.total_holes, Rounds.start_time, Rounds.end_time,
+    Rounds.total_shots, Rounds.total_par, Rounds.score_relative_to_par,
+    Rounds.score_differential, Rounds.included_in_handicap, Rounds.is_completed,
+)
+
+
+def history_query(user_id: int):
+    return (
+        select(*HISTORY_COLUMNS)
+        .where(Rounds.user_id == user_id, Rounds.is_completed == True)
+        .order_by(desc(Rounds.start_time), desc(Rounds.id))
+    )
+
+
+def encode_history_cursor(start_time: datetime, round_id: int) -> str:
+    payload = json.dumps({"start_time": start_time.isoformat(), "id": round_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(payload["start_time"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/history", response_model=List[RoundSummarySchema])
 async def get_round_history(
     limit: int = Query(10, ge=1, le=50),
     offset: int = Query(0, ge=0),
-    current_user: Users = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get user's round history"""
+    """Get user's round history. Offset based, use /history/page for long histories"""
     
-    rounds = db.query(Rounds).filter(
-        Rounds.user_id == current_user.id,
-        Rounds.is_completed == True
-    ).order_by(desc(Rounds.start_time)).offset(offset).limit(limit).all()
+    rounds = (await db.execute(
+        history_query(current_user.id).offset(offset).limit(limit)
+    )).all()
     
     return rounds
 
 
+@router.get("/history/page", response_model=RoundHistoryPageSchema)
+async def get_round_history_page(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get user's round history with keyset pagination.
+    Each page seeks in ix_rounds_user_history from the last (start_time, id) of the previous
+    page, so deep pages cost the same as the first.
+    """
+    
+    query = history_query(current_user.id)
+    if cursor:
+        start_time, round_id = decode_history_cursor(cursor)
+        query = query.where(tuple_(Rounds.start_time, Rounds.id) < tuple_(start_time, round_id))
+    
+    # Fetch one extra row to know whether there is a next page
+    rounds = (await db.execute(query.limit(limit + 1))).all()
+    
+    next_cursor = None
+    if len(rounds) > limit:
+        rounds = rounds[:limit]
+        next_cursor = encode_history_cursor(rounds[-1].start_time, rounds[-1].id)
+    
+    return {"items": rounds, "next_cursor": next_cursor}
+
+
+@router.get("/stats", response_model=PlayerStatsSchema)
+async def get_player_stats(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the user's statistics over all completed rounds.
+    Read from the player_stats aggregate row, which is built on first use and then kept up to
+    date as rounds are completed and deleted.
+    """
+    
+    stats = await db.scalar(select(PlayerStats).where(PlayerStats.user_id == current_user.id))
+    if stats is None:
+        try:
+            stats = await build_player_stats(db, current_user.id)
+            await db.commit()
+        except IntegrityError:
+            # Built by a concurrent request
+            await db.rollback()
+            stats = await db.scalar(select(PlayerStats).where(PlayerStats.user_id == current_user.id))
+    
+    return summarize_player_stats(stats)
+
+
 @router.get("/{round_id}", response_model=RoundOutSchema)
 async def get_round_details(
     round_id: int,
-    current_user: Users = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get detailed information about a specific round"""
+    """Get detailed information about a specific round. Supports If-None-Match"""
     
-    round_obj = db.query(Rounds).filter(
-        Rounds.id == round_id,
-        Rounds.user_id == current_user.id
-    ).first()
+    updated_at = await db.scalar(
+        select(Rounds.updated_at).where(
+            Rounds.id == round_id,
+            Rounds.user_id == current_user.id
+        )
+    )
     
-    if not round_obj:
+    if updated_at is None:
         raise HTTPException(status_code=404, detail="Round not found")
     
+    etag = compute_etag("round", round_id, updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    round_obj = await db.scalar(
+        select(Rounds)
+        .options(selectinload(Rounds.hole_scores))
+        .where(Rounds.id == round_id)
+    )
+    
     return round_obj
 
 
 @router.delete("/{round_id}")
 async def delete_round(
     round_id: int,
-    current_user: Users = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a round and all associated hole scores"""
     
-    round_obj = db.query(Rounds).filter(
-        Rounds.id == round_id,
-        Rounds.user_id == current_user.id
-    ).first()
+    round_row = (await db.execute(
+        select(
+            Rounds.is_completed, Rounds.course_id, Rounds.total_holes, Rounds.total_shots,
+            Rounds.total_par, Rounds.score_relative_to_par, Rounds.score_differential
+        ).where(
+            Rounds.id == round_id,
+            Rounds.user_id == current_user.id
+        )
+    )).first()
     
-    if not round_obj:
+    if not round_row:
         raise HTTPException(status_code=404, detail="Round not found")
     
+    holes = []
+    if round_row.is_completed:
+        # Needed to take the round out of the player's aggregates
+        holes = (await db.execute(
+            select(HoleScores.par, HoleScores.shots, HoleScores.score_relative_to_par)
+            .where(HoleScores.round_id == round_id)
+        )).all()
+    
     # Delete all associated hole scores first (due to foreign key constraints)
-    db.query(HoleScores).filter(HoleScores.round_id == round_id).delete()
+    await db.execute(delete(HoleScores).where(HoleScores.round_id == round_id))
+    
+    # Delete the round with a statement, so the ORM cascade does not lazy load hole_scores
+    await db.execute(delete(Rounds).where(Rounds.id == round_id))
+    
+    if round_row.is_completed:
+        await record_deleted_round(
+            db,
+            current_user.id,
+            round_row.total_holes,
+            round_row.total_shots,
+            round_row.total_par,
+            round_row.score_relative_to_par,
+            holes,
+        )
+        if round_row.score_differential is not None:
+            await db.run_sync(remove_round_from_handicap, current_user.id, round_id)
+    await db.commit()
     
-    # Delete the round
-    db.delete(round_obj)
-    db.commit()
+    if round_row.is_completed:
+        token_cache.invalidate_user(current_user.id)
+        analytics_cache.invalidate_course(current_user.id, round_row.course_id)
     
     return {"message": "Round deleted successfully"} 
\ No newline at end of file
@@ -6,16 +6,22 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
     func,
-    Numeric
+    Numeric,
+    text
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Base(DeclarativeBase):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
@@ -26,6 +32,7 @@ class Token(Base):
         DateTime(timezone=True),
         server_default=func.now() 
     )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     token: Mapped[str] = mapped_column(unique=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     user: Mapped["Users"] = relationship(back_populates="tokens")
@@ -72,6 +79,8 @@ class Clubs(Base):
     preferred_club: Mapped[bool] = mapped_column(Boolean, default=False)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"))
+    # Version stamp for ETags, set on every ORM or Core UPDATE of the row
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
     
     user: Mapped["Users"] = relationship(
         back_populates="clubs"
@@ -111,6 +120,10 @@ class Rounds(Base):
     notes: Mapped[str] = mapped_column(Text, nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+    # Row version for optimistic concurrency, checked and bumped by every ORM flush of the round.
+    # Statement UPDATEs (the hole score deltas) bump it themselves
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default=text("1"))
     
     # Relationships
     user: Mapped["Users"] = relationship(back_populates="rounds")
@@ -121,6 +134,29 @@ class Rounds(Base):
         cascade="all, delete-orphan",
         order_by="HoleScores.hole_number"
     )
+    
+    # Round history is read newest first per user. On PostgreSQL the index also carries the
+    # summary columns, so a history page is served by an index-only scan
+    __table_args__ = (
+        Index(
+            "ix_rounds_user_history",
+            "user_id", "is_completed", "start_time", "id",
+            postgresql_include=[
+                "course_name", "total_holes", "end_time", "total_shots", "total_par",
+                "score_relative_to_par", "score_differential", "included_in_handicap",
+            ],
+        ),
+        # At most one active round per user, enforced by the database. Also serves the
+        # active round lookup
+        Index(
+            "uq_rounds_one_active_per_user",
+            "user_id",
+            unique=True,
+            postgresql_where=text("NOT is_completed"),
+            sqlite_where=text("is_completed = 0"),
+        ),
+    )
+    __mapper_args__ = {"version_id_col": version}
 
 
 class HoleScores(Base):
@@ -140,6 +176,9 @@ class HoleScores(Base):
     # Optional details
     notes: Mapped[str] = mapped_column(Text, nullable=True)
     
+    # Row version for optimistic concurrency, see Rounds.version
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default=text("1"))
+    
     # Relationships
     round: Mapped["Rounds"] = relationship(back_populates="hole_scores")
     
@@ -147,6 +186,86 @@ class HoleScores(Base):
     __table_args__ = (
         UniqueConstraint('round_id', 'hole_number', name='unique_round_hole'),
     )
+    __mapper_args__ = {"version_id_col": version}
+
+class PlayerStats(Base):
+    """
+    Per user aggregates over completed rounds, kept up to date by complete_round and delete_round.
+    Only scored rounds (total_shots and total_par set) count towards sums and bests, and only
+    played holes (shots > 0) towards the per par averages.
+    """
+    __tablename__ = "player_stats"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), unique=True)
+    
+    rounds_played: Mapped[int] = mapped_column(Integer, default=0)
+    scored_rounds: Mapped[int] = mapped_column(Integer, default=0)
+    total_shots: Mapped[int] = mapped_column(Integer, default=0)
+    total_par: Mapped[int] = mapped_column(Integer, default=0)
+    best_score_to_par: Mapped[int] = mapped_column(Integer, nullable=True)
+    
+    # By hole count
+    rounds_9: Mapped[int] = mapped_column(Integer, default=0)
+    shots_9: Mapped[int] = mapped_column(Integer, default=0)
+    best_shots_9: Mapped[int] = mapped_column(Integer, nullable=True)
+    rounds_18: Mapped[int] = mapped_column(Integer, default=0)
+    shots_18: Mapped[int] = mapped_column(Integer, default=0)
+    best_shots_18: Mapped[int] = mapped_column(Integer, nullable=True)
+    
+    # By hole par, holes played and their summed score relative to par
+    par3_holes: Mapped[int] = mapped_column(Integer, default=0)
+    par3_to_par: Mapped[int] = mapped_column(Integer, default=0)
+    par4_holes: Mapped[int] = mapped_column(Integer, default=0)
+    par4_to_par: Mapped[int] = mapped_column(Integer, default=0)
+    par5_holes: Mapped[int] = mapped_column(Integer, default=0)
+    par5_to_par: Mapped[int] = mapped_column(Integer, default=0)
+    
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+class HandicapWindows(Base):
+    """
+    A user's last 20 score differentials and the rounds currently flagged included_in_handicap,
+    kept up to date by complete_round and delete_round. Deleting the row makes the next handicap
+    update rebuild it from the rounds table.
+    """
+    __tablename__ = "handicap_windows"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), unique=True)
+    entries: Mapped[str] = mapped_column(Text, default="[]")  # JSON [[round id, end timestamp, differential], ...]
+    included: Mapped[str] = mapped_column(Text, default="[]")  # JSON [round id, ...]
+    # Candidates for the 12 month low handicap index, JSON [[timestamp, handicap], ...]
+    lows: Mapped[str] = mapped_column(Text, default="[]")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+
+class HandicapHistory(Base):
+    """Every change of a user's handicap index, with the lowest index of the 12 months up to it"""
+    __tablename__ = "handicap_history"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    handicap_index: Mapped[float] = mapped_column(Numeric(3, 1))
+    low_handicap_index: Mapped[float] = mapped_column(Numeric(3, 1))
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    
+    # Trend reads and the 12 month low rebuild are range scans per user
+    __table_args__ = (
+        Index("ix_handicap_history_user_time", "user_id", "recorded_at"),
+    )
+
+class HandicapJobs(Base):
+    """
+    Pending handicap recalculation of a user, when HANDICAP_RECALC_MODE is "background".
+    One row per user: completing another round while a job is queued or running moves it back
+    to pending, and the worker only marks it done when requested_at is still the one it claimed.
+    """
+    __tablename__ = "handicap_jobs"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), unique=True)
+    status: Mapped[str] = mapped_column(String(20), index=True)  # pending, running, done or failed
+    requested_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
 
 class GolfCourses(Base):
     __tablename__ = "golf_courses"
@@ -191,4 +310,11 @@ class CourseHoles(Base):
     # Relationships
     tee: Mapped["CourseTees"] = relationship(back_populates="holes")
 
-    
\ No newline at end of file
+class CatalogVersion(Base):
+    """
+    One row version stamp of the course catalog (golf_courses, course_tees, course_holes),
+    bumped by every ORM write to those tables, see app/catalog_version.py
+    """
+    __tablename__ = "catalog_version"
+    
+    version: Mapped[int] = mapped_column(Integer, default=0)
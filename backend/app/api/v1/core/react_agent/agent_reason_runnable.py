@@ -1,9 +1,9 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+from functools import lru_cache
+import os
 from langchain.agents import tool, create_react_agent
+from langchain_core.prompts import PromptTemplate
 import datetime
 import math
-from langchain_community.tools import TavilySearchResults
-from langchain import hub
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from app.api.v1.core.user_endpoints.user_db import get_user_clubs_db
@@ -14,7 +14,23 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", google_api_key=settings.GEMINI_API_KEY)
+# Bundled copy of the hwchase17/react prompt from the LangChain hub, so startup needs no network.
+# Bump the version when the prompt file changes.
+REACT_PROMPT_VERSION = "v1"
+REACT_PROMPT_PATH = os.path.join(os.path.dirname(__file__), "prompts", f"react_{REACT_PROMPT_VERSION}.txt")
+
+
+def load_react_prompt() -> PromptTemplate:
+    with open(REACT_PROMPT_PATH, encoding="utf-8") as f:
+        return PromptTemplate.from_template(f.read())
+
+
+@lru_cache(maxsize=1)
+def get_llm():
+    """Build the Gemini client on first use instead of at import time."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(model="gemini-2.0-flash", google_api_key=settings.GEMINI_API_KEY)
 
 @tool
 def get_user_clubs(email: str):
@@ -379,6 +395,7 @@ def calculate_ground_effect(ground_condition: str, base_distance: float):
 
 tools = [get_user_clubs, calculate_wind_effect, calculate_lie_effect, calculate_ground_effect]
 
-react_prompt = hub.pull("hwchase17/react")
 
-react_agent_runnable = create_react_agent(tools=tools, llm=llm, prompt=react_prompt)
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_react_agent_runnable():
+    return create_react_agent(tools=tools, llm=get_llm(), prompt=load_react_prompt())
\ No newline at end of file
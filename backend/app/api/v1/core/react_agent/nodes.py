@@ -3,11 +3,11 @@ import re
 import ast
 import json
 
-from app.api.v1.core.react_agent.agent_reason_runnable import react_agent_runnable, tools
+from app.api.v1.core.react_agent.agent_reason_runnable import get_react_agent_runnable, tools
 from app.api.v1.core.react_agent.react_state import AgentState
 
 def reason_node(state: AgentState):
-    agent_outcome = react_agent_runnable.invoke(state)
+    agent_outcome = get_react_agent_runnable().invoke(state)
     return {"agent_outcome": agent_outcome}
 
 
@@ -1,8 +1,11 @@
+from functools import lru_cache
+
 from app.settings import settings
 
 from langchain_core.agents import AgentFinish, AgentAction
 from langgraph.graph import END, StateGraph
 
+from app.api.v1.core.react_agent.agent_reason_runnable import get_react_agent_runnable
 from app.api.v1.core.react_agent.nodes import reason_node, act_node
 from app.api.v1.core.react_agent.react_state import AgentState
 from dotenv import load_dotenv
@@ -19,18 +22,30 @@ def should_continue(state: AgentState) -> str:
         return ACT_NODE
 
 
-graph = StateGraph(AgentState)
+@lru_cache(maxsize=1)
+def get_agent_app():
+    """Compile the agent graph on first use (or during the lifespan warmup), not at import time."""
+    graph = StateGraph(AgentState)
+
+    graph.add_node(REASON_NODE, reason_node)
+    graph.set_entry_point(REASON_NODE)
+    graph.add_node(ACT_NODE, act_node)
+
 
-graph.add_node(REASON_NODE, reason_node)
-graph.set_entry_point(REASON_NODE)
-graph.add_node(ACT_NODE, act_node)
+    graph.add_conditional_edges(
+        REASON_NODE,
+        should_continue,
+    )
 
+    graph.add_edge(ACT_NODE, REASON_NODE)
 
-graph.add_conditional_edges(
-    REASON_NODE,
-    should_continue,
-)
+    return graph.compile()
 
-graph.add_edge(ACT_NODE, REASON_NODE)
 
-app = graph.compile()
\ No newline at end of file
+def warm_up_agent():
+    """
+    Build everything the first AI request would: the Gemini client and ReAct runnable, which
+    reason_node only creates when it runs, and the compiled graph.
+    """
+    get_react_agent_runnable()
+    return get_agent_app()
@@ -44,6 +44,11 @@ class UserOutSchema(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class UserMeSchema(UserOutSchema):
+    # State of the background handicap recalculation: pending, running, done or failed,
+    # None when the handicap was always recalculated inline
+    handicap_status: str | None = None
+
 class PasswordChangeSchema(BaseModel):
     current_password: str
     new_password: str
@@ -83,6 +88,13 @@ class UpdateHoleScoreSchema(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class HoleScoreSyncSchema(UpdateHoleScoreSchema):
+    hole_number: int = Field(..., ge=1)
+    completed_at: datetime  # Client time of the edit, the latest edit of a hole wins
+
+class SyncHoleScoresSchema(BaseModel):
+    holes: List[HoleScoreSyncSchema] = Field(..., min_length=1)
+
 class CompleteRoundSchema(BaseModel):
     notes: str | None = None
     
@@ -96,6 +108,7 @@ class HoleScoreOutSchema(BaseModel):
     score_relative_to_par: int
     completed_at: datetime | None
     notes: str | None
+    version: int  # Send back as If-Match to update the hole
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -112,6 +125,7 @@ class RoundOutSchema(BaseModel):
     included_in_handicap: bool
     is_completed: bool
     notes: str | None
+    version: int  # Send back as If-Match to sync holes or complete the round
     hole_scores: List[HoleScoreOutSchema] = []
     
     model_config = ConfigDict(from_attributes=True)
@@ -131,6 +145,92 @@ class RoundSummarySchema(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class RoundHistoryPageSchema(BaseModel):
+    items: List[RoundSummarySchema]
+    next_cursor: str | None  # Pass as cursor to get the next page, None on the last page
+
+class PlayerStatsSchema(BaseModel):
+    rounds_played: int
+    scored_rounds: int
+    total_shots: int
+    total_par: int
+    average_efficiency: int | None  # total shots as a percentage of total par
+    best_score_to_par: int | None
+    rounds_9: int
+    average_shots_9: float | None
+    best_shots_9: int | None
+    rounds_18: int
+    average_shots_18: float | None
+    best_shots_18: int | None
+    average_to_par_by_hole_par: dict[int, float | None]
+    updated_at: datetime | None
+
+class ScoreDistributionSchema(BaseModel):
+    eagle_or_better: int
+    birdie: int
+    par: int
+    bogey: int
+    double_bogey_or_worse: int
+
+class HoleAnalyticsSchema(BaseModel):
+    hole_number: int
+    par: int
+    times_played: int
+    average_shots: float
+    average_to_par: float
+    distribution: ScoreDistributionSchema
+
+class CourseAnalyticsSchema(BaseModel):
+    course_id: int
+    tee_id: int
+    rounds_played: int
+    holes: List[HoleAnalyticsSchema]
+    distribution: ScoreDistributionSchema
+    hardest_holes: List[int]  # Hole numbers, highest average score to par first
+    easiest_holes: List[int]  # Hole numbers, lowest average score to par first
+
+class HandicapHistoryPointSchema(BaseModel):
+    recorded_at: datetime
+    handicap_index: float
+    low_handicap_index: float  # Lowest index of the 12 months up to this point
+
+class HandicapTrendSchema(BaseModel):
+    handicap_index: float | None
+    low_handicap_index: float | None  # Lowest index of the last 12 months, the caps start from it
+    changes: int  # Changes in the requested period, before downsampling
+    points: List[HandicapHistoryPointSchema]
+
+class SimulatedRoundSchema(BaseModel):
+    course_id: int
+    tee_id: int
+    score: int = Field(..., ge=1, description="Adjusted gross score")
+
+class HandicapSimulationSchema(BaseModel):
+    rounds: List[SimulatedRoundSchema] = Field(..., min_length=1, max_length=20)
+
+class SimulatedRoundOutSchema(SimulatedRoundSchema):
+    score_differential: float
+    handicap_index: float | None  # Projected index after this round
+    rounds_used: int | None  # Differentials counted, None while the handicap is not recalculated
+
+class HandicapProjectionSchema(BaseModel):
+    handicap_index: float | None
+    low_handicap_index: float | None
+    projected_handicap_index: float | None
+    rounds: List[SimulatedRoundOutSchema]
+
+class HandicapCurvePointSchema(BaseModel):
+    score: int
+    score_differential: float
+    handicap_index: float | None
+
+class HandicapCurveSchema(BaseModel):
+    course_id: int
+    tee_id: int
+    handicap_index: float | None
+    low_handicap_index: float | None
+    points: List[HandicapCurvePointSchema]
+
 class AgentQueryRequest(BaseModel):
     wind_speed: float
     wind_direction: str
@@ -6,34 +6,36 @@ from app.api.v1.core.schemas import (
     UserOutSchema,
     UserRegisterSchema,
 )
-from app.db_setup import get_db
+from app.db_setup import get_async_db, get_db
 from app.security import (
-    create_database_token,
-    get_current_token,
-    hash_password,
-    verify_password,
+    create_access_token,
+    hash_password_async,
+    oauth2_scheme,
+    revoke_access_token,
+    verify_password_async,
 )
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import ValidationError
 from sqlalchemy import delete, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter(tags=["auth"], prefix="/auth")
 
 @router.post("/token")
-def login(
+async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> TokenSchema:
     
     normalized_email = form_data.username.lower().strip()
     
     user = (
-        db.execute(
+        (await db.execute(
             select(Users).where(Users.email == normalized_email),
-        )
+        ))
         .scalars()
         .first()
     )
@@ -43,22 +45,28 @@ def login(
             detail="User does not exist",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    if not verify_password(form_data.password, user.hashed_password):
+    valid, needs_rehash = await verify_password_async(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Passwords do not match",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_database_token(user_id=user.id, db=db)
-    return {"access_token": access_token.token, "token_type": "bearer"}
+    # Stored hash used another bcrypt cost, it is committed together with the new token
+    if needs_rehash:
+        user.hashed_password = await hash_password_async(form_data.password)
+    
+    access_token = await db.run_sync(
+        lambda session: create_access_token(user=user, db=session)
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.delete("/logout", status_code=status.HTTP_204_NO_CONTENT)
 def logout(
-    current_token: Token = Depends(get_current_token),
+    token: Annotated[str, Depends(oauth2_scheme)],
     db: Session = Depends(get_db),
 ):
-    db.execute(delete(Token).where(Token.token == current_token.token))
-    db.commit()
+    revoke_access_token(token_str=token, db=db)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
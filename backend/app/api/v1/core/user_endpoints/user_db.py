@@ -5,12 +5,13 @@ from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import Optional, List
 from random import randint
 import bcrypt
-from app.security import hash_password
+from app.token_cache import token_cache
 from datetime import datetime, timezone
 
 from app.api.v1.core.models import (
     Users,
-    Clubs
+    Clubs,
+    HandicapHistory
 )
 
 from app.api.v1.core.schemas import (
@@ -21,7 +22,7 @@ from app.api.v1.core.schemas import (
     AddMultipleClubsSchema
 )
 
-def create_user_db(user: UserRegisterSchema, db):
+def create_user_db(user: UserRegisterSchema, db, hashed_password: str):
     normalized_user_data = user.model_dump(exclude="hashed_password")
     normalized_user_data['email'] = normalized_user_data['email'].lower().strip()
     
@@ -30,9 +31,17 @@ def create_user_db(user: UserRegisterSchema, db):
     normalized_user_data['handicap_index'] = initial_handicap
     normalized_user_data['last_handicap_update'] = datetime.now(timezone.utc)
     
-    user = Users(**normalized_user_data, hashed_password=hash_password(user.password))
+    user = Users(**normalized_user_data, hashed_password=hashed_password)
 
     db.add(user)
+    db.flush()
+    # The initial handicap starts the user's history and 12 month low
+    db.add(HandicapHistory(
+        user_id=user.id,
+        handicap_index=initial_handicap,
+        low_handicap_index=initial_handicap,
+        recorded_at=user.last_handicap_update
+    ))
     db.commit()
     return user
 
@@ -57,6 +66,7 @@ def delete_user_db(user_id: int, db):
     # Utför delete-operationen
     db.execute(delete(Users).where(Users.id == user_id))
     db.commit()
+    token_cache.invalidate_user(user_id)
     return True
 
 
@@ -1,8 +1,9 @@
 # ./backend/app/api/v1/core/user_endpoints/users.py
 
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Annotated, List
 
@@ -15,11 +16,12 @@ from app.api.v1.core.user_endpoints.user_db import (
     update_club_db,
     delete_club_db
 )
-from app.api.v1.core.models import Users, Clubs
+from app.api.v1.core.models import Users, Clubs, HandicapJobs, Token
 from app.api.v1.core.schemas import (
     UserSearchSchema,
     UserUpdateSchema,
     UserOutSchema,
+    UserMeSchema,
     UserRegisterSchema,
     PasswordChangeSchema,
     AdminUpdateSchema,
@@ -30,22 +32,31 @@ from app.api.v1.core.schemas import (
 # Importera e-postfunktionerna
 
 from app.security import (
-    hash_password,
-    verify_password,
+    Principal,
+    hash_password_async,
+    oauth2_scheme,
+    revoke_signed_tokens_of_user,
+    verify_password_async,
+    get_current_principal,
     get_current_user,
     get_current_admin
 )
-from app.db_setup import get_db
+from app.db_setup import get_async_db, get_db
+from app.etags import compute_etag, etag_matches, not_modified, set_etag
+from app.token_cache import token_cache
 
 router = APIRouter()
 
 @router.post("/user", status_code=201)
-def create_user(
+async def create_user(
     user: UserRegisterSchema,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    new_user = create_user_db(user=user, db=db)
+    hashed_password = await hash_password_async(user.password)
+    new_user = await db.run_sync(
+        lambda session: create_user_db(user=user, db=session, hashed_password=hashed_password)
+    )
     if not new_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,9 +67,15 @@ def create_user(
         "message": "Created user successfully"
     }
 
-@router.get("/me", response_model=UserOutSchema)
-def read_users_me(current_user: Users = Depends(get_current_user)):
-    return current_user
+@router.get("/me", response_model=UserMeSchema)
+async def read_users_me(
+    current_user: Users = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    handicap_status = await db.scalar(
+        select(HandicapJobs.status).where(HandicapJobs.user_id == current_user.id)
+    )
+    return {**UserOutSchema.model_validate(current_user).model_dump(), "handicap_status": handicap_status}
 
 @router.get("/user", status_code=200)
 def search_user(db: Session = Depends(get_db)):
@@ -71,13 +88,15 @@ def search_user(db: Session = Depends(get_db)):
     return result
 
 @router.delete("/user", status_code=200)
-def delete_user(db: Session = Depends(get_db), current_user: Users = Depends(get_current_user)):
+def delete_user(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
     result = delete_user_db(user_id=current_user.id, db=db)
     if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found or could not be deleted"
         )
+    # Signed tokens are accepted from their claims, they must not outlive the user
+    revoke_signed_tokens_of_user(current_user.id)
     return {"message": "User has been deleted"}
 
 @router.get("/profile", response_model=UserUpdateSchema)
@@ -87,7 +106,7 @@ def get_user_profile(current_user: Users = Depends(get_current_user)):
 @router.put("/profile", response_model=UserUpdateSchema)
 def update_user_profile(
     user_update: UserUpdateSchema,
-    current_user: Users = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     db_user = db.scalars(select(Users).where(Users.id == current_user.id)).first()
@@ -95,13 +114,14 @@ def update_user_profile(
         if value != "":
             setattr(db_user, key, value)
     db.commit()
+    token_cache.invalidate_user(db_user.id)
     return db_user
 
 @router.put("/admin/profile/{user_id}", response_model=UserOutSchema)
 def update_admin_profile(
     user_update: AdminUpdateSchema,
     user_id: int,
-    current_user: Users = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     if not current_user.is_admin:
@@ -111,17 +131,23 @@ def update_admin_profile(
             headers={"WWW-Authenticate": "Bearer"},
         )
     db_user = db.scalars(select(Users).where(Users.id == user_id)).first()
+    was_admin = db_user.is_admin
     for key, value in user_update.model_dump(exclude_unset=True).items():
         if value != "":
             setattr(db_user, key, value)
     db.commit()
+    token_cache.invalidate_user(db_user.id)
+    # Signed tokens carry the admin flag of their login
+    if db_user.is_admin != was_admin:
+        revoke_signed_tokens_of_user(db_user.id)
     return db_user
 
 @router.put("/change-password", status_code=status.HTTP_200_OK)
-def change_password(
+async def change_password(
     password_data: PasswordChangeSchema,
+    token: Annotated[str, Depends(oauth2_scheme)],
     current_user: Users = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     if not password_data.current_password or not password_data.new_password:
         raise HTTPException(
@@ -133,31 +159,41 @@ def change_password(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be at least 8 characters long",
         )
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    valid, _ = await verify_password_async(password_data.current_password, current_user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
-    if verify_password(password_data.new_password, current_user.hashed_password):
+    # current_password matches the stored hash, so comparing plain texts avoids a second bcrypt verify
+    if password_data.new_password == password_data.current_password:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from the current password",
         )
+    new_hashed_password = await hash_password_async(password_data.new_password)
     try:
-        db_user = db.scalars(select(Users).where(Users.id == current_user.id)).first()
-        if not db_user:
+        result = await db.execute(
+            update(Users)
+            .where(Users.id == current_user.id)
+            .values(hashed_password=new_hashed_password)
+        )
+        if not result.rowcount:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found",
             )
-        db_user.hashed_password = hash_password(password_data.new_password)
-        db.commit()
+        # Every other session of the user is logged out, the one changing the password stays
+        await db.execute(delete(Token).where(Token.user_id == current_user.id, Token.token != token))
+        await db.commit()
+        revoke_signed_tokens_of_user(current_user.id, keep_token=token)
+        token_cache.invalidate_user(current_user.id)
         return {
             "message": "Password updated successfully",
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update password: {str(e)}",
@@ -166,7 +202,7 @@ def change_password(
 @router.post("/clubs", status_code=status.HTTP_201_CREATED)
 def add_multiple_clubs(
     clubs_data: AddMultipleClubsSchema,
-    current_user: Users = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     result = add_multiple_clubs_db(user_id=current_user.id, clubs_data=clubs_data.clubs, db=db)
@@ -184,9 +220,21 @@ def add_multiple_clubs(
 
 @router.get("/clubs", response_model=List[ClubSchema], status_code=status.HTTP_200_OK)
 def get_user_clubs(
-    current_user: Users = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
+    # The count and id sum change on add and delete, max(updated_at) on edits
+    clubs_version = db.execute(
+        select(func.count(Clubs.id), func.sum(Clubs.id), func.max(Clubs.updated_at))
+        .where(Clubs.user_id == current_user.id)
+    ).one()
+    etag = compute_etag("clubs", current_user.id, *clubs_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
     clubs = get_user_clubs_db(user_id=current_user.id, db=db)
     
     if clubs is None:
@@ -204,7 +252,7 @@ def get_user_clubs(
 def update_club(
     club_name: str,
     club_data: UpdateClubSchema,
-    current_user: Users = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     updated_club = update_club_db(club_name=club_name, user_id=current_user.id, club_data=club_data, db=db)
@@ -220,7 +268,7 @@ def update_club(
 @router.delete("/clubs/{club_name}", status_code=status.HTTP_200_OK)
 def delete_club(
     club_name: str,
-    current_user: Users = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     result = delete_club_db(club_name=club_name, user_id=current_user.id, db=db)
@@ -4,6 +4,11 @@ from app.api.v1.core.user_endpoints.authentication import router as auth_router
 from app.api.v1.core.ai_endpoints.ai import router as ai_router
 from app.api.v1.core.course_endpoints.rounds_endpoints import router as rounds_router
 from app.api.v1.core.course_endpoints.courses import router as course_router
+from app.api.v1.core.course_endpoints.analytics import router as analytics_router
+from app.api.v1.core.course_endpoints.round_import import router as round_import_router
+from app.api.v1.core.course_endpoints.handicap_history import router as handicap_router
+from app.api.v1.core.course_endpoints.handicap_simulator import router as handicap_simulator_router
+from app.api.v1.core.admin_endpoints.admin import router as admin_router
 
 
 router = APIRouter()
@@ -12,4 +17,9 @@ router.include_router(user_router)
 router.include_router(auth_router)
 router.include_router(ai_router)
 router.include_router(rounds_router)
-router.include_router(course_router)
\ No newline at end of file
+router.include_router(round_import_router)
+router.include_router(course_router)
+router.include_router(analytics_router)
+router.include_router(handicap_router)
+router.include_router(handicap_simulator_router)
+router.include_router(admin_router)
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Version stamp of the course catalog, the only input of the GET /courses ETag besides its
+parameters, so a revalidation reads one row instead of scanning the catalog tables.
+
+Every ORM write to golf_courses, course_tees or course_holes bumps it in the same transaction:
+flushed objects and bulk insert, update and delete statements run through a Session. Writers
+that bypass the ORM, like a raw SQL import, must call bump_catalog_version themselves.
+"""
+from sqlalchemy import DDL, Connection, event, select, update
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.api.v1.core.models import CatalogVersion, CourseHoles, CourseTees, GolfCourses
+
+CATALOG_MODELS = (GolfCourses, CourseTees, CourseHoles)
+CATALOG_VERSION_ID = 1
+
+# The row exists from the moment the table is created, so a bump is a single UPDATE
+event.listen(
+    CatalogVersion.__table__,
+    "after_create",
+    DDL(f"INSERT INTO catalog_version (id, version) VALUES ({CATALOG_VERSION_ID}, 0)"),
+)
+
+
+def catalog_version_query():
+    return select(CatalogVersion.version).where(CatalogVersion.id == CATALOG_VERSION_ID)
+
+
+def bump_catalog_version(connection: Connection) -> None:
+    connection.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.id == CATALOG_VERSION_ID)
+        .values(version=CatalogVersion.version + 1)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_after_catalog_flush(session: Session, flush_context) -> None:
+    if any(isinstance(obj, CATALOG_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        bump_catalog_version(session.connection())
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_catalog_statement(state: ORMExecuteState) -> None:
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is not None \
+            and state.bind_mapper.class_ in CATALOG_MODELS:
+        bump_catalog_version(state.session.connection())
@@ -1,17 +1,67 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session
 
 from app.api.v1.core.models import (Base,)
+# Registers the listeners that bump the catalog version on catalog writes
+import app.catalog_version  # noqa: F401
+from app.pool_metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool
+from app.schema_upgrade import upgrade_schema
 from app.settings import settings
 
-# echo = True to see the SQL queries
-engine = create_engine(f"{settings.DB_URL}", echo=True)
+# Async drivers used for the AsyncEngine when ASYNC_DB_URL is not set
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_db_url() -> str:
+    """Return ASYNC_DB_URL, or DB_URL rewritten to use the matching async driver."""
+    if settings.ASYNC_DB_URL:
+        return settings.ASYNC_DB_URL
+    url = make_url(settings.DB_URL)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def engine_options(url: str, poolclass) -> dict:
+    """Pool and echo options from settings. SQLite keeps SQLAlchemy's default pool."""
+    options = {"echo": settings.DB_ECHO}
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+
+# DB_ECHO = True to see the SQL queries
+engine = create_engine(f"{settings.DB_URL}", **engine_options(settings.DB_URL, TimedQueuePool))
+
+async_engine = create_async_engine(
+    get_async_db_url(), **engine_options(get_async_db_url(), TimedAsyncAdaptedQueuePool)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # create_all leaves existing tables alone, add what newer models have on top
+    upgrade_schema(engine)
 
 
 def get_db():
     with Session(engine, expire_on_commit=False) as session:
         yield session
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -0,0 +1,64 @@
+import hashlib
+
+from fastapi import HTTPException, Request, Response
+
+
+def compute_etag(*parts) -> str:
+    """Weak ETag from the version stamp of a resource and the parameters that shape its body"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as used for GET revalidation"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    # no-cache lets clients store the body but makes them revalidate it on every use
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def version_etag(version: int) -> str:
+    """Strong ETag of a row version, sent back in If-Match to update the row"""
+    return f'"{version}"'
+
+
+def if_match_versions(request: Request) -> set[int] | None:
+    """
+    Row versions accepted by If-Match, None when the header is missing or "*".
+    Versions are compared strongly, so weak tags (the GET ETags) never match.
+    """
+    header = request.headers.get("if-match")
+    if not header or header.strip() == "*":
+        return None
+    versions = set()
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            continue
+        try:
+            versions.add(int(tag.strip('"')))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid If-Match header")
+    return versions
+
+
+def version_conflict(current: dict, version: int) -> HTTPException:
+    """409 carrying the current state of the resource and its version ETag"""
+    return HTTPException(
+        status_code=409,
+        detail={"message": "The resource was changed by another request", "current": current},
+        headers={"ETag": version_etag(version)},
+    )
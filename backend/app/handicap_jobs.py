@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.api.v1.core.course_endpoints.handicap import update_user_handicap
+from app.api.v1.core.models import HandicapJobs
+from app.db_setup import engine
+from app.settings import settings
+from app.token_cache import token_cache
+
+logger = logging.getLogger(__name__)
+
+# Outcome of the most recent worker runs, reported by the admin endpoint
+worker_stats = {
+    "runs": 0,
+    "total_done": 0,
+    "total_failed": 0,
+    "last_run_at": None,
+    "last_run_claimed": 0,
+    "last_error": None,
+}
+
+# Set by complete_round so a queued job does not wait for the next poll
+wake_worker = asyncio.Event()
+
+
+async def enqueue_handicap_job(db: AsyncSession, user_id: int) -> None:
+    """Queue a handicap recalculation for the user, in the caller's transaction"""
+    now = datetime.now(timezone.utc)
+    job = await db.scalar(select(HandicapJobs).where(HandicapJobs.user_id == user_id).with_for_update())
+    if job is None:
+        db.add(HandicapJobs(user_id=user_id, status="pending", requested_at=now))
+        return
+    job.status = "pending"
+    job.requested_at = now
+    job.attempts = 0
+    job.last_error = None
+
+
+def claim_handicap_jobs(session: Session, batch_size: int) -> list[tuple[int, int, datetime]]:
+    """
+    Mark up to batch_size pending jobs, and running jobs abandoned by a crashed worker, as running.
+    Returns (job id, user id, requested_at) of the claimed jobs.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.HANDICAP_JOB_STALE_SECONDS)
+    jobs = session.scalars(
+        select(HandicapJobs)
+        .where(or_(
+            HandicapJobs.status == "pending",
+            (HandicapJobs.status == "running") & (HandicapJobs.started_at < stale_before),
+        ))
+        .order_by(HandicapJobs.requested_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    for job in jobs:
+        job.status = "running"
+        job.started_at = now
+        job.attempts += 1
+    claimed = [(job.id, job.user_id, job.requested_at) for job in jobs]
+    session.commit()
+    return claimed
+
+
+def run_handicap_job(job_id: int, user_id: int, requested_at: datetime) -> bool:
+    """
+    Recalculate one user's handicap and mark the job done in the same transaction, so a crash
+    leaves the job to be claimed again. Returns False when the job failed.
+    """
+    with Session(engine, expire_on_commit=False) as session:
+        try:
+            update_user_handicap(session, user_id)
+            # Requested again while running: leave it pending for the next run
+            session.execute(
+                update(HandicapJobs)
+                .where(HandicapJobs.id == job_id, HandicapJobs.requested_at == requested_at)
+                .values(status="done", finished_at=datetime.now(timezone.utc), last_error=None)
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.exception("Handicap job for user %s failed", user_id)
+            attempts = session.scalar(select(HandicapJobs.attempts).where(HandicapJobs.id == job_id))
+            retry = attempts is not None and attempts < settings.HANDICAP_JOB_MAX_ATTEMPTS
+            session.execute(
+                update(HandicapJobs)
+                .where(HandicapJobs.id == job_id, HandicapJobs.requested_at == requested_at)
+                .values(status="pending" if retry else "failed", last_error=str(e))
+            )
+            session.commit()
+            return False
+    # Cached user snapshots still hold the old handicap_index
+    token_cache.invalidate_user(user_id)
+    return True
+
+
+def process_handicap_jobs(batch_size: int) -> tuple[int, int, int]:
+    """Claim and run one batch of jobs. Returns the claimed, done and failed counts"""
+    with Session(engine) as session:
+        claimed = claim_handicap_jobs(session, batch_size)
+    done = sum(run_handicap_job(*job) for job in claimed)
+    return len(claimed), done, len(claimed) - done
+
+
+def handicap_job_counts() -> dict:
+    with Session(engine) as session:
+        return dict(session.execute(
+            select(HandicapJobs.status, func.count(HandicapJobs.id)).group_by(HandicapJobs.status)
+        ).all())
+
+
+async def run_handicap_worker():
+    """Background loop started from the app lifespan when HANDICAP_RECALC_MODE is "background"."""
+    while True:
+        wake_worker.clear()
+        try:
+            claimed, done, failed = await asyncio.to_thread(process_handicap_jobs, settings.HANDICAP_JOB_BATCH_SIZE)
+            worker_stats["last_error"] = None
+        except Exception as e:
+            claimed = done = failed = 0
+            worker_stats["last_error"] = str(e)
+            logger.exception("Handicap worker failed")
+
+        worker_stats["runs"] += 1
+        worker_stats["total_done"] += done
+        worker_stats["total_failed"] += failed
+        worker_stats["last_run_claimed"] = claimed
+        worker_stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+
+        # A full batch means more jobs are probably waiting
+        if claimed < settings.HANDICAP_JOB_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(wake_worker.wait(), timeout=settings.HANDICAP_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,203 @@
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+import logging
+import re
+from threading import Lock
+import time
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+@dataclass
+class RequestStats:
+    """
+    SQL statements and DB time of the request being served.
+    shapes counts statements by statement_shape, it is only tracked in debug mode or when observed.
+    """
+    statements: int = 0
+    db_seconds: float = 0.0
+    shapes: Counter | None = None
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed at least threshold times, the usual sign of an N+1 query."""
+        if not self.shapes:
+            return []
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+# Called with (method, route, stats) after every request, used by the query budget pytest fixture
+request_observers: list[Callable[[str, str, RequestStats], None]] = []
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and multi-row VALUES, e.g. "(?, ?, ?)" or "(%(id_1_1)s, %(id_1_2)s)"
+_PLACEHOLDER_LIST = re.compile(r"\((?:\?|%\(\w+\)s|\$\d+)(?:,\s*(?:\?|%\(\w+\)s|\$\d+))*\)")
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|\$\d+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in parameters compare equal."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _NAMED_PARAM.sub("?", shape)
+
+
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Per route latency, SQL statement and DB time histograms."""
+
+    METRICS = (
+        ("http_request_duration_seconds", "Request latency by route", LATENCY_BUCKETS_SECONDS),
+        ("http_request_db_statements", "SQL statements executed per request", STATEMENT_BUCKETS),
+        ("http_request_db_seconds", "Time spent executing SQL per request", DB_TIME_BUCKETS_SECONDS),
+    )
+
+    def __init__(self):
+        self._lock = Lock()
+        # (method, route, status) -> one histogram per metric
+        self._series: dict[tuple[str, str, int], tuple[Histogram, ...]] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+        key = (method, route, status)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = tuple(Histogram(buckets) for _, _, buckets in self.METRICS)
+                self._series[key] = series
+            for histogram, value in zip(series, (duration, stats.statements, stats.db_seconds)):
+                histogram.observe(value)
+
+    def render(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for index, (name, description, _) in enumerate(self.METRICS):
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route, status), series in sorted(self._series.items()):
+                    labels = f'method="{method}",route="{route}",status="{status}"'
+                    lines.extend(series[index].lines(name, labels))
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start_time"].pop()
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - start
+        if stats.shapes is not None:
+            stats.shapes[statement_shape(statement)] += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count statements and DB time of every request. Pass async_engine.sync_engine for the async engine."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_label(scope) -> str:
+    """Path template of the matched route as mounted, with the include_router and mount prefixes"""
+    # FastAPI versions that include routers by reference keep the prefixed template in the
+    # effective route context, older ones copy the route with the prefix applied
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if not path_format:
+        return "unmatched"
+    return scope.get("root_path", "").rstrip("/") + path_format
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, SQL statements and DB time per route.
+    Routes are labelled by their full path template, e.g. /v1/rounds/{round_id}, requests that
+    match no route share one label.
+
+    With QUERY_DEBUG on, responses carry an X-DB-Statements header and statement shapes
+    repeated QUERY_DEBUG_REPEAT_THRESHOLD times or more in one request are logged as warnings.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        track_shapes = settings.QUERY_DEBUG or bool(request_observers)
+        stats = RequestStats(shapes=Counter() if track_shapes else None)
+        token = current_request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.QUERY_DEBUG:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-statements", str(stats.statements).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            current_request_stats.reset(token)
+            route_path = route_label(scope)
+            metrics_registry.observe(scope["method"], route_path, status_code, duration, stats)
+
+            if settings.QUERY_DEBUG:
+                for shape, count in stats.repeated_statements(settings.QUERY_DEBUG_REPEAT_THRESHOLD):
+                    logger.warning(
+                        "%s %s ran the same statement %s times: %s", scope["method"], route_path, count, shape
+                    )
+            for observer in request_observers:
+                observer(scope["method"], route_path, stats)
@@ -0,0 +1,70 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from app.settings import settings
+
+
+class PasswordPoolFull(Exception):
+    """Raised when the password worker queue is at capacity."""
+
+
+class PasswordWorkerPool:
+    """
+    Size limited executor for CPU bound password hashing and verification.
+    Keeps bcrypt work off the threadpool that serves every other sync endpoint,
+    and rejects work instead of queueing without bound during a login burst.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password")
+        self._lock = Lock()
+        self.pending = 0  # Submitted and not yet finished (queued + running)
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+
+    def _track(self, fn, *args):
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.pending -= 1
+                self.completed += 1
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolFull()
+            self.pending += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.pending - self.max_workers)
+        future = self._executor.submit(self._track, fn, *args)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self.running,
+                "queue_depth": max(0, self.pending - self.running),
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordWorkerPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,91 @@
+from bisect import bisect_left
+from threading import Lock
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Upper bounds (ms) of the checkout wait-time histogram buckets, the last bucket is +Inf
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class WaitHistogram:
+    """Thread safe histogram of how long callers waited to check out a connection."""
+
+    def __init__(self, buckets=WAIT_BUCKETS_MS):
+        self.buckets = buckets
+        self._lock = Lock()
+        self.counts = [0] * (len(buckets) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, wait_ms: float) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.buckets, wait_ms)] += 1
+            self.total_ms += wait_ms
+            self.max_ms = max(self.max_ms, wait_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count = sum(self.counts)
+            labels = [f"le_{bound}ms" for bound in self.buckets] + ["le_inf"]
+            return {
+                "count": count,
+                "total_ms": round(self.total_ms, 3),
+                "mean_ms": round(self.total_ms / count, 3) if count else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times in a WaitHistogram."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = WaitHistogram()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_histogram.observe((time.perf_counter() - start) * 1000)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait times in a WaitHistogram."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = WaitHistogram()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_histogram.observe((time.perf_counter() - start) * 1000)
+
+
+def pool_status(pool: Pool) -> dict:
+    """Report checked-out, idle and overflow connections plus wait times for a pool."""
+    status = {"pool_class": type(pool).__name__}
+
+    # Only QueuePool and its subclasses track size and overflow
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # overflow() is negative until the base pool has been filled
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    else:
+        status["status"] = pool.status()
+
+    histogram = getattr(pool, "wait_histogram", None)
+    if histogram is not None:
+        status["checkout_wait"] = histogram.snapshot()
+    return status
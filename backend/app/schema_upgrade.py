@@ -0,0 +1,129 @@
+"""
+In place upgrade of tables created by earlier versions of the app.
+
+Base.metadata.create_all creates missing tables but never alters existing ones, so columns and
+indexes added to existing tables are added here, together with the backfill they need. Every
+step looks at the live schema first, on a fresh or up to date database it does nothing.
+init_db runs the steps after create_all, which can also be done on its own before a deploy:
+
+    python -m app.schema_upgrade
+
+SQLite cannot add NOT NULL to an existing column, there the backfilled columns stay nullable
+in the database and the models keep them filled.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Column, Connection, Engine, Table, delete, inspect, select, text, update
+
+from app.api.v1.core.models import Clubs, HoleScores, Rounds, Token
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def has_column(connection: Connection, column: Column) -> bool:
+    return column.name in {c["name"] for c in inspect(connection).get_columns(column.table.name)}
+
+
+def add_column(connection: Connection, column: Column, default: str | None = None) -> None:
+    """Add a model column to its table, nullable unless a server side default fills the rows"""
+    column_type = column.type.compile(dialect=connection.dialect)
+    constraint = f" NOT NULL DEFAULT {default}" if default is not None else ""
+    connection.execute(text(f"ALTER TABLE {column.table.name} ADD COLUMN {column.name} {column_type}{constraint}"))
+    logger.info("Added column %s.%s", column.table.name, column.name)
+
+
+def set_not_null(connection: Connection, column: Column) -> None:
+    if connection.dialect.name != "sqlite":
+        connection.execute(text(f"ALTER TABLE {column.table.name} ALTER COLUMN {column.name} SET NOT NULL"))
+
+
+def create_index(connection: Connection, table: Table, name: str) -> None:
+    """Create a model index when the table does not have it yet"""
+    [index] = [index for index in table.indexes if index.name == name]
+    index.create(connection, checkfirst=True)
+
+
+def add_token_expiry(connection: Connection) -> None:
+    """
+    tokens.expires_at. Tokens issued before expiry was enforced get one full lifetime from
+    the upgrade, so nobody is logged out by it
+    """
+    column = Token.__table__.c.expires_at
+    if not has_column(connection, column):
+        add_column(connection, column)
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        connection.execute(update(Token).where(Token.expires_at.is_(None)).values(expires_at=expires_at))
+        set_not_null(connection, column)
+    create_index(connection, Token.__table__, "ix_tokens_expires_at")
+
+
+def add_round_history_index(connection: Connection) -> None:
+    create_index(connection, Rounds.__table__, "ix_rounds_user_history")
+
+
+def add_one_active_round_index(connection: Connection) -> None:
+    """
+    uq_rounds_one_active_per_user. Users left with several active rounds keep the oldest, the
+    one the unordered active round lookup found first and the app scored. The others are deleted
+    with their hole scores, they were never completed, so no statistic or handicap counts them
+    """
+    if "uq_rounds_one_active_per_user" in {index["name"] for index in inspect(connection).get_indexes("rounds")}:
+        return
+    active = connection.execute(
+        select(Rounds.id, Rounds.user_id)
+        .where(Rounds.is_completed == False)
+        .order_by(Rounds.user_id, Rounds.id)
+    ).all()
+    kept_users = set()
+    abandoned = []
+    for round_id, user_id in active:
+        if user_id in kept_users:
+            abandoned.append(round_id)
+        kept_users.add(user_id)
+    if abandoned:
+        connection.execute(delete(HoleScores).where(HoleScores.round_id.in_(abandoned)))
+        connection.execute(delete(Rounds).where(Rounds.id.in_(abandoned)))
+        logger.info("Deleted %s abandoned active rounds: %s", len(abandoned), abandoned)
+    create_index(connection, Rounds.__table__, "uq_rounds_one_active_per_user")
+
+
+def add_updated_at(connection: Connection) -> None:
+    """rounds.updated_at and clubs.updated_at, the ETag stamps, start at the upgrade time"""
+    now = datetime.now(timezone.utc)
+    for column in (Rounds.__table__.c.updated_at, Clubs.__table__.c.updated_at):
+        if not has_column(connection, column):
+            add_column(connection, column)
+            connection.execute(update(column.table).values({column.name: now}))
+            set_not_null(connection, column)
+
+
+def add_row_versions(connection: Connection) -> None:
+    """rounds.version and hole_scores.version, existing rows start at version 1"""
+    for column in (Rounds.__table__.c.version, HoleScores.__table__.c.version):
+        if not has_column(connection, column):
+            add_column(connection, column, default="1")
+
+
+UPGRADE_STEPS = [
+    add_token_expiry,
+    add_round_history_index,
+    add_one_active_round_index,
+    add_updated_at,
+    add_row_versions,
+]
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Run every upgrade step, each in its own transaction"""
+    for step in UPGRADE_STEPS:
+        with engine.begin() as connection:
+            step(connection)
+
+
+if __name__ == "__main__":
+    from app.db_setup import init_db
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
@@ -1,4 +1,6 @@
 import base64
+import time
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta, timezone
 from random import SystemRandom
 from typing import Annotated
@@ -6,17 +8,27 @@ from uuid import UUID, uuid4
 
 from app.api.v1.core.models import Token, Users
 from app.db_setup import get_db
+from app.password_pool import PasswordPoolFull, password_pool
 from app.settings import settings
-from fastapi import Depends, HTTPException, status
+from app.signed_tokens import create_signed_token, decode_signed_token, revoked_tokens
+from app.token_cache import token_cache
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from pydantic import ValidationError
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/auth/token")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min and max rounds pin the cost, so needs_update flags hashes made with any other cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 DEFAULT_ENTROPY = 32  # number of bytes to return by default
 _sysrand = SystemRandom()
@@ -30,6 +42,39 @@ def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _verify_and_check_cost(plain_password, hashed_password):
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, False
+    return True, pwd_context.needs_update(hashed_password)
+
+
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please try again",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def hash_password_async(password):
+    """Hash a password on the password worker pool."""
+    try:
+        return await password_pool.run(hash_password, password)
+    except PasswordPoolFull:
+        raise _password_pool_busy()
+
+
+async def verify_password_async(plain_password, hashed_password) -> tuple[bool, bool]:
+    """
+    Verify a password on the password worker pool.
+    Returns (valid, needs_rehash), needs_rehash is True when the stored hash used another bcrypt cost.
+    """
+    try:
+        return await password_pool.run(_verify_and_check_cost, plain_password, hashed_password)
+    except PasswordPoolFull:
+        raise _password_pool_busy()
+
+
 def token_bytes(nbytes=None):
     """Return a random byte string containing *nbytes* bytes.
 
@@ -61,50 +106,164 @@ def token_urlsafe(nbytes=None):
 
 def create_database_token(user_id: UUID, db: Session):
     randomized_token = token_urlsafe()
-    new_token = Token(token=randomized_token, user_id=user_id)
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    new_token = Token(token=randomized_token, user_id=user_id, expires_at=expires_at)
     db.add(new_token)
     db.commit()
     return new_token
 
 
+def create_access_token(user: Users, db: Session) -> str:
+    """Issue an access token for the user, in the format selected by AUTH_TOKEN_MODE."""
+    if settings.AUTH_TOKEN_MODE == "signed":
+        token, _ = create_signed_token(
+            user_id=user.id,
+            is_admin=user.is_admin,
+            expires_in_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+        )
+        # Keep the session consistent with database mode, e.g. a rehashed password
+        db.commit()
+        return token
+    return create_database_token(user_id=user.id, db=db).token
+
+
+def revoke_access_token(token_str: str, db: Session) -> None:
+    """
+    Log out a token. Database tokens are deleted, signed tokens have their id added
+    to the revocation set, which is saved so it survives restarts.
+    """
+    if settings.AUTH_TOKEN_MODE == "signed":
+        claims = verify_signed_token(token_str)
+        revoked_tokens.add(claims["jti"], claims["exp"])
+        revoked_tokens.save(settings.REVOKED_TOKENS_FILE)
+    else:
+        token = verify_token_access(token_str=token_str, db=db)
+        db.execute(delete(Token).where(Token.id == token.id))
+        db.commit()
+    token_cache.invalidate_token(token_str)
+
+
+def revoke_signed_tokens_of_user(user_id: int, keep_token: str | None = None) -> None:
+    """
+    Revoke every signed token issued to the user so far, except keep_token, e.g. after a
+    password change. Does nothing in database mode, where the tokens are rows to delete.
+    """
+    if settings.AUTH_TOKEN_MODE != "signed":
+        return
+    keep_claims = decode_signed_token(keep_token) if keep_token else None
+    revoked_tokens.revoke_user(
+        user_id,
+        expires_at=int(time.time()) + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        keep_token_id=keep_claims["jti"] if keep_claims else None,
+    )
+    revoked_tokens.save(settings.REVOKED_TOKENS_FILE)
+
+
 ### Getting users
 
 
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token invalid",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def verify_signed_token(token_str: str) -> dict:
+    """
+    Return the claims of a signed token.
+    Tokens with a bad signature, past their expiry, revoked by logout or issued before a
+    password change are rejected.
+    """
+    claims = decode_signed_token(token_str)
+    if claims is None or revoked_tokens.is_revoked(claims):
+        raise _invalid_token()
+    return claims
+
+
 def verify_token_access(token_str: str, db: Session) -> Token:
     """
-    Return a token
+    Return a token, expired tokens are rejected
     """
     token = (
-        db.execute(select(Token).where(Token.token == token_str)).scalars().first())
+        db.execute(
+            select(Token).where(
+                Token.token == token_str,
+                Token.expires_at > datetime.now(timezone.utc),
+            )
+        ).scalars().first())
     
     if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token invalid",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _invalid_token()
     return token
 
 
 def get_current_user(
+    request: Request,
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Session = Depends(get_db)
 ) -> Users:
+    """
+    Resolve the bearer token to a user.
+    Served from token_cache when possible, so hot routes skip the token and user queries.
+    Signed tokens are checked without the tokens table. A cache miss still loads the user by
+    primary key, routes that need only the user id and admin flag use get_current_principal.
+    """
+    claims = verify_signed_token(token) if settings.AUTH_TOKEN_MODE == "signed" else None
+
+    route = request.scope.get("route")
+    cached_user = token_cache.get(token, route=route.path if route else None)
+    if cached_user is not None:
+        return cached_user
+
+    if claims is not None:
+        user = db.get(Users, claims["sub"])
+        if not user:
+            raise _invalid_token()
+        return token_cache.set(
+            token, user, expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc)
+        )
+
     token_obj = verify_token_access(token_str=token, db=db)
     user = token_obj.user
 
     db.commit()
     db.refresh(user)
-    return user
+    return token_cache.set(token, user, expires_at=token_obj.expires_at)
 
 
+@dataclass(frozen=True)
+class Principal:
+    """The caller, for routes that need only the user id and the admin flag"""
+    id: int
+    is_admin: bool
+
+
+def get_current_principal(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Resolve the bearer token to a Principal.
+    Signed tokens are answered from their claims alone, without the database or the token
+    cache. The admin flag is the one at login, it changes with the next token. Database tokens
+    are resolved by get_current_user.
+    """
+    if settings.AUTH_TOKEN_MODE == "signed":
+        claims = verify_signed_token(token)
+        return Principal(id=claims["sub"], is_admin=bool(claims.get("adm")))
+    user = get_current_user(request, token, db)
+    return Principal(id=user.id, is_admin=user.is_admin)
+
 
 def get_current_admin(
-    current_user: Annotated[Users, Depends(get_current_user)],
-) -> Users:
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+) -> Principal:
     """
     Dependency that verifies the current user is a superuser.
-    Returns the user object if the user is a superuser,
+    Returns the principal if the user is a superuser,
     otherwise raises an HTTP 403 Forbidden exception.
     """
     if not current_user.is_admin:
@@ -114,13 +273,3 @@ def get_current_admin(
             headers={"WWW-Authenticate": "Bearer"},
         )
     return current_user
-
-def get_current_token(
-    token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)
-):
-    """
-    oauth2_scheme automatically extracts the token from the authentication header
-    Used when we simply want to return the token, instead of returning a user. E.g for logout
-    """
-    token = verify_token_access(token_str=token, db=db)
-    return token
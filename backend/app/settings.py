@@ -1,12 +1,31 @@
+from typing import Literal
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DB_URL: str
+    ASYNC_DB_URL: str | None = None  # Derived from DB_URL when not set
+    # Connection pool (ignored for SQLite, which uses SQLAlchemy's default pools)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False  # Set to True to log every SQL statement
+    # Count statements per request and warn about repeated statement shapes (N+1 queries)
+    QUERY_DEBUG: bool = False
+    QUERY_DEBUG_REPEAT_THRESHOLD: int = 3
     GEMINI_API_KEY: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # "database" stores opaque tokens in the tokens table,
+    # "signed" issues HMAC signed tokens that are verified without a query
+    AUTH_TOKEN_MODE: Literal["database", "signed"] = "database"
+    SIGNED_TOKEN_SECRET: str | None = None  # Required when AUTH_TOKEN_MODE is "signed"
+    REVOKED_TOKENS_FILE: str = "revoked_tokens.json"
     PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 60
     FRONTEND_BASE_URL: str = "http://localhost:5173" # Frontend URL for reset links
     TAVILY_API_KEY: str
@@ -14,7 +33,38 @@ class Settings(BaseSettings):
     LANGSMITH_TRACING: bool
     LANGSMITH_ENDPOINT: str
     LANGSMITH_PROJECT: str
+    # Build the Gemini client and compile the agent graph during startup instead of on the first AI request
+    AGENT_WARMUP_ON_STARTUP: bool = False
+
+    # Bearer token -> user cache used by get_current_user
+    TOKEN_CACHE_MAXSIZE: int = 1024
+    TOKEN_CACHE_TTL_SECONDS: int = 60
+    # Per (user, course, tee) scoring analytics, dropped when a round on the course is completed or deleted
+    ANALYTICS_CACHE_MAXSIZE: int = 2048
+    ANALYTICS_CACHE_TTL_SECONDS: int = 3600
+    # Background deletion of expired tokens
+    TOKEN_REAPER_INTERVAL_SECONDS: int = 300
+    TOKEN_REAPER_BATCH_SIZE: int = 500
+
+    # "inline" recalculates the handicap in the round completion transaction, "background" queues
+    # a durable job in that transaction and lets the handicap worker recalculate it
+    HANDICAP_RECALC_MODE: Literal["inline", "background"] = "inline"
+    HANDICAP_JOB_POLL_SECONDS: int = 5
+    HANDICAP_JOB_BATCH_SIZE: int = 50
+    HANDICAP_JOB_MAX_ATTEMPTS: int = 3
+    HANDICAP_JOB_STALE_SECONDS: int = 300  # A running job older than this is claimed again
+
+    # Password hashing. Hashes using another cost are rehashed on the next login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64
         
     model_config = SettingsConfigDict(env_file=".env")
 
+    @model_validator(mode="after")
+    def check_signed_token_secret(self):
+        if self.AUTH_TOKEN_MODE == "signed" and not self.SIGNED_TOKEN_SECRET:
+            raise ValueError("SIGNED_TOKEN_SECRET is required when AUTH_TOKEN_MODE is 'signed'")
+        return self
+
 settings = Settings()
@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from threading import Lock
+
+from app.settings import settings
+
+# Bytes of randomness in the token id, enough to be unique while keeping the revocation set small
+TOKEN_ID_BYTES = 12
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(payload: str) -> str:
+    digest = hmac.new(settings.SIGNED_TOKEN_SECRET.encode(), payload.encode("ascii"), hashlib.sha256).digest()
+    return _b64encode(digest)
+
+
+def create_signed_token(user_id: int, is_admin: bool, expires_in_minutes: int) -> tuple[str, dict]:
+    """
+    Return a self-contained token and its claims.
+    The token is base64(claims) + "." + base64(HMAC-SHA256(claims)).
+    iat is a float, so a revocation of all the user's tokens spares those issued right after it.
+    """
+    now = time.time()
+    claims = {
+        "sub": user_id,
+        "adm": is_admin,
+        "iat": now,
+        "exp": int(now) + expires_in_minutes * 60,
+        "jti": secrets.token_urlsafe(TOKEN_ID_BYTES),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_signature(payload)}", claims
+
+
+def decode_signed_token(token: str) -> dict | None:
+    """Return the claims of a token with a valid signature that has not expired, otherwise None."""
+    payload, _, signature = token.partition(".")
+    if not signature or not hmac.compare_digest(signature, _signature(payload)):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if claims.get("exp", 0) <= time.time():
+        return None
+    return claims
+
+
+class RevocationSet:
+    """
+    Token ids revoked by logout, and per user the time before which all of the user's tokens
+    are revoked, set by a password change. Each entry is kept only until the tokens it revokes
+    would have expired anyway.
+    Can be saved to and loaded from a JSON file so revocations survive restarts.
+    """
+
+    def __init__(self):
+        self._expiry_by_id: dict[str, int] = {}
+        # user id -> (tokens issued before are revoked, expiry, token id that stays valid)
+        self._cutoff_by_user: dict[int, tuple[float, int, str | None]] = {}
+        self._lock = Lock()
+
+    def _prune(self) -> None:
+        now = time.time()
+        for token_id in [token_id for token_id, exp in self._expiry_by_id.items() if exp <= now]:
+            del self._expiry_by_id[token_id]
+        for user_id in [user_id for user_id, (_, exp, _) in self._cutoff_by_user.items() if exp <= now]:
+            del self._cutoff_by_user[user_id]
+
+    def add(self, token_id: str, expires_at: int) -> None:
+        with self._lock:
+            self._prune()
+            self._expiry_by_id[token_id] = expires_at
+
+    def revoke_user(self, user_id: int, expires_at: int, keep_token_id: str | None = None) -> None:
+        """
+        Revoke every token of the user issued until now, except keep_token_id.
+        expires_at is when the last of those tokens expires.
+        """
+        with self._lock:
+            self._prune()
+            self._cutoff_by_user[user_id] = (time.time(), expires_at, keep_token_id)
+
+    def is_revoked(self, claims: dict) -> bool:
+        now = time.time()
+        with self._lock:
+            exp = self._expiry_by_id.get(claims["jti"])
+            if exp is not None and exp > now:
+                return True
+            cutoff = self._cutoff_by_user.get(claims["sub"])
+            if cutoff is None:
+                return False
+            issued_before, exp, keep_token_id = cutoff
+            return exp > now and claims["iat"] < issued_before and claims["jti"] != keep_token_id
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._expiry_by_id) + len(self._cutoff_by_user)
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            self._prune()
+            data = {
+                "tokens": dict(self._expiry_by_id),
+                "users": {str(user_id): list(cutoff) for user_id, cutoff in self._cutoff_by_user.items()},
+            }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            data = json.load(f)
+        with self._lock:
+            self._expiry_by_id.update({token_id: int(exp) for token_id, exp in data.get("tokens", {}).items()})
+            self._cutoff_by_user.update({
+                int(user_id): (float(issued_before), int(exp), keep_token_id)
+                for user_id, (issued_before, exp, keep_token_id) in data.get("users", {}).items()
+            })
+            self._prune()
+
+
+revoked_tokens = RevocationSet()
@@ -0,0 +1,105 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from threading import Lock
+
+from cachetools import TTLCache
+
+from app.api.v1.core.models import Users
+from app.settings import settings
+
+# Number of DB round trips get_current_user performs on a cache miss
+# (token lookup, lazy load of token.user, commit + refresh of the user)
+ROUND_TRIPS_PER_MISS = 3
+
+
+def as_utc(value: datetime) -> datetime:
+    """SQLite returns naive datetimes, all stored times are UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def snapshot_user(user: Users) -> Users:
+    """
+    Return a detached copy of a user holding only its column values.
+    The copy is never attached to a session, so it is safe to share between requests.
+    """
+    values = {column.key: getattr(user, column.key) for column in Users.__table__.columns}
+    return Users(**values)
+
+
+class TokenCache:
+    """
+    Bounded LRU/TTL cache mapping bearer tokens to user snapshots.
+    Entries are never served past the expiry of their token.
+    Keeps hit/miss counters, both in total and per route.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.route_hits = defaultdict(int)
+        self.route_misses = defaultdict(int)
+
+    def get(self, token: str, route: str | None = None) -> Users | None:
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry is not None and entry[1] <= datetime.now(timezone.utc):
+                self._cache.pop(token, None)
+                entry = None
+            user = entry[0] if entry else None
+            if user is None:
+                self.misses += 1
+                if route:
+                    self.route_misses[route] += 1
+            else:
+                self.hits += 1
+                if route:
+                    self.route_hits[route] += 1
+            return user
+
+    def set(self, token: str, user: Users, expires_at: datetime) -> Users:
+        snapshot = snapshot_user(user)
+        with self._lock:
+            self._cache[token] = (snapshot, as_utc(expires_at))
+        return snapshot
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            self._cache.pop(token, None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            stale = [token for token, (user, _) in self._cache.items() if user.id == user_id]
+            for token in stale:
+                self._cache.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = sorted(set(self.route_hits) | set(self.route_misses))
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl_seconds": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "db_round_trips_saved": self.hits * ROUND_TRIPS_PER_MISS,
+                "routes": {
+                    route: {
+                        "hits": self.route_hits[route],
+                        "misses": self.route_misses[route],
+                        "db_round_trips_saved": self.route_hits[route] * ROUND_TRIPS_PER_MISS,
+                    }
+                    for route in routes
+                },
+            }
+
+
+token_cache = TokenCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
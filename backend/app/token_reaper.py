@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.api.v1.core.models import Token
+from app.db_setup import engine
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Outcome of the most recent reaper runs, reported by the admin endpoint
+reaper_stats = {
+    "runs": 0,
+    "total_deleted": 0,
+    "last_run_at": None,
+    "last_run_deleted": 0,
+    "last_run_batches": 0,
+    "last_error": None,
+}
+
+
+def reap_expired_tokens(batch_size: int) -> int:
+    """
+    Delete expired tokens in batches of at most batch_size rows.
+    Each batch is its own short transaction, so the reaper never holds long locks on tokens.
+    Returns the number of deleted rows.
+    """
+    now = datetime.now(timezone.utc)
+    deleted = 0
+    batches = 0
+    with Session(engine) as session:
+        while True:
+            expired_ids = (
+                select(Token.id)
+                .where(Token.expires_at <= now)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = session.execute(delete(Token).where(Token.id.in_(expired_ids)))
+            session.commit()
+            batches += 1
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+
+    reaper_stats["last_run_batches"] = batches
+    return deleted
+
+
+async def run_token_reaper():
+    """Background loop started from the app lifespan."""
+    while True:
+        try:
+            deleted = await asyncio.to_thread(reap_expired_tokens, settings.TOKEN_REAPER_BATCH_SIZE)
+            reaper_stats["last_error"] = None
+            logger.info("Token reaper deleted %s expired tokens", deleted)
+        except Exception as e:
+            deleted = 0
+            reaper_stats["last_error"] = str(e)
+            logger.exception("Token reaper failed")
+
+        reaper_stats["runs"] += 1
+        reaper_stats["total_deleted"] += deleted
+        reaper_stats["last_run_deleted"] = deleted
+        reaper_stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+
+        await asyncio.sleep(settings.TOKEN_REAPER_INTERVAL_SECONDS)
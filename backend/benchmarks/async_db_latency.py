@@ -0,0 +1,113 @@
+"""
+Compare request latency of the blocking Session path against the AsyncSession path
+under concurrent load.
+
+Both endpoints run the same course search query (plus an optional artificially slow
+query). The "sync" endpoint is the old pattern: an `async def` handler calling the
+blocking Session from get_db, which stalls the event loop for every in-flight request.
+With a concurrency above the sync pool size plus overflow, that path can stall until
+the pool timeout, since connections are only returned once the loop gets control back.
+Failed requests are counted in "errors" rather than aborting the run.
+
+The difference is most visible against Postgres, where query time is spent waiting on
+the network; SQLite queries are mostly CPU bound in-process.
+
+Run from the backend directory, against the database configured in .env:
+
+    python -m benchmarks.async_db_latency --requests 400 --concurrency 10 --slow-rows 200000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.api.v1.core.models import CourseTees, GolfCourses
+from app.db_setup import get_async_db, get_db, init_db
+from benchmarks.stats import summarize
+
+# Portable CPU-bound query used to simulate a slow statement on SQLite and Postgres
+SLOW_QUERY = text(
+    "WITH RECURSIVE counter(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM counter WHERE x < :rows) "
+    "SELECT count(*) FROM counter"
+)
+
+
+def course_query():
+    return (
+        select(GolfCourses)
+        .options(selectinload(GolfCourses.tees).selectinload(CourseTees.holes))
+        .limit(10)
+    )
+
+
+def build_app(slow_rows: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_endpoint(db: Session = Depends(get_db)):
+        if slow_rows:
+            db.execute(SLOW_QUERY, {"rows": slow_rows})
+        return len(db.execute(course_query()).scalars().all())
+
+    @app.get("/async")
+    async def async_endpoint(db: AsyncSession = Depends(get_async_db)):
+        if slow_rows:
+            await db.execute(SLOW_QUERY, {"rows": slow_rows})
+        return len((await db.execute(course_query())).scalars().all())
+
+    return app
+
+
+async def run_load(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.is_error:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {"concurrency": concurrency, **summarize(latencies, errors, elapsed)}
+
+
+async def main(args) -> dict:
+    init_db()
+    app = build_app(args.slow_rows)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    results = {"slow_rows": args.slow_rows}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode in ("sync", "async"):
+            # Warm up connections before measuring
+            await run_load(client, f"/{mode}", args.concurrency, args.concurrency)
+            results[mode] = await run_load(client, f"/{mode}", args.requests, args.concurrency)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--slow-rows", type=int, default=0, help="Rows for the simulated slow query, 0 disables it")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,88 @@
+"""
+Measure the cold import cost of the API so startup regressions show up in review.
+
+Each module is imported in a fresh interpreter with -X importtime. The script records
+wall time and the modules with the highest cumulative import time, and writes JSON.
+
+Run from the backend directory:
+
+    python -m benchmarks.import_time --output import_time.json
+
+The default targets are main (the whole app) and app.api.v1.routers. Neither of them
+should construct an LLM client or touch the network at import time.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+DEFAULT_MODULES = ("main", "app.api.v1.routers")
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Parse lines of the form 'import time: self [us] | cumulative | imported package'."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return entries
+
+
+def measure(module: str, top: int) -> dict:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        error_lines = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        return {"module": module, "ok": False, "wall_ms": round(wall_ms, 1), "error": "\n".join(error_lines[-5:])}
+
+    entries = parse_importtime(completed.stderr)
+    slowest = sorted(entries, key=lambda entry: entry["cumulative_ms"], reverse=True)[:top]
+    return {
+        "module": module,
+        "ok": True,
+        "wall_ms": round(wall_ms, 1),
+        "modules_imported": len(entries),
+        "slowest": slowest,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--repeat", type=int, default=3, help="Cold imports per module, the fastest is reported")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    measurements = []
+    for module in args.modules:
+        runs = [measure(module, args.top) for _ in range(args.repeat)]
+        measurements.append(min(runs, key=lambda run: (not run["ok"], run["wall_ms"])))
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "repeat": args.repeat,
+        },
+        "imports": measurements,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
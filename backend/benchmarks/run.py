@@ -0,0 +1,223 @@
+"""
+Drive the FastAPI app in-process and measure requests/s and p50/p95/p99 latency.
+
+Scenarios: login, /me, round start, hole updates, round completion (including the
+handicap recalculation), round history and course search. Results are written as JSON
+so runs can be compared.
+
+Run from the backend directory, against the database configured in .env:
+
+    python -m benchmarks.run --seed --reset --users 50 --rounds-per-user 100 --output results.json
+
+Without --seed the database must already hold data from benchmarks.seed.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.api.v1.core.models import CourseTees, Users
+from app.db_setup import engine, init_db
+from app.settings import settings
+from benchmarks import seed as seed_module
+from benchmarks.stats import summarize
+
+SCENARIOS = ("login", "me", "course_search", "history", "round_start", "hole_update", "round_complete")
+
+
+class Recorder:
+    """Collects latencies and errors per scenario."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.elapsed = defaultdict(float)
+
+    async def request(self, client: httpx.AsyncClient, scenario: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[scenario].append((time.perf_counter() - start) * 1000)
+        if response.is_error:
+            self.errors[scenario] += 1
+        return response
+
+    async def phase(self, scenario: str, calls, concurrency: int):
+        """Run the coroutine factories in calls with bounded concurrency and time the whole phase."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(call):
+            async with semaphore:
+                return await call()
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(call) for call in calls))
+        self.elapsed[scenario] += time.perf_counter() - start
+        return results
+
+    def results(self) -> dict:
+        return {
+            scenario: summarize(self.latencies[scenario], self.errors[scenario], self.elapsed[scenario])
+            for scenario in SCENARIOS
+            if scenario in self.latencies
+        }
+
+
+def bench_users(limit: int) -> list[str]:
+    with Session(engine) as session:
+        return session.scalars(
+            select(Users.email)
+            .where(Users.email.like("bench-user-%@example.com"))
+            .order_by(Users.id)
+            .limit(limit)
+        ).all()
+
+
+def bench_tees() -> list[tuple[int, int, int]]:
+    """(course_id, tee_id, number of holes) for every tee in the catalog."""
+    with Session(engine) as session:
+        tees = session.scalars(select(CourseTees)).all()
+        return [(tee.course_id, tee.id, len(tee.holes)) for tee in tees]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    from main import app
+
+    init_db()
+    emails = bench_users(args.users)
+    if not emails:
+        raise SystemExit("No benchmark users found, run with --seed or python -m benchmarks.seed first")
+    tees = bench_tees()
+    recorder = Recorder()
+    concurrency = args.concurrency
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench/v1", timeout=60) as client:
+
+        # Login, every user logs in at least once so later scenarios have a token
+        logins = [emails[i % len(emails)] for i in range(max(args.requests, len(emails)))]
+        responses = await recorder.phase("login", [
+            lambda email=email: recorder.request(
+                client, "login", "POST", "/auth/token",
+                data={"username": email, "password": seed_module.BENCH_PASSWORD},
+            )
+            for email in logins
+        ], concurrency)
+        headers_by_email = {}
+        for email, response in zip(logins, responses):
+            if response.status_code == 200:
+                headers_by_email[email] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        all_headers = list(headers_by_email.values())
+
+        def spread(scenario, method, url_for):
+            return [
+                lambda i=i: recorder.request(
+                    client, scenario, method, url_for(i), headers=all_headers[i % len(all_headers)]
+                )
+                for i in range(args.requests)
+            ]
+
+        await recorder.phase("me", spread("me", "GET", lambda i: "/me"), concurrency)
+        await recorder.phase("course_search", spread(
+            "course_search", "GET", lambda i: f"/courses?search=Bench Golf Club {i % 10}&use_meters=true"
+        ), concurrency)
+        await recorder.phase("history", spread(
+            "history", "GET", lambda i: f"/rounds/history?limit=20&offset={(i * 20) % 200}"
+        ), concurrency)
+
+        # Round lifecycle: every user starts a round, scores every hole and completes it
+        for cycle in range(args.round_cycles):
+            players = list(enumerate(all_headers))
+            # Complete rounds left active by an aborted earlier run, these are not measured
+            for _, headers in players:
+                active = (await client.get("/rounds/active", headers=headers)).json()
+                if active:
+                    await client.post(f"/rounds/{active['id']}/complete", headers=headers, json={})
+
+            starts = await recorder.phase("round_start", [
+                lambda i=i, headers=headers: recorder.request(
+                    client, "round_start", "POST", "/rounds/start", headers=headers,
+                    json={"course_id": tees[(i + cycle) % len(tees)][0], "tee_id": tees[(i + cycle) % len(tees)][1]},
+                )
+                for i, headers in players
+            ], concurrency)
+            rounds = [
+                (response.json(), headers)
+                for response, (_, headers) in zip(starts, players)
+                if response.status_code == 200
+            ]
+
+            await recorder.phase("hole_update", [
+                lambda round_data=round_data, headers=headers, hole=hole: recorder.request(
+                    client, "hole_update", "PUT", f"/rounds/{round_data['id']}/hole/{hole['hole_number']}",
+                    headers=headers, json={"shots": hole["par"] + (hole["hole_number"] % 3), "par": hole["par"]},
+                )
+                for round_data, headers in rounds
+                for hole in round_data["hole_scores"]
+            ], concurrency)
+
+            await recorder.phase("round_complete", [
+                lambda round_data=round_data, headers=headers: recorder.request(
+                    client, "round_complete", "POST", f"/rounds/{round_data['id']}/complete",
+                    headers=headers, json={"notes": "benchmark"},
+                )
+                for round_data, headers in rounds
+            ], concurrency)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "database": make_url(settings.DB_URL).get_backend_name(),
+            "auth_token_mode": settings.AUTH_TOKEN_MODE,
+            "users": len(all_headers),
+            "requests_per_scenario": args.requests,
+            "round_cycles": args.round_cycles,
+            "concurrency": concurrency,
+        },
+        "scenarios": recorder.results(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Generate data with benchmarks.seed first")
+    seed_module.add_arguments(parser)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per read scenario")
+    parser.add_argument("--round-cycles", type=int, default=2, help="Rounds played per user")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed_module.seed(
+            users=args.users,
+            clubs_per_user=args.clubs_per_user,
+            courses=args.courses,
+            tees_per_course=args.tees_per_course,
+            rounds_per_user=args.rounds_per_user,
+            random_seed=args.random_seed,
+            reset=args.reset,
+        )
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,231 @@
+"""
+Fill a database with synthetic users, clubs, course catalogs and completed rounds.
+
+Run from the backend directory, against the database configured in .env:
+
+    python -m benchmarks.seed --reset --users 50 --rounds-per-user 100
+
+Generated users are bench-user-<n>@example.com with the password BENCH_PASSWORD.
+The generator is deterministic for a given --random-seed.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.api.v1.core.course_endpoints.handicap import calculate_score_differential
+from app.api.v1.core.models import (
+    Base,
+    Clubs,
+    CourseHoles,
+    CourseTees,
+    GolfCourses,
+    HoleScores,
+    Rounds,
+    Users,
+)
+from app.db_setup import engine
+from app.security import hash_password
+
+BENCH_PASSWORD = "bench-password"
+BENCH_EMAIL = "bench-user-{}@example.com"
+TEE_NAMES = ["Yellow", "Red", "White", "Blue", "Black"]
+CLUB_NAMES = ["Driver", "3 Wood", "5 Wood", "4 Iron", "5 Iron", "6 Iron", "7 Iron", "8 Iron",
+              "9 Iron", "PW", "GW", "SW", "LW", "Putter"]
+HOLE_PARS_18 = [4, 4, 3, 5, 4, 4, 3, 4, 5, 4, 3, 4, 5, 4, 4, 3, 5, 4]
+# Strokes over par per hole and their weights, roughly a mid handicap player
+OVER_PAR = [-1, 0, 1, 2, 3]
+OVER_PAR_WEIGHTS = [4, 30, 40, 20, 6]
+BATCH_SIZE = 5000
+
+
+def _insert_batches(session: Session, table, rows: list[dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute(insert(table), rows[start:start + BATCH_SIZE])
+
+
+def seed_courses(session: Session, rng: random.Random, courses: int, tees_per_course: int) -> list[dict]:
+    """Create the course catalog, returns tee info used to generate rounds."""
+    tees = []
+    for course_number in range(courses):
+        total_holes = 9 if course_number % 5 == 4 else 18
+        pars = HOLE_PARS_18[:total_holes]
+        course = GolfCourses(
+            course_name=f"Bench Golf Club {course_number}",
+            location=f"Bench Town {course_number % 7}",
+            total_holes=total_holes,
+        )
+        for tee_number in range(tees_per_course):
+            distances = [par * 90 + rng.randint(-30, 40) - tee_number * 10 for par in pars]
+            total_par = sum(pars)
+            rating = round(total_par * (2 if total_holes == 9 else 1) - 2 + rng.uniform(-2, 3) - tee_number, 1)
+            course.tees.append(CourseTees(
+                tee_name=TEE_NAMES[tee_number % len(TEE_NAMES)],
+                mens_rating=rating,
+                mens_slope=rng.randint(110, 140),
+                womens_rating=rating + 2,
+                womens_slope=rng.randint(110, 140),
+                total_distance=sum(distances),
+                total_par=total_par,
+                holes=[
+                    CourseHoles(hole_number=i + 1, distance_yards=distances[i], par=pars[i], handicap=i + 1)
+                    for i in range(total_holes)
+                ],
+            ))
+        session.add(course)
+    session.flush()
+
+    for tee in session.scalars(select(CourseTees).join(GolfCourses)).all():
+        tees.append({
+            "course_id": tee.course_id,
+            "tee_id": tee.id,
+            "course_name": tee.course.course_name,
+            "total_holes": tee.course.total_holes,
+            "rating": float(tee.mens_rating),
+            "slope": float(tee.mens_slope),
+            "total_par": tee.total_par,
+            "pars": [hole.par for hole in sorted(tee.holes, key=lambda hole: hole.hole_number)],
+        })
+    return tees
+
+
+def seed_users(session: Session, rng: random.Random, users: int, clubs_per_user: int) -> list[int]:
+    hashed_password = hash_password(BENCH_PASSWORD)
+    now = datetime.now(timezone.utc)
+    user_rows = [
+        {
+            "first_name": "Bench",
+            "last_name": f"User {n}",
+            "email": BENCH_EMAIL.format(n),
+            "is_admin": False,
+            "hashed_password": hashed_password,
+            "handicap_index": 54.0 if n % 3 == 0 else round(rng.uniform(2, 36), 1),
+            "last_handicap_update": now,
+        }
+        for n in range(users)
+    ]
+    _insert_batches(session, Users, user_rows)
+    user_ids = session.scalars(
+        select(Users.id).where(Users.email.like("bench-user-%@example.com")).order_by(Users.id)
+    ).all()
+
+    club_rows = [
+        {
+            "club": CLUB_NAMES[i % len(CLUB_NAMES)],
+            "distance_meter": max(10, 230 - i * 15 + rng.randint(-5, 5)),
+            "preferred_club": i == 0,
+            "user_id": user_id,
+        }
+        for user_id in user_ids
+        for i in range(clubs_per_user)
+    ]
+    _insert_batches(session, Clubs, club_rows)
+    return list(user_ids)
+
+
+def seed_rounds(session: Session, rng: random.Random, user_ids: list[int], tees: list[dict], rounds_per_user: int) -> int:
+    """Create completed rounds with hole scores, returns the number of rounds."""
+    now = datetime.now(timezone.utc)
+    round_rows = []
+    hole_shots = []
+    for user_id in user_ids:
+        for n in range(rounds_per_user):
+            tee = rng.choice(tees)
+            shots = [par + rng.choices(OVER_PAR, OVER_PAR_WEIGHTS)[0] for par in tee["pars"]]
+            start_time = now - timedelta(days=(rounds_per_user - n) * 3, hours=rng.randint(0, 8))
+            total_shots = sum(shots)
+            round_rows.append({
+                "user_id": user_id,
+                "course_name": tee["course_name"],
+                "course_id": tee["course_id"],
+                "tee_id": tee["tee_id"],
+                "total_holes": tee["total_holes"],
+                "start_time": start_time,
+                "end_time": start_time + timedelta(hours=4),
+                "total_shots": total_shots,
+                "total_par": tee["total_par"],
+                "score_relative_to_par": total_shots - tee["total_par"],
+                "score_differential": calculate_score_differential(
+                    adjusted_score=total_shots,
+                    course_rating=tee["rating"],
+                    slope_rating=tee["slope"],
+                    total_holes=tee["total_holes"],
+                    total_par=tee["total_par"],
+                ),
+                "included_in_handicap": False,
+                "is_completed": True,
+            })
+            hole_shots.append((tee["pars"], shots, start_time))
+
+    # Insert rounds in batches and attach hole scores using the returned ids
+    total = 0
+    for start in range(0, len(round_rows), BATCH_SIZE):
+        batch = round_rows[start:start + BATCH_SIZE]
+        round_ids = session.scalars(insert(Rounds).returning(Rounds.id, sort_by_parameter_order=True), batch).all()
+        hole_rows = []
+        for round_id, (pars, shots, start_time) in zip(round_ids, hole_shots[start:start + BATCH_SIZE]):
+            for i, (par, shot) in enumerate(zip(pars, shots)):
+                hole_rows.append({
+                    "round_id": round_id,
+                    "hole_number": i + 1,
+                    "par": par,
+                    "shots": shot,
+                    "score_relative_to_par": shot - par,
+                    "completed_at": start_time + timedelta(minutes=13 * (i + 1)),
+                })
+        _insert_batches(session, HoleScores, hole_rows)
+        total += len(batch)
+    return total
+
+
+def seed(users: int, clubs_per_user: int, courses: int, tees_per_course: int, rounds_per_user: int,
+         random_seed: int = 42, reset: bool = False) -> dict:
+    rng = random.Random(random_seed)
+    started = time.perf_counter()
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as session:
+        tees = seed_courses(session, rng, courses, tees_per_course)
+        user_ids = seed_users(session, rng, users, clubs_per_user)
+        rounds = seed_rounds(session, rng, user_ids, tees, rounds_per_user)
+        session.commit()
+
+    return {
+        "users": len(user_ids),
+        "clubs": len(user_ids) * clubs_per_user,
+        "courses": courses,
+        "tees": len(tees),
+        "rounds": rounds,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--clubs-per-user", type=int, default=10)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--tees-per-course", type=int, default=3)
+    parser.add_argument("--rounds-per-user", type=int, default=100)
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print(json.dumps(seed(
+        users=args.users,
+        clubs_per_user=args.clubs_per_user,
+        courses=args.courses,
+        tees_per_course=args.tees_per_course,
+        rounds_per_user=args.rounds_per_user,
+        random_seed=args.random_seed,
+        reset=args.reset,
+    ), indent=2))
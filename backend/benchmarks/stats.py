@@ -0,0 +1,23 @@
+import statistics
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies_ms: list[float], errors: int, elapsed_seconds: float) -> dict:
+    """Throughput and latency percentiles for one scenario."""
+    if not latencies_ms:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "requests_per_second": round(len(latencies_ms) / elapsed_seconds, 1),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies_ms), 2),
+    }
@@ -0,0 +1,86 @@
+"""
+Query budget fixture for endpoint tests.
+
+Declare a budget with the query_budget marker and request the fixture. Every request
+served by an app with MetricsMiddleware during the test is checked on teardown:
+
+    @pytest.mark.query_budget(statements=4)
+    def test_update_hole_score(client, query_budget):
+        client.put("/v1/rounds/1/hole/1", json={"shots": 4, "par": 4}, headers=auth)
+
+repeats limits how often one statement shape may run in a single request, which is
+what an N+1 query looks like. It defaults to QUERY_DEBUG_REPEAT_THRESHOLD - 1.
+
+Settings get test defaults here, before the app is imported. DB_URL points at a SQLite file
+unless TEST_DB_URL is set.
+"""
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+import pytest
+
+# Tests never touch the database configured in .env, the tables are dropped between tests
+os.environ["DB_URL"] = os.environ.get("TEST_DB_URL", f"sqlite:///{tempfile.gettempdir()}/golf_app_tests.db")
+os.environ.pop("ASYNC_DB_URL", None)
+for name, value in {
+    "GEMINI_API_KEY": "test", "TAVILY_API_KEY": "test", "LANGSMITH_API_KEY": "test",
+    "LANGSMITH_TRACING": "false", "LANGSMITH_ENDPOINT": "http://localhost", "LANGSMITH_PROJECT": "test",
+    "POSTGRES_USER": "test", "POSTGRES_PASSWORD": "test", "POSTGRES_DB": "test",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60", "BCRYPT_ROUNDS": "4",
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.metrics import RequestStats, request_observers
+from app.settings import settings
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(statements, repeats=None): fail when a request runs more SQL statements "
+        "than statements, or repeats one statement shape more than repeats times",
+    )
+
+
+@dataclass
+class QueryRecorder:
+    requests: list[tuple[str, str, RequestStats]] = field(default_factory=list)
+
+    def __call__(self, method: str, route: str, stats: RequestStats) -> None:
+        self.requests.append((method, route, stats))
+
+    def failures(self, max_statements: int | None, max_repeats: int) -> list[str]:
+        failures = []
+        for method, route, stats in self.requests:
+            if max_statements is not None and stats.statements > max_statements:
+                failures.append(f"{method} {route} ran {stats.statements} statements, budget is {max_statements}")
+            for shape, count in stats.repeated_statements(max_repeats + 1):
+                failures.append(f"{method} {route} ran the same statement {count} times: {shape}")
+        return failures
+
+
+@pytest.fixture
+def query_recorder():
+    """Statements of every request served while the test runs, without a budget"""
+    recorder = QueryRecorder()
+    request_observers.append(recorder)
+    try:
+        yield recorder
+    finally:
+        request_observers.remove(recorder)
+
+
+@pytest.fixture
+def query_budget(request, query_recorder):
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is None:
+        pytest.fail("query_budget fixture used without a @pytest.mark.query_budget(...) marker")
+    max_statements = marker.kwargs.get("statements", marker.args[0] if marker.args else None)
+    max_repeats = marker.kwargs.get("repeats", settings.QUERY_DEBUG_REPEAT_THRESHOLD - 1)
+
+    yield query_recorder
+
+    failures = query_recorder.failures(max_statements, max_repeats)
+    if failures:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(failures), pytrace=False)
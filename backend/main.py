@@ -1,9 +1,18 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from app.api.v1.core.react_agent.react_graph import warm_up_agent
 from app.api.v1.routers import router
-from app.db_setup import init_db
+from app.db_setup import async_engine, engine, init_db
+from app.handicap_jobs import run_handicap_worker
+from app.metrics import MetricsMiddleware, instrument_engine, metrics_registry
+from app.password_pool import password_pool
+from app.settings import settings
+from app.signed_tokens import revoked_tokens
+from app.token_reaper import run_token_reaper
 
 
 # Funktion som körs när vi startar FastAPI -
@@ -11,12 +20,36 @@ from app.db_setup import init_db
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db() 
+    if settings.AUTH_TOKEN_MODE == "signed":
+        revoked_tokens.load(settings.REVOKED_TOKENS_FILE)
+    background_tasks = [asyncio.create_task(run_token_reaper())]
+    if settings.HANDICAP_RECALC_MODE == "background":
+        background_tasks.append(asyncio.create_task(run_handicap_worker()))
+    if settings.AGENT_WARMUP_ON_STARTUP:
+        await asyncio.to_thread(warm_up_agent)
     yield
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    password_pool.shutdown()
+    if settings.AUTH_TOKEN_MODE == "signed":
+        revoked_tokens.save(settings.REVOKED_TOKENS_FILE)
 
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(router, prefix="/v1", tags=["v1"])
 
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Per route latency, SQL statement count and DB time histograms in Prometheus text format"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 origins = [
     "null",
 ]
@@ -27,4 +60,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
+app.add_middleware(MetricsMiddleware)
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Test app and fixtures. The app mounts the routers the tests exercise under /v1 with the
+metrics middleware, like main.py, without the AI routers and their LLM clients.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.analytics_cache import analytics_cache
+from app.api.v1.core.course_endpoints.courses import router as courses_router
+from app.api.v1.core.course_endpoints.rounds_endpoints import router as rounds_router
+from app.api.v1.core.models import Base, CourseHoles, CourseTees, GolfCourses
+from app.api.v1.core.user_endpoints.authentication import router as auth_router
+from app.api.v1.core.user_endpoints.users import router as user_router
+from app.db_setup import async_engine, engine
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.token_cache import token_cache
+
+HOLE_PARS = [4, 4, 3, 5, 4, 4, 3, 4, 5, 4, 3, 4, 5, 4, 4, 3, 5, 4]
+PASSWORD = "test-password"
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    for router in (user_router, auth_router, rounds_router, courses_router):
+        app.include_router(router, prefix="/v1", tags=["v1"])
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    return app
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(create_app()) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    token_cache.clear()
+    analytics_cache.clear()
+
+
+@pytest.fixture
+def auth_headers(client) -> dict:
+    user = {"email": "player@example.com", "first_name": "Test", "last_name": "Player",
+            "password": PASSWORD, "initial_handicap": 54.0}
+    assert client.post("/v1/user", json=user).status_code == 201
+    response = client.post("/v1/auth/token", data={"username": user["email"], "password": PASSWORD})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Resolve the token once so requests under test are served from the token cache
+    assert client.get("/v1/me", headers=headers).status_code == 200
+    return headers
+
+
+@pytest.fixture
+def tee() -> CourseTees:
+    with Session(engine, expire_on_commit=False) as session:
+        course = GolfCourses(course_name="Test Golf Club", location="Test Town", total_holes=len(HOLE_PARS))
+        tee = CourseTees(
+            course=course, tee_name="Yellow", mens_rating=70.1, mens_slope=125, total_par=sum(HOLE_PARS),
+            holes=[CourseHoles(hole_number=i + 1, par=par, handicap=i + 1) for i, par in enumerate(HOLE_PARS)],
+        )
+        session.add(course)
+        session.commit()
+        return tee
+
+
+@pytest.fixture
+def active_round(client, auth_headers, tee) -> dict:
+    response = client.post("/v1/rounds/start", json={"course_id": tee.course_id, "tee_id": tee.id}, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
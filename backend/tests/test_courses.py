@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.api.v1.core.models import CourseHoles
+from app.db_setup import engine
+
+
+def revalidate(client, etag: str):
+    return client.get("/v1/courses", params={"search": ""}, headers={"If-None-Match": etag})
+
+
+@pytest.mark.query_budget(statements=1)
+def test_unchanged_catalog_is_answered_from_the_version_stamp(client, tee, query_budget):
+    etag = client.get("/v1/courses", params={"search": ""}).headers["ETag"]
+    query_budget.requests.clear()
+    assert revalidate(client, etag).status_code == 304
+
+
+def test_catalog_writes_change_the_etag(client, tee):
+    etag = client.get("/v1/courses", params={"search": ""}).headers["ETag"]
+
+    with Session(engine) as session:
+        session.get(CourseHoles, tee.holes[0].id).par = 5
+        session.commit()
+    response = revalidate(client, etag)
+    assert response.status_code == 200
+    assert response.json()[0]["tees"][0]["holes"][0]["par"] == 5
+    etag = response.headers["ETag"]
+
+    with Session(engine) as session:
+        session.execute(update(CourseHoles).where(CourseHoles.hole_number == 2).values(par=3))
+        session.commit()
+    assert revalidate(client, etag).status_code == 200
@@ -0,0 +1,66 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.api.v1.core.course_endpoints.handicap import calculate_new_handicap, calculate_score_differential
+from app.api.v1.core.course_endpoints.handicap_arrays import (
+    handicap_indexes,
+    round1,
+    score_differentials,
+    windows_from_ragged,
+)
+
+
+def random_round(rng: random.Random) -> tuple:
+    total_holes = rng.choice([9, 18])
+    total_par = rng.randint(27, 37) if total_holes == 9 else rng.randint(54, 74)
+    # 9-hole tees store either a 9-hole or an 18-hole rating
+    rating = round(rng.uniform(total_par - 20, total_par + 5) * rng.choice([1, 2] if total_holes == 9 else [1]), 1)
+    return rng.randint(total_holes * 2, total_holes * 9), rating, rng.randint(55, 155), total_holes, total_par
+
+
+def test_round1_matches_round():
+    rng = random.Random(1)
+    values = [rng.randint(-100000, 100000) / 100 + rng.choice([0, 0.05, -0.05]) for _ in range(20000)]
+    assert round1(np.array(values)).tolist() == [round(value, 1) for value in values]
+    for value in values[:2000]:
+        assert round1(value) == round(value, 1)
+
+
+def test_score_differentials_scalar_parity():
+    rng = random.Random(2)
+    assert score_differentials(85, 50.9, 62, 18, 70) == calculate_score_differential(85, 50.9, 62, 18, 70) == 62.1
+    for _ in range(50000):
+        args = random_round(rng)
+        assert score_differentials(*args) == calculate_score_differential(*args), args
+
+
+def test_score_differentials_array_parity():
+    rng = random.Random(3)
+    rounds = [random_round(rng) for _ in range(50000)]
+    columns = [np.array(column) for column in zip(*rounds)]
+    assert score_differentials(*columns).tolist() == [calculate_score_differential(*args) for args in rounds]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_handicap_indexes_match_calculate_new_handicap(seed):
+    rng = random.Random(seed)
+    users = 500
+    counts = [rng.randint(0, 30) for _ in range(users)]
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    differentials = np.array([round(rng.uniform(-3, 45), 1) for _ in range(offsets[-1])])
+    round_ids = np.arange(offsets[-1])
+    current = np.array([rng.choice([54.0, round(rng.uniform(0, 40), 1)]) for _ in range(users)])
+    lows = np.array([rng.choice([np.nan, round(rng.uniform(0, 40), 1)]) for _ in range(users)])
+
+    sorted_differentials, _, window_counts = windows_from_ragged(differentials, round_ids, offsets)
+    new_handicaps, used = handicap_indexes(sorted_differentials, window_counts, current, lows)
+    for user in range(users):
+        window = sorted(differentials[max(offsets[user], offsets[user + 1] - 20):offsets[user + 1]].tolist())
+        low = None if np.isnan(lows[user]) else float(lows[user])
+        expected = calculate_new_handicap(window, float(current[user]), low)
+        if expected is None:
+            assert np.isnan(new_handicaps[user])
+        else:
+            assert (float(new_handicaps[user]), int(used[user])) == expected
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.v1.core.course_endpoints.handicap_recompute import evaluate_chunk, stream_chunks, write_chunk
+from app.api.v1.core.models import HandicapHistory, HandicapWindows, Rounds, Users
+from app.db_setup import engine
+
+
+def add_player(session: Session, tee, name: str, shots: list[int]) -> Users:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    user = Users(first_name=name, last_name="Player", email=f"{name}@example.com",
+                 hashed_password="x", handicap_index=54.0, last_handicap_update=start)
+    user.rounds = [
+        Rounds(course_name="Test Golf Club", course_id=tee.course_id, tee_id=tee.id, total_holes=18,
+               start_time=start + timedelta(days=day), end_time=start + timedelta(days=day, hours=4),
+               total_shots=total, total_par=tee.total_par, is_completed=True)
+        for day, total in enumerate(shots)
+    ]
+    session.add(user)
+    return user
+
+
+def test_users_changed_after_the_stream_read_are_skipped(tee):
+    with Session(engine, expire_on_commit=False) as session:
+        live, edited, untouched = (add_player(session, tee, name, [90, 88, 95])
+                                   for name in ("live", "edited", "untouched"))
+        session.commit()
+
+    with Session(engine) as read_session:
+        [chunk] = stream_chunks(read_session, chunk_users=10)
+    result = evaluate_chunk(chunk)
+
+    # Between the read and the write the API completes a round of one user and edits a round of another
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        user = session.get(Users, live.id)
+        user.handicap_index = 20.0
+        user.last_handicap_update = now
+        session.add(Rounds(user_id=live.id, course_name="Test Golf Club", tee_id=tee.id, total_holes=18,
+                           start_time=now, end_time=now, total_shots=80, total_par=tee.total_par,
+                           is_completed=True))
+        session.add(HandicapWindows(user_id=live.id))
+        session.get(Rounds, edited.rounds[0].id).total_shots = 85
+        session.commit()
+
+    with Session(engine) as session:
+        stale = write_chunk(session, result)
+    assert dict(zip(result.user_ids.tolist(), stale.tolist())) == {live.id: True, edited.id: True, untouched.id: False}
+
+    with Session(engine) as session:
+        assert float(session.get(Users, live.id).handicap_index) == 20.0
+        assert float(session.get(Users, edited.id).handicap_index) == 54.0
+        assert float(session.get(Users, untouched.id).handicap_index) != 54.0
+        assert session.scalars(select(HandicapHistory.user_id)).all() == [untouched.id]
+        assert session.scalars(select(HandicapWindows.user_id)).all() == [live.id]
+        differentials = session.scalars(
+            select(Rounds.score_differential).where(Rounds.user_id.in_([live.id, edited.id]))
+        ).all()
+        assert differentials == [None] * 7
@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta, timezone
+
+from app.token_cache import as_utc
+
+
+def sync_hole(client, round_id: int, headers: dict, shots: int, completed_at: datetime):
+    body = {"holes": [{"hole_number": 1, "shots": shots, "par": 4, "completed_at": completed_at.isoformat()}]}
+    return client.put(f"/v1/rounds/{round_id}/holes", json=body, headers=headers)
+
+
+def test_future_completed_at_does_not_shadow_later_syncs(client, auth_headers, active_round):
+    now = datetime.now(timezone.utc)
+    response = sync_hole(client, active_round["id"], auth_headers, 7, now + timedelta(days=1))
+    assert response.status_code == 200
+    hole = response.json()["hole_scores"][0]
+    assert hole["shots"] == 7
+    assert as_utc(datetime.fromisoformat(hole["completed_at"])) <= datetime.now(timezone.utc)
+
+    response = sync_hole(client, active_round["id"], auth_headers, 4, datetime.now(timezone.utc))
+    assert response.status_code == 200
+    assert response.json()["hole_scores"][0]["shots"] == 4
+    assert response.json()["total_shots"] == 4
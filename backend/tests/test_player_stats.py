@@ -0,0 +1,37 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.v1.core.course_endpoints import player_stats
+from app.api.v1.core.models import PlayerStats, Rounds
+from app.db_setup import engine
+
+
+def test_first_completion_joins_concurrently_built_stats(client, auth_headers, tee, monkeypatch):
+    """A stats row inserted between the lookup and the build must not fail the completion"""
+    start = {"course_id": tee.course_id, "tee_id": tee.id}
+    first_round_id = client.post("/v1/rounds/start", json=start, headers=auth_headers).json()["id"]
+    client.put(f"/v1/rounds/{first_round_id}/hole/1", json={"shots": 5, "par": 4}, headers=auth_headers)
+    # The first round is completed by the concurrent request, which builds the row
+    with Session(engine) as session:
+        session.get(Rounds, first_round_id).is_completed = True
+        session.commit()
+    assert client.get("/v1/rounds/stats", headers=auth_headers).json()["rounds_played"] == 1
+    round_id = client.post("/v1/rounds/start", json=start, headers=auth_headers).json()["id"]
+    client.put(f"/v1/rounds/{round_id}/hole/1", json={"shots": 5, "par": 4}, headers=auth_headers)
+
+    lock_player_stats = player_stats.lock_player_stats
+    lookups = []
+
+    async def lookup_before_the_concurrent_insert(db, user_id):
+        lookups.append(user_id)
+        return None if len(lookups) == 1 else await lock_player_stats(db, user_id)
+
+    monkeypatch.setattr(player_stats, "lock_player_stats", lookup_before_the_concurrent_insert)
+    response = client.post(f"/v1/rounds/{round_id}/complete", json={}, headers=auth_headers)
+    assert response.status_code == 200
+    assert len(lookups) == 2
+
+    with Session(engine) as session:
+        assert session.get(Rounds, round_id).is_completed
+        stats = session.scalars(select(PlayerStats)).one()
+        assert (stats.rounds_played, stats.total_shots, stats.par4_holes) == (2, 10, 2)
@@ -0,0 +1,74 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.core.models import HoleScores, Rounds
+from app.db_setup import get_async_db
+from app.metrics import MetricsMiddleware
+
+
+@pytest.mark.query_budget(statements=6)
+def test_start_round(client, auth_headers, tee, query_budget):
+    response = client.post("/v1/rounds/start", json={"course_id": tee.course_id, "tee_id": tee.id}, headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()["hole_scores"]) == 18
+
+
+@pytest.mark.query_budget(statements=3)
+def test_update_hole_score(client, auth_headers, active_round, query_budget):
+    response = client.put(
+        f"/v1/rounds/{active_round['id']}/hole/1", json={"shots": 5, "par": 4}, headers=auth_headers
+    )
+    assert response.status_code == 200
+
+
+@pytest.fixture
+def third_round(client, auth_headers, tee) -> dict:
+    """Active round of a player with two completed rounds, so completing it recalculates the handicap"""
+    start = {"course_id": tee.course_id, "tee_id": tee.id}
+    for _ in range(2):
+        round_id = client.post("/v1/rounds/start", json=start, headers=auth_headers).json()["id"]
+        assert client.post(f"/v1/rounds/{round_id}/complete", json={}, headers=auth_headers).status_code == 200
+    response = client.post("/v1/rounds/start", json=start, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.query_budget(statements=16)
+def test_complete_round(client, auth_headers, third_round, query_budget):
+    response = client.post(f"/v1/rounds/{third_round['id']}/complete", json={}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["is_completed"]
+
+
+def test_repeated_statement_is_flagged(active_round, query_recorder):
+    """A handler loading the holes one query at a time exceeds the default repeat budget"""
+    app = FastAPI()
+
+    @app.get("/rounds/{round_id}/holes")
+    async def holes_one_by_one(round_id: int, db: AsyncSession = Depends(get_async_db)):
+        holes = []
+        for hole_number in range(1, 19):
+            hole = await db.scalar(
+                select(HoleScores).where(HoleScores.round_id == round_id, HoleScores.hole_number == hole_number)
+            )
+            holes.append(hole.shots)
+        return holes
+
+    @app.get("/rounds/{round_id}")
+    async def round_once(round_id: int, db: AsyncSession = Depends(get_async_db)):
+        return (await db.get(Rounds, round_id)).total_shots
+
+    app.add_middleware(MetricsMiddleware)
+    with TestClient(app) as client:
+        assert client.get(f"/rounds/{active_round['id']}").status_code == 200
+        assert client.get(f"/rounds/{active_round['id']}/holes").status_code == 200
+
+    failures = query_recorder.failures(max_statements=None, max_repeats=2)
+    assert len(failures) == 1
+    assert failures[0].startswith("GET /rounds/{round_id}/holes ran the same statement 18 times: SELECT")
+    assert query_recorder.failures(max_statements=1, max_repeats=18) == [
+        "GET /rounds/{round_id}/holes ran 18 statements, budget is 1"
+    ]
@@ -0,0 +1,123 @@
+"""Upgrades of tables as earlier versions of the app created them"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.api.v1.core.models import Clubs, HoleScores, Rounds, Token, Users
+from app.db_setup import engine
+from app.schema_upgrade import upgrade_schema
+from app.token_cache import as_utc
+
+
+def replace_table(ddl: str, table: str) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE {table}"))
+        connection.execute(text(ddl))
+
+
+def schema() -> dict:
+    inspector = inspect(engine)
+    return {
+        table: (
+            [(column["name"], str(column["type"]), column["nullable"]) for column in inspector.get_columns(table)],
+            sorted(index["name"] for index in inspector.get_indexes(table)),
+        )
+        for table in inspector.get_table_names()
+    }
+
+
+def test_upgrade_of_an_up_to_date_schema_changes_nothing():
+    before = schema()
+    upgrade_schema(engine)
+    assert schema() == before
+
+
+def test_tokens_get_a_backfilled_expiry():
+    replace_table(
+        "CREATE TABLE tokens (id INTEGER PRIMARY KEY, created_at DATETIME, token VARCHAR NOT NULL UNIQUE, "
+        "user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE)",
+        "tokens",
+    )
+    with Session(engine) as session:
+        user = Users(first_name="Old", last_name="Token", email="old@example.com", hashed_password="x")
+        session.add(user)
+        session.flush()
+        session.execute(text("INSERT INTO tokens (token, user_id) VALUES ('legacy', :user_id)"), {"user_id": user.id})
+        session.commit()
+
+    upgrade_schema(engine)
+
+    assert "ix_tokens_expires_at" in {index["name"] for index in inspect(engine).get_indexes("tokens")}
+    with Session(engine) as session:
+        token = session.scalars(select(Token)).one()
+        assert as_utc(token.expires_at) > datetime.now(timezone.utc)
+
+
+def test_rounds_get_the_history_index():
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_rounds_user_history"))
+
+    upgrade_schema(engine)
+
+    assert "ix_rounds_user_history" in {index["name"] for index in inspect(engine).get_indexes("rounds")}
+
+
+def test_duplicate_active_rounds_are_cleaned_up_before_the_unique_index(tee):
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX uq_rounds_one_active_per_user"))
+    start = datetime(2026, 5, 1, tzinfo=timezone.utc)
+    with Session(engine) as session:
+        user = Users(first_name="Two", last_name="Rounds", email="two@example.com", hashed_password="x")
+        user.rounds = [
+            Rounds(course_name="Test Golf Club", tee_id=tee.id, total_holes=18, start_time=start + timedelta(hours=hours),
+                   is_completed=completed, hole_scores=[HoleScores(hole_number=1, par=4, score_relative_to_par=0)])
+            for hours, completed in ((0, True), (1, False), (2, False), (3, False))
+        ]
+        session.add(user)
+        session.flush()
+        completed_id, oldest_id, _, _ = (round_obj.id for round_obj in user.rounds)
+        session.commit()
+
+    upgrade_schema(engine)
+
+    assert "uq_rounds_one_active_per_user" in {index["name"] for index in inspect(engine).get_indexes("rounds")}
+    with Session(engine) as session:
+        assert session.scalars(select(Rounds.id).order_by(Rounds.id)).all() == [completed_id, oldest_id]
+        assert session.scalars(select(HoleScores.round_id).order_by(HoleScores.round_id)).all() == [completed_id, oldest_id]
+
+
+def test_clubs_get_an_updated_at_stamp():
+    replace_table(
+        "CREATE TABLE clubs (id INTEGER PRIMARY KEY, club VARCHAR(255) NOT NULL, distance_meter NUMERIC NOT NULL, "
+        "preferred_club BOOLEAN NOT NULL, user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE)",
+        "clubs",
+    )
+    with Session(engine) as session:
+        user = Users(first_name="Old", last_name="Club", email="club@example.com", hashed_password="x")
+        session.add(user)
+        session.flush()
+        session.execute(
+            text("INSERT INTO clubs (club, distance_meter, preferred_club, user_id) VALUES ('Driver', 220, 1, :user_id)"),
+            {"user_id": user.id},
+        )
+        session.commit()
+
+    upgrade_schema(engine)
+
+    with Session(engine) as session:
+        assert session.scalars(select(Clubs)).one().updated_at is not None
+
+
+def test_rounds_and_holes_get_row_versions(client, auth_headers, active_round):
+    with engine.begin() as connection:
+        for table in ("rounds", "hole_scores"):
+            connection.execute(text(f"ALTER TABLE {table} DROP COLUMN version"))
+
+    upgrade_schema(engine)
+
+    hole = client.put(f"/v1/rounds/{active_round['id']}/hole/1", json={"shots": 5, "par": 4}, headers=auth_headers)
+    assert hole.status_code == 200
+    assert hole.json()["version"] == 2
+    round_obj = client.get(f"/v1/rounds/{active_round['id']}", headers=auth_headers).json()
+    assert (round_obj["version"], round_obj["total_shots"]) == (2, 5)
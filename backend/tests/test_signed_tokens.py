@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import security
+from app.api.v1.core.models import Token
+from app.db_setup import engine
+from app.settings import settings
+from app.signed_tokens import RevocationSet
+from app.token_cache import token_cache
+from tests.conftest import PASSWORD
+
+NEW_PASSWORD = "new-test-password"
+
+
+@pytest.fixture
+def signed_mode(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "AUTH_TOKEN_MODE", "signed")
+    monkeypatch.setattr(settings, "SIGNED_TOKEN_SECRET", "test-secret")
+    monkeypatch.setattr(settings, "REVOKED_TOKENS_FILE", str(tmp_path / "revoked_tokens.json"))
+    monkeypatch.setattr(security, "revoked_tokens", RevocationSet())
+
+
+def log_in(client, password: str = PASSWORD) -> dict:
+    response = client.post("/v1/auth/token", data={"username": "player@example.com", "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def change_password(client, headers: dict):
+    body = {"current_password": PASSWORD, "new_password": NEW_PASSWORD}
+    assert client.put("/v1/change-password", json=body, headers=headers).status_code == 200
+
+
+def test_signed_tokens_authenticate_id_only_routes_without_the_database(signed_mode, client, auth_headers, query_recorder):
+    token_cache.clear()
+    query_recorder.requests.clear()
+    assert client.get("/v1/rounds/active", headers=auth_headers).status_code == 200
+    [(_, _, stats)] = query_recorder.requests
+    assert stats.shapes
+    assert not [shape for shape in stats.shapes if "users" in shape or "tokens" in shape]
+
+
+def test_password_change_revokes_the_other_signed_tokens(signed_mode, client, auth_headers):
+    other_device = log_in(client)
+    change_password(client, auth_headers)
+
+    assert client.get("/v1/rounds/active", headers=other_device).status_code == 401
+    assert client.get("/v1/rounds/active", headers=auth_headers).status_code == 200
+    assert client.get("/v1/rounds/active", headers=log_in(client, NEW_PASSWORD)).status_code == 200
+
+    # The revocation survives a restart
+    restarted = RevocationSet()
+    restarted.load(settings.REVOKED_TOKENS_FILE)
+    other_claims = security.decode_signed_token(other_device["Authorization"].removeprefix("Bearer "))
+    assert restarted.is_revoked(other_claims)
+
+
+def test_password_change_deletes_the_other_database_tokens(client, auth_headers):
+    other_device = log_in(client)
+    change_password(client, auth_headers)
+
+    assert client.get("/v1/rounds/active", headers=other_device).status_code == 401
+    assert client.get("/v1/rounds/active", headers=auth_headers).status_code == 200
+    with Session(engine) as session:
+        assert session.scalar(select(func.count(Token.id))) == 1
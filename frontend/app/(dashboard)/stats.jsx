@@ -129,7 +129,7 @@ const SimpleLineChart = ({ data, labels, width, height }) => {
 
 export default function Stats() {
     const [selectedPeriod, setSelectedPeriod] = useState('all')
-    const { roundHistory, loading, getRoundHistory } = useRoundStore()
+    const { roundHistory, playerStats, loading, getFullRoundHistory, getPlayerStats } = useRoundStore()
     const { userData } = authStore()
 
     useEffect(() => {
@@ -138,7 +138,10 @@ export default function Stats() {
 
     const loadRoundHistory = async () => {
         try {
-            await getRoundHistory(50, 0) // Load more rounds for better stats
+            await Promise.all([
+                getPlayerStats(), // All-time totals come from the server
+                getFullRoundHistory() // Needed for the chart and the shorter periods
+            ])
         } catch (error) {
             Alert.alert('Error', 'Failed to load round history: ' + error.message)
         }
@@ -176,6 +179,23 @@ export default function Stats() {
 
     // Calculate stats from actual round data
     const calculateStats = () => {
+        // All-time stats are aggregated on the server
+        if (selectedPeriod === 'all' && playerStats) {
+            return {
+                roundsPlayed: playerStats.rounds_played,
+                averageEfficiency: playerStats.average_efficiency ?? 0,
+                bestScore: playerStats.best_score_to_par,
+                bestShots9: playerStats.best_shots_9,
+                bestShots18: playerStats.best_shots_18,
+                averageScore9: Math.round(playerStats.average_shots_9 ?? 0),
+                averageScore18: Math.round(playerStats.average_shots_18 ?? 0),
+                rounds9: playerStats.rounds_9,
+                rounds18: playerStats.rounds_18,
+                totalShots: playerStats.total_shots,
+                totalPar: playerStats.total_par
+            }
+        }
+
         // Filter rounds by selected period
         const filteredRounds = filterRoundsByPeriod(roundHistory, selectedPeriod)
         
@@ -2,11 +2,41 @@ import { create } from 'zustand'
 import authStore from './authStore'
 import { API_BASE_URL } from '../config/api'
 
+// FastAPI errors carry a string detail, a list of validation errors, or for 409 conflicts an
+// object with a message and the current state of the resource
+const errorMessage = (errorData, fallback) => {
+  const detail = errorData?.detail
+  if (typeof detail === 'string') return detail
+  if (typeof detail?.message === 'string') return detail.message
+  return fallback
+}
+
+// The round with the locally recorded hole scores applied and its totals recalculated
+const withHoleUpdates = (round, updates) => {
+  const hole_scores = round.hole_scores.map(hole => {
+    const update = updates[hole.hole_number]
+    return update
+      ? {
+          ...hole,
+          shots: update.shots,
+          par: update.par,
+          notes: update.notes,
+          score_relative_to_par: update.shots - update.par,
+          completed_at: update.completed_at
+        }
+      : hole
+  })
+  const total_shots = hole_scores.reduce((sum, hole) => sum + hole.shots, 0)
+  const total_par = hole_scores.reduce((sum, hole) => sum + hole.par, 0)
+  return { ...round, hole_scores, total_shots, total_par, score_relative_to_par: total_shots - total_par }
+}
+
 const useRoundStore = create((set, get) => ({
   // Current round state
   currentRound: null,
   currentHole: 1,
   roundHistory: [],
+  playerStats: null,
   loading: false,
   error: null,
 
@@ -43,7 +73,7 @@ const useRoundStore = create((set, get) => ({
 
       if (!response.ok) {
         const errorData = await response.json()
-        throw new Error(errorData.detail || 'Failed to start round')
+        throw new Error(errorMessage(errorData, 'Failed to start round'))
       }
 
       const round = await response.json()
@@ -100,66 +130,91 @@ const useRoundStore = create((set, get) => ({
     }
   },
 
+  // Hole scores recorded locally but not yet accepted by the server, keyed by hole number
+  pendingHoleUpdates: {},
+
   updateHoleScore: async (holeNumber, shots, par, notes = null) => {
+    const { currentRound } = get()
+    if (!currentRound) throw new Error('No active round')
+
+    const update = {
+      hole_number: holeNumber,
+      shots,
+      par,
+      notes,
+      completed_at: new Date().toISOString()
+    }
+
+    // Update local state right away, the score is sent with the next sync
+    set(state => ({
+      currentRound: withHoleUpdates(state.currentRound, { [holeNumber]: update }),
+      pendingHoleUpdates: { ...state.pendingHoleUpdates, [holeNumber]: update }
+    }))
+
+    await get().syncHoleScores()
+
+    return get().currentRound.hole_scores.find(hole => hole.hole_number === holeNumber)
+  },
+
+  // Send every pending hole score in one request. Without a connection the updates stay
+  // queued and are sent with the next sync, the server keeps the latest edit of each hole.
+  syncHoleScores: async () => {
+    const { currentRound, pendingHoleUpdates } = get()
+    const updates = Object.values(pendingHoleUpdates)
+    if (!currentRound || updates.length === 0) return currentRound
+
+    const { token } = authStore.getState()
+
+    let response
     try {
-      const { currentRound } = get()
-      if (!currentRound) throw new Error('No active round')
-      
-      const { token } = authStore.getState()
-      
-      const response = await fetch(`${API_BASE_URL}/rounds/${currentRound.id}/hole/${holeNumber}`, {
+      response = await fetch(`${API_BASE_URL}/rounds/${currentRound.id}/holes`, {
         method: 'PUT',
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({
-          shots,
-          par,
-          notes
-        })
+        body: JSON.stringify({ holes: updates })
       })
+    } catch (error) {
+      // Offline, keep the updates for the next sync
+      return null
+    }
 
-      if (!response.ok) {
-        const errorData = await response.json()
-        throw new Error(errorData.detail || 'Failed to update hole score')
+    if (response.status === 409) {
+      // The round kept changing under the sync, reload it and keep the updates for the next sync
+      try {
+        const round = await get().getRoundDetails(currentRound.id)
+        set(state => ({ currentRound: withHoleUpdates(round, state.pendingHoleUpdates) }))
+      } catch (error) {
+        // getRoundDetails has set the error, the local round stays as it is
       }
+      return null
+    }
 
-      const updatedHoleScore = await response.json()
-      
-      // Update local state
-      set(state => ({
-        currentRound: {
-          ...state.currentRound,
-          hole_scores: state.currentRound.hole_scores.map(hole =>
-            hole.hole_number === holeNumber 
-              ? updatedHoleScore
-              : hole
-          ),
-          // Recalculate totals
-          total_shots: state.currentRound.hole_scores.reduce((sum, hole) => 
-            sum + (hole.hole_number === holeNumber ? shots : hole.shots), 0
-          ),
-          total_par: state.currentRound.hole_scores.reduce((sum, hole) => 
-            sum + (hole.hole_number === holeNumber ? par : hole.par), 0
-          )
-        }
-      }))
-      
-      // Update score_relative_to_par
-      const { currentRound: updatedRound } = get()
-      set(state => ({
-        currentRound: {
-          ...state.currentRound,
-          score_relative_to_par: updatedRound.total_shots - updatedRound.total_par
-        }
-      }))
-      
-      return updatedHoleScore
-    } catch (error) {
-      set({ error: error.message })
-      throw error
+    if (!response.ok) {
+      const errorData = await response.json()
+      const message = errorMessage(errorData, 'Failed to sync hole scores')
+      set({ error: message })
+      throw new Error(message)
     }
+
+    const round = await response.json()
+
+    // Drop the updates that were sent, keep holes edited again while the request was in flight
+    set(state => {
+      const pending = { ...state.pendingHoleUpdates }
+      for (const update of updates) {
+        if (pending[update.hole_number]?.completed_at === update.completed_at) {
+          delete pending[update.hole_number]
+        }
+      }
+      return {
+        currentRound: Object.keys(pending).length === 0 ? round : state.currentRound,
+        pendingHoleUpdates: pending
+      }
+    })
+
+    return round
   },
 
   nextHole: () => {
@@ -190,6 +245,11 @@ const useRoundStore = create((set, get) => ({
       
       set({ loading: true, error: null })
       
+      await get().syncHoleScores()
+      if (Object.keys(get().pendingHoleUpdates).length > 0) {
+        throw new Error('Some hole scores are not saved yet, check your connection and try again')
+      }
+      
       const { token } = authStore.getState()
       
       const response = await fetch(`${API_BASE_URL}/rounds/${currentRound.id}/complete`, {
@@ -203,7 +263,7 @@ const useRoundStore = create((set, get) => ({
 
       if (!response.ok) {
         const errorData = await response.json()
-        throw new Error(errorData.detail || 'Failed to complete round')
+        throw new Error(errorMessage(errorData, 'Failed to complete round'))
       }
 
       const completedRound = await response.json()
@@ -211,6 +271,7 @@ const useRoundStore = create((set, get) => ({
       set({ 
         currentRound: null, 
         currentHole: 1,
+        pendingHoleUpdates: {},
         loading: false 
       })
       
@@ -247,6 +308,66 @@ const useRoundStore = create((set, get) => ({
     }
   },
 
+  // Load the complete history page by page with the keyset paginated endpoint
+  getFullRoundHistory: async (pageSize = 100) => {
+    try {
+      set({ loading: true, error: null })
+      
+      const { token } = authStore.getState()
+      
+      const rounds = []
+      let cursor = null
+      do {
+        const params = `limit=${pageSize}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '')
+        const response = await fetch(`${API_BASE_URL}/rounds/history/page?${params}`, {
+          headers: {
+            'Authorization': `Bearer ${token}`,
+          }
+        })
+
+        if (!response.ok) {
+          throw new Error('Failed to get round history')
+        }
+
+        const page = await response.json()
+        rounds.push(...page.items)
+        cursor = page.next_cursor
+      } while (cursor)
+
+      set({ roundHistory: rounds, loading: false })
+      
+      return rounds
+    } catch (error) {
+      set({ error: error.message, loading: false })
+      throw error
+    }
+  },
+
+  // All-time statistics, aggregated on the server
+  getPlayerStats: async () => {
+    try {
+      const { token } = authStore.getState()
+      
+      const response = await fetch(`${API_BASE_URL}/rounds/stats`, {
+        headers: {
+          'Authorization': `Bearer ${token}`,
+        }
+      })
+
+      if (!response.ok) {
+        throw new Error('Failed to get player stats')
+      }
+
+      const playerStats = await response.json()
+      set({ playerStats })
+      
+      return playerStats
+    } catch (error) {
+      set({ error: error.message })
+      throw error
+    }
+  },
+
   getRoundDetails: async (roundId) => {
     try {
       const { token } = authStore.getState()
@@ -281,7 +402,7 @@ const useRoundStore = create((set, get) => ({
 
       if (!response.ok) {
         const errorData = await response.json()
-        throw new Error(errorData.detail || 'Failed to delete round')
+        throw new Error(errorMessage(errorData, 'Failed to delete round'))
       }
 
       // Remove from local state if it was in history
@@ -341,6 +462,7 @@ const useRoundStore = create((set, get) => ({
       error: null,
       selectedCourse: null,
       selectedTee: null,
+      pendingHoleUpdates: {},
       targetPosition: null,
       distance: 0
     })